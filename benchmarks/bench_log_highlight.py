@@ -0,0 +1,90 @@
+"""Бенчмарк: подсветка окна лога — rich.Syntax против построчного LineHighlighter.
+
+Генерирует смесь строк syslog, auth.log, nginx access и dpkg.log и для
+каждого размера куска измеряет рендер в консоль (в буфер, без вывода на
+экран):
+
+  * Syntax(text, "log") — старый путь: весь кусок заново через pygments;
+  * LineHighlighter, весь кусок — те же строки, построчная regex-подсветка;
+  * LineHighlighter, экран — только видимые --height строк, как в пейджере
+    и в просмотрах последних строк и периода, с холодным кэшем и повторный
+    кадр с тёплым.
+
+LineHighlighter отдаёт rich готовые сегменты, но раскрашенная строка из
+десятка сегментов всё равно рендерится не быстрее одной бесцветной строки
+Syntax: весь кусок стоит примерно столько же. Выигрыш даёт отказ от
+рендера строк, которых нет на экране.
+
+Запуск из корня репозитория:
+    python3 benchmarks/bench_log_highlight.py [--lines 100 1000 5000] [--height 50] [--repeat 3] [--line-numbers]
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rich.console import Console
+from rich.syntax import Syntax
+
+from modules.log_highlight import LineHighlighter
+
+
+def make_lines(count, seed=1):
+    rnd = random.Random(seed)
+    makers = [
+        lambda: f"Oct 18 13:{rnd.randint(0, 59):02d}:{rnd.randint(0, 59):02d} srv sshd[{rnd.randint(1000, 99999)}]: "
+                f"Failed password for invalid user admin from 203.0.113.{rnd.randint(1, 254)} port {rnd.randint(1024, 65535)} ssh2",
+        lambda: f"Oct 18 13:{rnd.randint(0, 59):02d}:{rnd.randint(0, 59):02d} srv systemd[1]: Started Session {rnd.randint(1, 9999)} of user root.",
+        lambda: f"198.51.100.{rnd.randint(1, 254)} - - [18/Oct/2024:13:55:{rnd.randint(10, 59)} +0300] "
+                f"\"GET /item/{rnd.randint(1, 10**6)} HTTP/1.1\" {rnd.choice([200, 301, 404, 500])} {rnd.randint(100, 90000)} \"-\" \"curl/8.0\"",
+        lambda: f"2024-10-18 13:{rnd.randint(0, 59):02d}:{rnd.randint(0, 59):02d} status installed libc6:amd64 2.35-0ubuntu3.{rnd.randint(1, 9)}",
+        lambda: f"Oct 18 13:{rnd.randint(0, 59):02d}:{rnd.randint(0, 59):02d} srv kernel: [UFW BLOCK] IN=eth0 OUT= SRC=192.0.2.{rnd.randint(1, 254)} DST=10.0.0.1 PROTO=TCP DPT=22",
+    ]
+    return [rnd.choice(makers)() for _ in range(count)]
+
+
+def _render(renderable, width=160):
+    console = Console(file=io.StringIO(), width=width, color_system="truecolor", force_terminal=True)
+    console.print(renderable)
+
+
+def _best(func, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--height", type=int, default=50, help="строк на экране")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--line-numbers", action="store_true", help="с колонкой номеров строк, как в просмотре последних 100 строк")
+    args = parser.parse_args()
+    numbers = args.line_numbers
+
+    print(f"{'lines':>7} {'Syntax, ms':>11} {'chunk, ms':>10} {'screen cold':>12} {'screen warm':>12} {'speedup':>8}")
+    for count in args.lines:
+        lines = make_lines(count)
+        content = "\n".join(lines)
+        screen = lines[-args.height:]
+        syntax = _best(lambda: _render(Syntax(content, "log", theme="monokai", line_numbers=numbers)), args.repeat)
+        chunk = _best(lambda: _render(LineHighlighter().render(lines, line_numbers=numbers)), args.repeat)
+        cold = _best(lambda: _render(LineHighlighter().render(screen)), args.repeat)
+        highlighter = LineHighlighter()
+        highlighter.render(screen)
+        warm = _best(lambda: _render(highlighter.render(screen)), args.repeat)
+        print(f"{count:>7} {syntax * 1000:>11.1f} {chunk * 1000:>10.1f} {cold * 1000:>12.1f} "
+              f"{warm * 1000:>12.1f} {syntax / warm:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
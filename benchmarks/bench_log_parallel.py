@@ -0,0 +1,124 @@
+"""Бенчмарк: масштабирование аналитики и поиска по логам на пуле процессов.
+
+Генерирует синтетический корпус (по умолчанию 5 ГБ: auth.log, syslog и
+access.log с ротированными поколениями) и прогоняет analyze_files() и
+grep_logs() с 1, 2, 4 … os.cpu_count() процессами. Кэш статистики
+отключается, чтобы каждый прогон читал файлы заново.
+
+Запуск из корня репозитория:
+    python3 benchmarks/bench_log_parallel.py [--size-mb 5120] [--dir /tmp/log-corpus] [--keep]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import modules.log_analytics as log_analytics
+from modules.log_index import grep_logs
+
+USERS = [f"user{i}" for i in range(500)] + ["root", "admin", "ubuntu", "test", "oracle"]
+
+
+def _ip(rnd):
+    # Несколько «шумных» адресов и длинный хвост случайных, как у реального перебора SSH
+    if rnd.random() < 0.3:
+        return f"203.0.113.{rnd.randint(1, 20)}"
+    return f"{rnd.randint(1, 223)}.{rnd.randint(0, 255)}.{rnd.randint(0, 255)}.{rnd.randint(1, 254)}"
+
+
+def _auth_line(rnd, ts):
+    stamp = time.strftime("%b %e %H:%M:%S", time.localtime(ts))
+    user = rnd.choice(USERS)
+    if rnd.random() < 0.7:
+        return f"{stamp} srv sshd[{rnd.randint(1000, 99999)}]: Failed password for invalid user {user} from {_ip(rnd)} port {rnd.randint(1024, 65535)} ssh2\n"
+    return f"{stamp} srv sshd[{rnd.randint(1000, 99999)}]: Accepted publickey for {user} from {_ip(rnd)} port {rnd.randint(1024, 65535)} ssh2\n"
+
+
+def _syslog_line(rnd, ts):
+    stamp = time.strftime("%b %e %H:%M:%S", time.localtime(ts))
+    unit = rnd.choice(["systemd[1]", "cron[812]", "kernel", "dockerd[903]", "nginx[1201]"])
+    return f"{stamp} srv {unit}: message {rnd.randint(0, 10**9)} state={rnd.choice(['ok', 'degraded', 'failed'])}\n"
+
+
+def _access_line(rnd, ts):
+    stamp = time.strftime("%d/%b/%Y:%H:%M:%S +0000", time.gmtime(ts))
+    status = rnd.choice([200, 200, 200, 301, 404, 500])
+    return f'{_ip(rnd)} - - [{stamp}] "GET /item/{rnd.randint(1, 10**6)} HTTP/1.1" {status} {rnd.randint(100, 90000)} "-" "bench"\n'
+
+
+def make_corpus(directory, size_mb, seed=1):
+    """Writes ~size_mb of logs: 3 logs x 4 generations; returns the file list."""
+    rnd = random.Random(seed)
+    makers = {"auth.log": _auth_line, "syslog": _syslog_line, "access.log": _access_line}
+    plan = [(base + (f".{gen}" if gen else ""), maker, gen) for base, maker in makers.items() for gen in range(4)]
+    per_file = size_mb * 1024 * 1024 // len(plan)
+    files = []
+    now = time.time()
+    for name, maker, generation in plan:
+        path = os.path.join(directory, name)
+        files.append(path)
+        if os.path.exists(path) and os.path.getsize(path) >= per_file:
+            continue
+        ts = now - (generation + 1) * 86400
+        step = 86400 / max(per_file // 110, 1)
+        written = 0
+        # Пишем блоками по ~1 МБ: шаблон строк повторяется, чтобы генерация не была дольше бенчмарка
+        block = "".join(maker(rnd, ts + j * step) for j in range(9000)).encode()
+        with open(path, "wb") as f:
+            while written < per_file:
+                f.write(block)
+                written += len(block)
+        os.utime(path, (now - generation * 86400, now - generation * 86400))
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=5120)
+    parser.add_argument("--dir", default=None, help="каталог корпуса (по умолчанию временный)")
+    parser.add_argument("--keep", action="store_true", help="не удалять сгенерированный корпус")
+    args = parser.parse_args()
+
+    directory = args.dir or tempfile.mkdtemp(prefix="log-corpus-")
+    os.makedirs(directory, exist_ok=True)
+    cache_dir = tempfile.mkdtemp(prefix="log-stats-")
+    log_analytics.STATS_DIR = log_analytics.Path(cache_dir)
+    try:
+        t0 = time.perf_counter()
+        files = make_corpus(directory, args.size_mb)
+        total = sum(os.path.getsize(f) for f in files)
+        print(f"corpus: {len(files)} files, {total / 2**20:.0f} MiB in {directory} ({time.perf_counter() - t0:.1f} s)")
+
+        cpus = os.cpu_count() or 1
+        counts = sorted({1, 2, 4, 8, 16, cpus} & set(range(1, cpus + 1)))
+        base = {}
+        print(f"{'workers':>8} {'analytics, s':>13} {'speedup':>8} {'grep, s':>9} {'speedup':>8} {'MiB/s':>8}")
+        for workers in counts:
+            shutil.rmtree(cache_dir)
+            os.makedirs(cache_dir)
+            t0 = time.perf_counter()
+            stats = log_analytics.analyze_files(files, workers=workers)
+            analytics = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            grep_logs(files, "state=failed", workers=workers)
+            grep = time.perf_counter() - t0
+            base.setdefault("analytics", analytics)
+            base.setdefault("grep", grep)
+            print(f"{workers:>8} {analytics:>13.2f} {base['analytics'] / analytics:>7.2f}x "
+                  f"{grep:>9.2f} {base['grep'] / grep:>7.2f}x {total / 2**20 / analytics:>8.1f}")
+        print(f"lines: {stats.lines}, top IP: {stats.top_ips(1)}")
+        if cpus == 1:
+            print("only one CPU is available: no scaling can be shown on this machine")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        if not args.keep and not args.dir:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
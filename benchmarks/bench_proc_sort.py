@@ -0,0 +1,67 @@
+"""Бенчмарк: полная сортировка против top-N через heap на синтетических 10k процессах.
+
+Запуск из корня репозитория:
+    python3 benchmarks/bench_proc_sort.py [--procs 10000] [--limit 30]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.process_model import top_processes
+from modules.process_manager import proc_row_cells
+
+
+def make_snapshot(count, seed=42, idle=0.9):
+    """Синтетический снимок: доля `idle` процессов простаивает с cpu=0.0, как на реальном сервере."""
+    rnd = random.Random(seed)
+    names = ["nginx", "php-fpm", "python3", "node", "postgres", "sshd", "bash", "worker", "systemd", "java"]
+    rows = []
+    for pid in range(1, count + 1):
+        create_time = 1_700_000_000 + rnd.random() * 86400
+        rows.append({
+            'pid': pid,
+            'name': f"{rnd.choice(names)}-{rnd.randint(0, 99)}",
+            'user': rnd.choice(["root", "www-data", "postgres"]),
+            'cpu': 0.0 if rnd.random() < idle else round(rnd.expovariate(0.2), 1),
+            'mem': round(rnd.expovariate(2.0), 1),
+            'cmd': "/usr/bin/" + rnd.choice(names) + " --config /etc/app.conf",
+            'status': rnd.choice(["running", "sleeping", "sleeping", "idle"]),
+            'create_time': create_time,
+            'ppid': rnd.randint(1, pid),
+            'threads': rnd.randint(1, 64),
+        })
+    return rows
+
+
+def legacy(rows, sort_by, limit):
+    """Старый путь: сортировка всех строк и форматирование среза."""
+    rows = sorted(rows, key=lambda x: x[sort_by] if sort_by in x else 0, reverse=True)
+    return [proc_row_cells(dict(p)) for p in rows[:limit]]
+
+
+def heap(rows, sort_by, limit):
+    return [proc_row_cells(dict(p)) for p in top_processes(rows, sort_by, limit)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--procs', type=int, default=10000)
+    parser.add_argument('--limit', type=int, default=30)
+    parser.add_argument('-n', '--number', type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_snapshot(args.procs)
+    print(f"{args.procs} processes, top {args.limit}")
+    for sort_by in ('cpu', 'mem', 'pid', 'name', 'start'):
+        key = 'create_time' if sort_by == 'start' else sort_by
+        t_sort = min(timeit.repeat(lambda: legacy(rows, key, args.limit), number=args.number, repeat=3)) / args.number
+        t_heap = min(timeit.repeat(lambda: heap(rows, sort_by, args.limit), number=args.number, repeat=3)) / args.number
+        print(f"{sort_by:>6}: sort {t_sort * 1e3:7.2f} ms   heap {t_heap * 1e3:7.2f} ms   x{t_sort / t_heap:4.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Микробенчмарк: сбор системной информации через subprocess против чтения /proc.
+
+Строка «native /proc» каждый раз действительно читает /proc и
+/etc/os-release (read_*). Строка «cached» — то, что видит меню: get_*
+после user-002/003 отдают значения из TTL-снимка, поэтому это скорее
+поиск в словаре, и в ускорение она не входит.
+
+Запуск из корня репозитория:
+    python3 benchmarks/bench_system_info.py [-n 200]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.system_info import (
+    get_os_info, get_uptime, get_mem_usage, get_load_avg,
+    read_os_info, read_uptime_seconds, read_meminfo, read_loadavg,
+)
+
+
+def legacy_collect():
+    """Старый путь: пять fork/exec на каждую перерисовку меню."""
+    hostname = subprocess.run(['hostname'], capture_output=True, text=True).stdout.strip()
+    os_release = subprocess.run(['cat', '/etc/os-release'], capture_output=True, text=True).stdout
+    uptime = subprocess.run(['uptime', '-p'], capture_output=True, text=True).stdout.strip()
+    mem = subprocess.run(['free', '-h'], capture_output=True, text=True).stdout
+    load = subprocess.run(['cat', '/proc/loadavg'], capture_output=True, text=True).stdout
+    return hostname, os_release, uptime, mem, load
+
+
+def native_collect():
+    """Новый путь без кэша: чтение /proc, /etc/os-release и os.uname() на каждый вызов."""
+    return read_os_info(), read_uptime_seconds(), read_meminfo(), read_loadavg()
+
+
+def cached_collect():
+    """То, что вызывает меню: get_* из TTL-снимка."""
+    return get_os_info(), get_uptime(), get_mem_usage(), get_load_avg()
+
+
+def bench(func, number):
+    best = min(timeit.repeat(func, number=number, repeat=3))
+    return best / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--number', type=int, default=200, help='iterations per round')
+    args = parser.parse_args()
+
+    native = bench(native_collect, args.number)
+    cached = bench(cached_collect, args.number)
+    print(f"native /proc : {native * 1e6:10.1f} us/render")
+    print(f"cached       : {cached * 1e6:10.1f} us/render")
+    try:
+        legacy = bench(legacy_collect, max(args.number // 10, 1))
+    except FileNotFoundError as e:
+        print(f"subprocess   : skipped ({e.filename} not found)")
+        return
+    print(f"subprocess   : {legacy * 1e6:10.1f} us/render")
+    print(f"speedup      : {legacy / native:10.1f}x (native /proc vs subprocess)")
+
+
+if __name__ == '__main__':
+    main()
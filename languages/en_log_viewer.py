@@ -10,12 +10,79 @@ def get_strings():
         # Log Actions Sub-menu
         "log_actions_prompt": "Selected '{filename}':",
         "action_view": "View Log",
+        "action_period": "Show a time period (uses rotated/compressed files)",
+        "period_prompt": "Period:",
+        "period_hour": "Last hour",
+        "period_day": "Last 24 hours",
+        "period_week": "Last 7 days",
+        "period_month": "Last 30 days",
+        "period_summary": "{shown} of {total} lines · read {read} of {generations} files",
+        "rotated_count": "(+{count} rotated, {size})",
+        "action_analytics": "Analytics (events/min, top IPs and users)",
+        "analytics_all": "Analytics across all logs",
+        "analytics_title": "Analytics: {filename}",
+        "analytics_running": "Analyzing {path}...",
+        "analytics_lines": "{lines} lines in {files} file(s) · {seconds} s",
+        "analytics_span": "From {start} to {end} · {rate} events/s on average",
+        "analytics_peak": "Peak minute: {minute} — {count} events ({rate}/s)",
+        "analytics_histogram": "Last {minutes} min:",
+        "analytics_top_ips": "Top IPs",
+        "analytics_top_users": "Failed SSH logins",
+        "analytics_top_status": "HTTP status codes",
+        "analytics_col_count": "Count",
+        "analytics_col_user": "User",
+        "analytics_error": "Cannot analyze {path}: {error}",
+        "analytics_skipped": "Skipped unreadable files: {count}",
+        "action_follow": "Follow Live (tail -f)",
+        "follow_title": "Following {filename}",
+        "follow_hint": "Ctrl+C to stop",
+        "follow_rotated": "[yellow]Log was rotated, switched to the new file[/yellow]",
+        "follow_truncated": "[yellow]Log was truncated, reading from the start[/yellow]",
         "action_clear": "Clear Log",
         "action_back": "Back",
         "clear_confirm_prompt": "Are you sure you want to clear this log file? This cannot be undone.",
         "clear_success": "[green]Log file '{filename}' has been cleared.[/green]",
         "clear_fail": "[red]Failed to clear log file '{filename}'.[/red]",
 
+        # Journal
+        "journal_title": "systemd journal",
+        "journal_col_time": "Time",
+        "journal_col_unit": "Unit",
+        "journal_col_message": "Message",
+        "journal_no_filters": "no filters",
+        "journal_action_prompt": "Journal:",
+        "journal_older": "◀ Older",
+        "journal_newer": "Newer ▶",
+        "journal_latest": "Jump to latest",
+        "journal_filters": "Filters (unit, priority, since)...",
+        "journal_unit_prompt": "Unit (e.g. ssh.service, empty for all):",
+        "journal_priority_prompt": "Minimum priority:",
+        "journal_priority_all": "All",
+        "journal_since_prompt": "Since (e.g. '2024-10-18 10:00', '-1h', 'yesterday'; empty for all):",
+        "journal_at_start": "[yellow]This is the oldest page.[/yellow]",
+        "journal_at_end": "[yellow]No newer entries yet.[/yellow]",
+        "journal_error": "Error running journalctl: {error}",
+
+        # Pager
+        "pager_hint": "↑↓ PgUp/PgDn · g/G start/end · : line · t time · / search, n next · q quit",
+        "pager_goto_line": "Go to line:",
+        "pager_goto_time": "Go to time (HH:MM, YYYY-MM-DD HH:MM or 'Oct 18 13:00'):",
+        "pager_prompt_hint": "Enter to apply, Esc to cancel",
+        "pager_bad_time": "[red]Unrecognized time format[/red]",
+        "pager_truncated": "[yellow]File was truncated, reopened[/yellow]",
+        "pager_time_not_found": "[yellow]No lines at or after that time[/yellow]",
+        "pager_not_found": "[yellow]Not found below the current line[/yellow]",
+
+        # Search
+        "search_logs": "Search all logs (indexed)",
+        "search_prompt": "Search (IP, user, word; 'user*' for prefix; empty to go back):",
+        "search_indexing": "Updating indexes for {count} files...",
+        "search_results_title": "Results for '{query}'",
+        "search_col_file": "File",
+        "search_col_line": "Line",
+        "search_no_results": "[yellow]Nothing found.[/yellow]",
+        "search_stats": "[dim]{matches} matches in {files} files ({skipped} skipped) · index {indexed_ms} ms · query {query_ms} ms[/dim]",
+
         # Important Logs (Name and Description)
         "log_journald_name": "Journald Logs (journalctl)",
         "log_journald_desc": "Modern systemd logging service. Shows recent system-wide logs.",
@@ -32,7 +99,7 @@ def get_strings():
         "log_file_not_found": "[red]Log file not found.[/red]",
         "permission_denied": "[red]Permission denied. Try running with 'sudo'.[/red]",
         "reading_log_file": "Reading log file: {path}",
-        "last_100_lines": "Displaying last 100 lines",
+        "last_lines": "Displaying last {count} lines",
         "empty_log_file": "[yellow]Log file is empty.[/yellow]",
         "back_to_main_menu": "Back to Main Menu",
     } 
\ No newline at end of file
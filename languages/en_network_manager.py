@@ -2,7 +2,7 @@ def get_strings():
     return {
         "network_manager_title": "Network Management",
         "network_interfaces": "View network interfaces",
-        "network_traffic": "Traffic monitoring (bmon/iftop/nload)",
+        "network_traffic": "Traffic monitoring",
         "network_ports": "View open ports",
         "network_speedtest": "Internet speed test",
         "network_ping": "Ping",
@@ -12,6 +12,9 @@ def get_strings():
         "network_back": "Back",
         "network_no_tools": "No ss, netstat, or lsof found!",
         "network_press_enter": "Press Enter...",
+        "network_ports_local": "Local address",
+        "network_ports_process": "Process (PID)",
+        "network_ports_need_root": "Without root only the owners of your own sockets are shown.",
         "network_speedtest_not_installed": "speedtest-cli is not installed!",
         "network_speedtest_install": "Install speedtest-cli now?",
         "network_speedtest_running": "Running speedtest-cli...",
@@ -25,11 +28,44 @@ def get_strings():
         "network_ufw_allow": "Allow port",
         "network_ufw_deny": "Deny port",
         "network_ufw_port_prompt": "Enter port:",
+        "network_ufw_ruleset": "Apply rule set from file",
+        "network_ufw_ruleset_prompt": "Rule set file (one ufw rule per line, e.g. `allow 22/tcp`):",
+        "network_ufw_ruleset_need_root": "Root privileges are required to change the ufw rules files.",
+        "network_ufw_ruleset_export": "{path} does not exist. Save the current rules to it?",
+        "network_ufw_ruleset_saved": "{count} rules saved to {path}",
+        "network_ufw_ruleset_error": "Cannot build the rule set: {error}",
+        "network_ufw_ruleset_summary": "Add: {added}, remove: {removed}, unchanged: {kept}, kept as is (apps, interfaces, logging): {unmanaged}",
+        "network_ufw_ruleset_reordered": "The rule set lists existing rules in a different order. Their current order in the firewall is kept; to reorder, remove the rules and apply again.",
+        "network_ufw_ruleset_appended": "New rules are appended after the existing ones, including rules kept as is: an earlier interface or app rule still matches first.",
+        "network_ufw_ruleset_nothing": "The firewall already matches the rule set.",
+        "network_ufw_ruleset_plan": "Changes",
+        "network_ufw_ruleset_rule": "Rule",
+        "network_ufw_ruleset_invalid": "iptables-restore rejected the new rules, nothing was changed:",
+        "network_ufw_ruleset_show_diff": "Show the diff of the rules files?",
+        "network_ufw_ruleset_confirm": "Apply the changes with a single ufw reload?",
+        "network_ufw_ruleset_applied": "Rule set applied in {seconds} s",
+        "network_ufw_ruleset_failed": "ufw reload failed, previous rules restored: {error}",
+        "network_resolved": "{host} → {addresses}: resolved in {ms} ms via {source}, TTL {ttl} s",
+        "network_resolved_cached": "{host} → {addresses}: from DNS cache (resolved in {ms} ms via {source})",
+        "network_resolve_failed": "{host}: not resolved ({error}), passing the name to {tool}",
         "network_interfaces_title": "Network interfaces",
-        "network_traffic_not_found": "No bmon, iftop, or nload found!",
-        "network_traffic_install": "Install bmon now?",
-        "network_traffic_running": "Running {tool}... Press q to exit.",
-        "network_traffic_exit": "Exited {tool}. Returning to menu.",
+        "network_traffic_title": "Traffic by interface, every {interval} s",
+        "network_traffic_hint": "Ctrl+C to exit",
+        "network_traffic_iface": "Interface",
+        "network_traffic_avg": "Second line: average of the last {samples} samples",
+        "network_traffic_pps": "Packets/s",
+        "network_traffic_errors": "Err/drop",
+        "network_traffic_load": "Load",
+        "network_traffic_history": "History",
+        "network_talkers": "Top talkers: processes and networks",
+        "network_talkers_title": "TCP top talkers every {interval} s, {connections} connections",
+        "network_talkers_sampling": "Taking the first sample...",
+        "network_talkers_procs": "Processes",
+        "network_talkers_nets": "Remote networks",
+        "network_talkers_process": "Process",
+        "network_talkers_network": "Network",
+        "network_talkers_conns": "Conns",
+        "network_talkers_total": "Since start",
         "vless_ping": "Ping by locations (VLESS)",
         "vless_ping_select": "Select locations to ping:",
         "vless_ping_none_selected": "Nothing selected. Ping all locations?",
@@ -37,6 +73,13 @@ def get_strings():
         "vless_ping_country": "Country",
         "vless_ping_host": "Site/domain",
         "vless_ping_avg": "Average ping, ms",
+        "vless_ping_dns": "DNS, ms",
+        "vless_ping_dns_cached": "cache",
+        "vless_ping_min": "Min, ms",
+        "vless_ping_jitter": "Jitter, ms",
+        "vless_ping_loss": "Loss",
+        "vless_ping_probing": "Probing hosts: {done}/{total}...",
+        "vless_ping_summary": "{hosts} hosts probed via {method} in {seconds} s: {ok} answered, {failed} unreachable",
         "vless_ping_error": "Error",
         "vless_ping_continue": "Press Enter to continue..."
     } 
\ No newline at end of file
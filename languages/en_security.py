@@ -3,7 +3,7 @@ def get_strings():
         # Security Sub-menu
         "security_menu_title": "Security Analysis Menu",
         "security_menu_prompt": "Select a tool to run",
-        "port_scan_option": "Port Scanner (ss)",
+        "port_scan_option": "Port Scanner",
         "ssh_config_option": "SSH Configuration Analysis",
         "system_updates_option": "Check for System Updates",
         "rootkit_check_option": "Rootkit Scanner (chkrootkit)",
@@ -16,8 +16,6 @@ def get_strings():
         "address_col": "Local Address:Port",
         "process_col": "Process",
         "no_ports_msg": "[green]No open ports found.[/green]",
-        "ss_not_found_err": "[red]Error: 'ss' command not found. Make sure iproute2 utilities are installed.[/red]",
-        "ss_exec_err": "[red]Error executing 'ss': {e}[/red]",
         
         # run_security_analysis
         "start_security_analysis": "\n[bold cyan]=== Starting Security Analysis ===[/bold cyan]",
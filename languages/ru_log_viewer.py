@@ -12,12 +12,79 @@ def get_strings():
         # Log Actions Sub-menu
         "log_actions_prompt": "Выбран файл '{filename}':",
         "action_view": "Просмотреть",
+        "action_period": "Показать за период (включая ротированные/сжатые файлы)",
+        "period_prompt": "Период:",
+        "period_hour": "Последний час",
+        "period_day": "Последние 24 часа",
+        "period_week": "Последние 7 дней",
+        "period_month": "Последние 30 дней",
+        "period_summary": "{shown} из {total} строк · прочитано файлов: {read} из {generations}",
+        "rotated_count": "(+{count} в архиве, {size})",
+        "action_analytics": "Аналитика (событий в минуту, топ IP и пользователей)",
+        "analytics_all": "Аналитика по всем логам",
+        "analytics_title": "Аналитика: {filename}",
+        "analytics_running": "Анализ {path}...",
+        "analytics_lines": "{lines} строк в {files} файл(ах) · {seconds} с",
+        "analytics_span": "С {start} по {end} · в среднем {rate} событий/с",
+        "analytics_peak": "Пиковая минута: {minute} — {count} событий ({rate}/с)",
+        "analytics_histogram": "Последние {minutes} мин:",
+        "analytics_top_ips": "Топ IP",
+        "analytics_top_users": "Неудачные входы SSH",
+        "analytics_top_status": "HTTP-коды ответа",
+        "analytics_col_count": "Кол-во",
+        "analytics_col_user": "Пользователь",
+        "analytics_error": "Не удалось проанализировать {path}: {error}",
+        "analytics_skipped": "Пропущено нечитаемых файлов: {count}",
+        "action_follow": "Следить в реальном времени (tail -f)",
+        "follow_title": "Слежение за {filename}",
+        "follow_hint": "Ctrl+C — остановить",
+        "follow_rotated": "[yellow]Лог ротирован, переключились на новый файл[/yellow]",
+        "follow_truncated": "[yellow]Лог обрезан, читаем с начала[/yellow]",
         "action_clear": "Очистить",
         "action_back": "Назад",
         "clear_confirm_prompt": "Вы уверены, что хотите очистить этот лог-файл? Это действие необратимо.",
         "clear_success": "[green]Лог-файл '{filename}' был очищен.[/green]",
         "clear_fail": "[red]Не удалось очистить лог-файл '{filename}'.[/red]",
 
+        # Journal
+        "journal_title": "Журнал systemd",
+        "journal_col_time": "Время",
+        "journal_col_unit": "Юнит",
+        "journal_col_message": "Сообщение",
+        "journal_no_filters": "без фильтров",
+        "journal_action_prompt": "Журнал:",
+        "journal_older": "◀ Старее",
+        "journal_newer": "Новее ▶",
+        "journal_latest": "К последним записям",
+        "journal_filters": "Фильтры (юнит, приоритет, с какого времени)...",
+        "journal_unit_prompt": "Юнит (например ssh.service, пусто — все):",
+        "journal_priority_prompt": "Минимальный приоритет:",
+        "journal_priority_all": "Все",
+        "journal_since_prompt": "С какого времени ('2024-10-18 10:00', '-1h', 'yesterday'; пусто — всё):",
+        "journal_at_start": "[yellow]Это самая старая страница.[/yellow]",
+        "journal_at_end": "[yellow]Новых записей пока нет.[/yellow]",
+        "journal_error": "Ошибка journalctl: {error}",
+
+        # Pager
+        "pager_hint": "↑↓ PgUp/PgDn · g/G начало/конец · : строка · t время · / поиск, n далее · q выход",
+        "pager_goto_line": "Перейти к строке:",
+        "pager_goto_time": "Перейти ко времени (ЧЧ:ММ, ГГГГ-ММ-ДД ЧЧ:ММ или 'Oct 18 13:00'):",
+        "pager_prompt_hint": "Enter — применить, Esc — отмена",
+        "pager_bad_time": "[red]Не удалось разобрать время[/red]",
+        "pager_truncated": "[yellow]Файл был усечён, открыт заново[/yellow]",
+        "pager_time_not_found": "[yellow]Нет строк с этого времени и позже[/yellow]",
+        "pager_not_found": "[yellow]Ниже текущей строки не найдено[/yellow]",
+
+        # Search
+        "search_logs": "Поиск по всем логам (с индексом)",
+        "search_prompt": "Поиск (IP, пользователь, слово; 'user*' — по префиксу; пусто — назад):",
+        "search_indexing": "Обновление индексов для {count} файлов...",
+        "search_results_title": "Результаты для '{query}'",
+        "search_col_file": "Файл",
+        "search_col_line": "Строка",
+        "search_no_results": "[yellow]Ничего не найдено.[/yellow]",
+        "search_stats": "[dim]{matches} совпадений в {files} файлах (пропущено {skipped}) · индекс {indexed_ms} мс · запрос {query_ms} мс[/dim]",
+
         # Important Logs (Name and Description)
         "log_journald_name": "Логи Journald (journalctl)",
         "log_journald_desc": "Современная служба логирования systemd. Показывает последние общесистемные логи.",
@@ -34,7 +101,7 @@ def get_strings():
         "log_file_not_found": "[red]Лог-файл не найден.[/red]",
         "permission_denied": "[red]Отказано в доступе. Попробуйте запустить с 'sudo'.[/red]",
         "reading_log_file": "Чтение лог-файла: {path}",
-        "last_100_lines": "Отображение последних 100 строк",
+        "last_lines": "Отображение последних {count} строк",
         "empty_log_file": "[yellow]Лог-файл пуст.[/yellow]",
         "back_to_main_menu": "Вернуться в главное меню",
     } 
\ No newline at end of file
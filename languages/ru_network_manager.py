@@ -2,7 +2,7 @@ def get_strings():
     return {
         "network_manager_title": "Управление сетью",
         "network_interfaces": "Просмотр сетевых интерфейсов",
-        "network_traffic": "Мониторинг трафика (bmon/iftop/nload)",
+        "network_traffic": "Мониторинг трафика",
         "network_ports": "Просмотр открытых портов",
         "network_speedtest": "Проверка скорости интернета",
         "network_ping": "Ping",
@@ -12,6 +12,9 @@ def get_strings():
         "network_back": "Назад",
         "network_no_tools": "Нет ни ss, ни netstat, ни lsof!",
         "network_press_enter": "Нажмите Enter...",
+        "network_ports_local": "Локальный адрес",
+        "network_ports_process": "Процесс (PID)",
+        "network_ports_need_root": "Без root видны владельцы только ваших собственных сокетов.",
         "network_speedtest_not_installed": "speedtest-cli не установлен!",
         "network_speedtest_install": "Установить speedtest-cli сейчас?",
         "network_speedtest_running": "Запуск speedtest-cli...",
@@ -25,11 +28,44 @@ def get_strings():
         "network_ufw_allow": "Открыть порт",
         "network_ufw_deny": "Закрыть порт",
         "network_ufw_port_prompt": "Введите порт:",
+        "network_ufw_ruleset": "Применить набор правил из файла",
+        "network_ufw_ruleset_prompt": "Файл с правилами (по одному правилу ufw в строке, например `allow 22/tcp`):",
+        "network_ufw_ruleset_need_root": "Для изменения файлов правил ufw нужны права root.",
+        "network_ufw_ruleset_export": "Файл {path} не найден. Сохранить в него текущие правила?",
+        "network_ufw_ruleset_saved": "Сохранено правил: {count} в {path}",
+        "network_ufw_ruleset_error": "Не удалось построить набор правил: {error}",
+        "network_ufw_ruleset_summary": "Добавить: {added}, удалить: {removed}, без изменений: {kept}, оставлены как есть (приложения, интерфейсы, логирование): {unmanaged}",
+        "network_ufw_ruleset_reordered": "В наборе существующие правила идут в другом порядке. В файрволе сохраняется их текущий порядок; чтобы переставить правила, удалите их и примените набор заново.",
+        "network_ufw_ruleset_appended": "Новые правила добавляются после существующих, в том числе оставленных как есть: более раннее правило интерфейса или приложения по-прежнему срабатывает первым.",
+        "network_ufw_ruleset_nothing": "Файрвол уже соответствует набору правил.",
+        "network_ufw_ruleset_plan": "Изменения",
+        "network_ufw_ruleset_rule": "Правило",
+        "network_ufw_ruleset_invalid": "iptables-restore отверг новые правила, ничего не изменено:",
+        "network_ufw_ruleset_show_diff": "Показать diff файлов правил?",
+        "network_ufw_ruleset_confirm": "Применить изменения одной перезагрузкой ufw?",
+        "network_ufw_ruleset_applied": "Набор правил применён за {seconds} с",
+        "network_ufw_ruleset_failed": "ufw reload завершился ошибкой, прежние правила восстановлены: {error}",
+        "network_resolved": "{host} → {addresses}: разрешено за {ms} мс ({source}), TTL {ttl} с",
+        "network_resolved_cached": "{host} → {addresses}: из DNS-кэша (разрешено за {ms} мс, {source})",
+        "network_resolve_failed": "{host}: имя не разрешено ({error}), передаём его в {tool} как есть",
         "network_interfaces_title": "Сетевые интерфейсы",
-        "network_traffic_not_found": "Не найдено ни bmon, ни iftop, ни nload!",
-        "network_traffic_install": "Установить bmon сейчас?",
-        "network_traffic_running": "Запуск {tool}... Для выхода используйте q.",
-        "network_traffic_exit": "Вы вышли из {tool}. Возврат в меню.",
+        "network_traffic_title": "Трафик по интерфейсам, раз в {interval} с",
+        "network_traffic_hint": "Ctrl+C — выход",
+        "network_traffic_iface": "Интерфейс",
+        "network_traffic_avg": "Вторая строка: среднее за последние {samples} замеров",
+        "network_traffic_pps": "Пакетов/с",
+        "network_traffic_errors": "Ош/сбр",
+        "network_traffic_load": "Загрузка",
+        "network_traffic_history": "История",
+        "network_talkers": "Кто нагружает сеть: процессы и сети",
+        "network_talkers_title": "Топ по TCP-трафику раз в {interval} с, соединений: {connections}",
+        "network_talkers_sampling": "Первый замер...",
+        "network_talkers_procs": "Процессы",
+        "network_talkers_nets": "Удалённые сети",
+        "network_talkers_process": "Процесс",
+        "network_talkers_network": "Сеть",
+        "network_talkers_conns": "Соед.",
+        "network_talkers_total": "С начала",
         "vless_ping": "Пинг по локациям (VLESS)",
         "vless_ping_select": "Выберите локации для пинга:",
         "vless_ping_none_selected": "Ничего не выбрано. Пропинговать все локации?",
@@ -37,6 +73,13 @@ def get_strings():
         "vless_ping_country": "Страна",
         "vless_ping_host": "Сайт/домен",
         "vless_ping_avg": "Средний пинг, мс",
+        "vless_ping_dns": "DNS, мс",
+        "vless_ping_dns_cached": "кэш",
+        "vless_ping_min": "Мин., мс",
+        "vless_ping_jitter": "Джиттер, мс",
+        "vless_ping_loss": "Потери",
+        "vless_ping_probing": "Опрос хостов: {done}/{total}...",
+        "vless_ping_summary": "Опрошено хостов: {hosts} ({method}) за {seconds} с: ответили {ok}, недоступны {failed}",
         "vless_ping_error": "Ошибка",
         "vless_ping_continue": "Нажмите Enter для продолжения..."
     } 
\ No newline at end of file
@@ -5,7 +5,7 @@ def get_strings():
         # Security Sub-menu
         "security_menu_title": "Меню анализа безопасности",
         "security_menu_prompt": "Выберите инструмент для запуска",
-        "port_scan_option": "Сканер портов (ss)",
+        "port_scan_option": "Сканер портов",
         "ssh_config_option": "Анализ конфигурации SSH",
         "system_updates_option": "Проверка системных обновлений",
         "rootkit_check_option": "Сканер руткитов (chkrootkit)",
@@ -18,8 +18,6 @@ def get_strings():
         "address_col": "Локальный адрес:Порт",
         "process_col": "Процесс",
         "no_ports_msg": "[green]Открытых портов не найдено.[/green]",
-        "ss_not_found_err": "[red]Ошибка: команда 'ss' не найдена. Убедитесь, что утилиты iproute2 установлены.[/red]",
-        "ss_exec_err": "[red]Ошибка при выполнении 'ss': {e}[/red]",
 
         # run_security_analysis
         "start_security_analysis": "\n[bold cyan]=== Запуск анализа безопасности ===[/bold cyan]",
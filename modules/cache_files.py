@@ -0,0 +1,70 @@
+import os
+import pickle
+import stat
+import time
+from pathlib import Path
+
+CACHE_ROOT = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "linux_helper"
+# Кэш, которым не пользовались столько времени, удаляем: его лог давно ротирован и стёрт
+MAX_AGE = 30 * 86400
+
+
+def _trusted(st):
+    # Панель часто работает через sudo с сохранённым HOME: pickle из чужого
+    # или доступного на запись другим файла — это выполнение чужого кода от root
+    return stat.S_ISREG(st.st_mode) and st.st_uid == os.geteuid() and not st.st_mode & 0o022
+
+
+def load(path):
+    """Unpickled contents of a cache file, or None if it is missing, corrupt or not ours.
+
+    Only regular files owned by the current user and not writable by
+    anyone else are unpickled. A successful load refreshes the file's
+    mtime, which prune() treats as the last use.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_NOFOLLOW)
+    except OSError:
+        return None
+    with os.fdopen(fd, "rb") as f:
+        try:
+            if not _trusted(os.fstat(fd)):
+                return None
+            data = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError, AttributeError, ImportError):
+            return None
+        try:
+            os.utime(fd)
+        except OSError:
+            pass
+        return data
+
+
+def store(path, data):
+    """Pickles `data` into `path` atomically; the directory is created private to the user."""
+    path = Path(path)
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_NOFOLLOW, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def prune(directory, max_age=MAX_AGE):
+    """Removes cache files in `directory` unused for `max_age` seconds; returns how many."""
+    cutoff = time.time() - max_age
+    removed = 0
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return 0
+    for entry in entries:
+        try:
+            st = entry.stat(follow_symlinks=False)
+            if st.st_mtime < cutoff and st.st_uid == os.geteuid():
+                os.unlink(entry.path)
+                removed += 1
+        except OSError:
+            continue
+    return removed
@@ -0,0 +1,157 @@
+import os
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from modules.log_reader import Inotify, WATCH_MASK, IN_DELETE_SELF, IN_MOVE_SELF, IN_IGNORED, IN_Q_OVERFLOW
+
+# Без inotify размеры и mtime файлов перечитываются не чаще, чем раз в STAT_TTL секунд
+STAT_TTL = 2.0
+# Кроме изменений внутри каталога нужно знать, что удалён или перемещён он сам
+DIR_WATCH_MASK = WATCH_MASK | IN_DELETE_SELF | IN_MOVE_SELF
+
+
+class FileEntry(NamedTuple):
+    path: Path
+    size: int
+    mtime: float
+
+
+class _DirState(NamedTuple):
+    mtime_ns: int
+    scanned_at: float
+    files: list
+    subdirs: list
+
+
+class DirScanner:
+    """Cached recursive listing of regular files under `root`.
+
+    Each directory is read with one os.scandir pass. The file type comes
+    from d_type, and size/mtime come from DirEntry.stat(), which is a single
+    lstat per file. A directory is re-read only when inotify reports a
+    change in it. Without inotify, or for a directory it could not watch,
+    it is re-read when its own mtime changes or its stats are older than
+    `ttl` seconds.
+    """
+
+    def __init__(self, root, ttl=STAT_TTL):
+        self.root = os.fspath(root)
+        self.ttl = ttl
+        self._dirs = {}
+        self._watches = {}  # wd -> каталог
+        self._watched = {}  # каталог -> wd
+        self._dirty = set()
+        try:
+            self._inotify = Inotify()
+        except (OSError, AttributeError):
+            self._inotify = None
+
+    @property
+    def uses_inotify(self):
+        return self._inotify is not None
+
+    def close(self):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def _watch(self, directory):
+        if self._inotify is None or directory in self._watched:
+            return
+        try:
+            wd = self._inotify.watch(directory, DIR_WATCH_MASK)
+        except OSError:
+            return
+        self._watches[wd] = directory
+        self._watched[directory] = wd
+
+    def _unwatch(self, wd):
+        directory = self._watches.pop(wd, None)
+        if directory is not None and self._watched.get(directory) == wd:
+            del self._watched[directory]
+        return directory
+
+    def _process_events(self):
+        for wd, mask in self._inotify.read_events():
+            if mask & IN_Q_OVERFLOW:
+                # События потеряны — доверять кэшу нельзя ни для одного каталога
+                self._dirty.update(self._dirs)
+                continue
+            if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                # Каталог удалён или перемещён: наблюдение снимаем, чтобы
+                # заново созданный на его месте каталог получил своё
+                directory = self._unwatch(wd)
+            else:
+                directory = self._watches.get(wd)
+            if directory is not None:
+                self._dirty.add(directory)
+
+    def _scan_dir(self, directory, dir_mtime_ns):
+        # Наблюдение ставим до чтения: изменение во время scandir не потеряется
+        self._watch(directory)
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            st = entry.stat(follow_symlinks=False)
+                            files.append(FileEntry(Path(entry.path), st.st_size, st.st_mtime))
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return _DirState(dir_mtime_ns, time.monotonic(), files, subdirs)
+
+    def _is_fresh(self, directory, state):
+        # Без наблюдения (ENOSPC при исчерпании max_user_watches, EACCES)
+        # событий не будет — такой каталог проверяем по mtime и TTL
+        if self._inotify is not None and directory in self._watched:
+            return directory not in self._dirty
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            return False
+        return mtime_ns == state.mtime_ns and time.monotonic() - state.scanned_at < self.ttl
+
+    def entries(self):
+        """All regular files under root, from cache where nothing changed."""
+        if self._inotify is not None:
+            self._process_events()
+        result = []
+        seen = set()
+        stack = [self.root]
+        while stack:
+            directory = stack.pop()
+            seen.add(directory)
+            state = self._dirs.get(directory)
+            if state is None or not self._is_fresh(directory, state):
+                try:
+                    mtime_ns = os.stat(directory).st_mtime_ns
+                except OSError:
+                    continue
+                state = self._dirs[directory] = self._scan_dir(directory, mtime_ns)
+                self._dirty.discard(directory)
+            result.extend(state.files)
+            stack.extend(state.subdirs)
+        # Удалённые каталоги выкидываем из кэша
+        for directory in self._dirs.keys() - seen:
+            del self._dirs[directory]
+            self._dirty.discard(directory)
+        return result
+
+
+_scanners = {}
+
+
+def scan(root):
+    """Shared DirScanner for `root` (one per process, so the cache survives menu redraws)."""
+    key = os.fspath(root)
+    scanner = _scanners.get(key)
+    if scanner is None:
+        scanner = _scanners[key] = DirScanner(key)
+    return scanner.entries()
@@ -0,0 +1,297 @@
+import asyncio
+import ipaddress
+import os
+import secrets
+import socket
+import struct
+import time
+from typing import NamedTuple
+
+RESOLV_CONF = "/etc/resolv.conf"
+HOSTS_FILE = "/etc/hosts"
+QUERY_TIMEOUT = 1.0
+QUERY_ATTEMPTS = 2
+# TTL для ответов getaddrinfo, который TTL не сообщает
+SYSTEM_TTL = 300
+# Отрицательный ответ без SOA кэшируем на NEGATIVE_TTL (RFC 2308 советует брать минимум из SOA)
+NEGATIVE_TTL = 60
+MAX_TTL = 86400
+
+TYPE_A = 1
+TYPE_CNAME = 5
+TYPE_SOA = 6
+RCODE_NXDOMAIN = 3
+
+
+class Resolution(NamedTuple):
+    host: str
+    addresses: list
+    ttl: int
+    source: str        # "literal", "hosts", "dns", "system"
+    elapsed_ms: float  # время самого разрешения; для ответа из кэша — исходное
+    cached: bool = False
+    error: str = ""
+
+    @property
+    def ok(self):
+        return bool(self.addresses)
+
+    @property
+    def address(self):
+        return self.addresses[0] if self.addresses else ""
+
+
+class DnsError(Exception):
+    """The DNS server could not give a usable answer (timeout, SERVFAIL, truncation)."""
+
+
+def _encode_name(name):
+    out = b""
+    for label in name.rstrip(".").split("."):
+        raw = label.encode("idna")
+        if not raw or len(raw) > 63:
+            raise ValueError(f"bad label in {name!r}")
+        out += bytes([len(raw)]) + raw
+    return out + b"\0"
+
+
+def build_query(name, qid, qtype=TYPE_A):
+    # RD=1: просим сервер рекурсивно разрешить имя
+    return struct.pack("!HHHHHH", qid, 0x0100, 1, 0, 0, 0) + _encode_name(name) + struct.pack("!HH", qtype, 1)
+
+
+def _skip_name(data, pos):
+    while True:
+        length = data[pos]
+        if length >= 0xC0:  # указатель сжатия — имя на этом заканчивается
+            return pos + 2
+        pos += 1
+        if length == 0:
+            return pos
+        pos += length
+
+
+def parse_response(data, qid, name=None, qtype=TYPE_A):
+    """(rcode, [addresses], ttl) from a DNS response; ttl is the answer or SOA-minimum TTL.
+
+    With `name`, the echoed question must be exactly that name and type:
+    a matching 16-bit id alone is too easy to forge for a cached answer.
+    """
+    if len(data) < 12:
+        raise DnsError("short response")
+    rid, flags, qdcount, ancount, nscount, _ = struct.unpack("!HHHHHH", data[:12])
+    if rid != qid:
+        raise DnsError("id mismatch")
+    if flags & 0x0200:
+        raise DnsError("truncated")
+    rcode = flags & 0x000F
+    pos = 12
+    if name is not None:
+        question = _encode_name(name) + struct.pack("!HH", qtype, 1)
+        if qdcount != 1 or data[pos:pos + len(question)].lower() != question.lower():
+            raise DnsError("question mismatch")
+    for _ in range(qdcount):
+        pos = _skip_name(data, pos) + 4
+    addresses = []
+    ttl = None
+    for _ in range(ancount):
+        pos = _skip_name(data, pos)
+        rtype, _, rttl, rdlength = struct.unpack("!HHIH", data[pos:pos + 10])
+        pos += 10
+        if rtype == TYPE_A and rdlength == 4:
+            addresses.append(socket.inet_ntoa(data[pos:pos + 4]))
+        if rtype in (TYPE_A, TYPE_CNAME):
+            ttl = rttl if ttl is None else min(ttl, rttl)
+        pos += rdlength
+    if not addresses:
+        ttl = None
+        for _ in range(nscount):
+            pos = _skip_name(data, pos)
+            rtype, _, rttl, rdlength = struct.unpack("!HHIH", data[pos:pos + 10])
+            pos += 10
+            if rtype == TYPE_SOA:
+                # mname, rname, затем serial/refresh/retry/expire/minimum
+                end = _skip_name(data, _skip_name(data, pos))
+                minimum = struct.unpack("!I", data[end + 16:end + 20])[0]
+                ttl = min(rttl, minimum)
+            pos += rdlength
+    return rcode, addresses, ttl
+
+
+def read_nameservers(path=RESOLV_CONF):
+    servers = []
+    try:
+        with open(path) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] == "nameserver":
+                    servers.append((parts[1], 53))
+    except OSError:
+        pass
+    return servers
+
+
+class _QueryProtocol(asyncio.DatagramProtocol):
+    def __init__(self, waiter):
+        self.waiter = waiter
+
+    def datagram_received(self, data, addr):
+        if not self.waiter.done():
+            self.waiter.set_result(data)
+
+    def error_received(self, exc):
+        if not self.waiter.done():
+            self.waiter.set_exception(exc)
+
+
+class Resolver:
+    """Shared A-record resolver with a TTL-honoring positive and negative cache.
+
+    Names go through /etc/hosts first and then straight to the nameservers
+    from resolv.conf over UDP, so the answer TTL is known: positive answers
+    live for their TTL. NXDOMAIN/NODATA is checked with getaddrinfo, which
+    applies the search list and nsswitch; only if that fails too is the
+    name cached as missing, for the SOA minimum (RFC 2308). Single-label
+    names, truncated answers and unreachable servers fall back to
+    getaddrinfo with SYSTEM_TTL. Concurrent lookups of one name share a
+    single query.
+    """
+
+    def __init__(self, nameservers=None):
+        self._nameservers = nameservers
+        self._cache = {}     # host -> (expires, Resolution)
+        self._inflight = {}  # (loop, host) -> Future
+        self._hosts = {}
+        self._hosts_mtime = None
+
+    @property
+    def nameservers(self):
+        if self._nameservers is None:
+            self._nameservers = read_nameservers()
+        return self._nameservers
+
+    def clear(self):
+        self._cache.clear()
+
+    def cached(self, host):
+        entry = self._cache.get(host.lower())
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]._replace(cached=True)
+
+    def _hosts_lookup(self, host):
+        try:
+            mtime = os.stat(HOSTS_FILE).st_mtime
+        except OSError:
+            return None
+        if mtime != self._hosts_mtime:
+            self._hosts = {}
+            with open(HOSTS_FILE) as f:
+                for line in f:
+                    parts = line.split("#", 1)[0].split()
+                    if len(parts) >= 2 and "." in parts[0]:  # только IPv4
+                        for name in parts[1:]:
+                            self._hosts.setdefault(name.lower(), []).append(parts[0])
+            self._hosts_mtime = mtime
+        return self._hosts.get(host)
+
+    async def _query(self, host):
+        loop = asyncio.get_running_loop()
+        last_error = DnsError("no nameservers")
+        for attempt in range(QUERY_ATTEMPTS):
+            for server in self.nameservers:
+                qid = secrets.randbits(16)
+                waiter = loop.create_future()
+                try:
+                    transport, _ = await loop.create_datagram_endpoint(
+                        lambda: _QueryProtocol(waiter), remote_addr=server)
+                except OSError as e:
+                    last_error = e
+                    continue
+                try:
+                    transport.sendto(build_query(host, qid))
+                    data = await asyncio.wait_for(waiter, QUERY_TIMEOUT * (attempt + 1))
+                    return parse_response(data, qid, host)
+                except (asyncio.TimeoutError, OSError, DnsError, struct.error, IndexError) as e:
+                    last_error = e
+                finally:
+                    transport.close()
+        raise DnsError(str(last_error) or type(last_error).__name__)
+
+    async def _system(self, host):
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(host, None, family=socket.AF_INET, type=socket.SOCK_STREAM)
+        return list(dict.fromkeys(info[4][0] for info in infos))
+
+    async def _lookup(self, host):
+        started = time.perf_counter()
+
+        def done(addresses, ttl, source, error=""):
+            return Resolution(host, addresses, ttl, source, (time.perf_counter() - started) * 1000, error=error)
+
+        addresses = self._hosts_lookup(host)
+        if addresses:
+            return done(addresses, MAX_TTL, "hosts")
+        negative = None
+        if "." in host.strip("."):
+            try:
+                rcode, addresses, ttl = await self._query(host)
+            except (DnsError, ValueError):
+                pass
+            else:
+                if addresses:
+                    return done(addresses, min(SYSTEM_TTL if ttl is None else ttl, MAX_TTL), "dns")
+                if rcode in (0, RCODE_NXDOMAIN):
+                    error = "NXDOMAIN" if rcode == RCODE_NXDOMAIN else "no A records"
+                    negative = (min(ttl if ttl is not None else NEGATIVE_TTL, MAX_TTL), error)
+        # Отрицательный ответ сервера ещё не окончательный: search/ndots из
+        # resolv.conf, nsswitch (mdns, ldap) и .local знает только getaddrinfo
+        try:
+            return done(await self._system(host), SYSTEM_TTL, "system")
+        except (OSError, UnicodeError) as e:
+            if negative is not None:
+                return done([], negative[0], "dns", negative[1])
+            return done([], NEGATIVE_TTL, "system", getattr(e, "strerror", None) or str(e))
+
+    async def resolve(self, host):
+        """Resolution for `host`, from the cache while its TTL lasts."""
+        host = host.strip().lower()
+        try:
+            ipaddress.IPv4Address(host)
+            return Resolution(host, [host], MAX_TTL, "literal", 0.0)
+        except ValueError:
+            pass
+        hit = self.cached(host)
+        if hit is not None:
+            return hit
+        loop = asyncio.get_running_loop()
+        key = (loop, host)
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = loop.create_task(self._lookup(host))
+            task.add_done_callback(lambda t: self._finish(key, t))
+        # shield: таймаут одного ожидающего не отменяет общий запрос
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task):
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            result = task.result()
+            self._cache[key[1]] = (time.monotonic() + result.ttl, result)
+
+    async def resolve_many(self, hosts):
+        """{host: Resolution}; all lookups run concurrently."""
+        hosts = list(dict.fromkeys(hosts))
+        return dict(zip(hosts, await asyncio.gather(*(self.resolve(h) for h in hosts))))
+
+
+resolver = Resolver()
+
+
+def resolve(host):
+    """Synchronous lookup through the shared resolver."""
+    return asyncio.run(resolver.resolve(host))
+
+
+def resolve_many(hosts):
+    return asyncio.run(resolver.resolve_many(hosts))
@@ -0,0 +1,184 @@
+import json
+import os
+import shutil
+import subprocess
+from typing import NamedTuple
+
+from modules import cache_files
+
+CURSOR_FILE = cache_files.CACHE_ROOT / "journal_cursors.json"
+PRIORITIES = ("emerg", "alert", "crit", "err", "warning", "notice", "info", "debug")
+
+
+class JournalEntry(NamedTuple):
+    ts: float
+    priority: int
+    unit: str
+    pid: str
+    message: str
+    cursor: str
+
+
+class JournalQuery(NamedTuple):
+    """Filters passed straight to journalctl, so it never sends us what we would drop."""
+    unit: str = ""
+    priority: str = ""  # "err" или диапазон "warning..emerg", как в journalctl -p
+    since: str = ""     # любой формат journalctl: "2024-10-18 10:00", "-1h", "yesterday"
+    until: str = ""
+
+    def args(self):
+        args = []
+        if self.unit:
+            args += ["-u", self.unit]
+        if self.priority:
+            args += ["-p", self.priority]
+        if self.since:
+            args += ["--since", self.since]
+        if self.until:
+            args += ["--until", self.until]
+        return args
+
+    @property
+    def key(self):
+        return json.dumps(self._asdict(), sort_keys=True)
+
+
+def available():
+    return shutil.which("journalctl") is not None
+
+
+def _message(value):
+    # Бинарные сообщения journalctl отдаёт массивом байтов
+    if isinstance(value, list):
+        return bytes(value).decode("utf-8", "replace")
+    return value or ""
+
+
+def parse_entry(line):
+    """Builds a JournalEntry from one line of `journalctl -o json`."""
+    data = json.loads(line)
+    try:
+        priority = int(data.get("PRIORITY", 6))
+    except (TypeError, ValueError):
+        priority = 6
+    return JournalEntry(
+        ts=int(data.get("__REALTIME_TIMESTAMP", 0)) / 1_000_000,
+        priority=priority,
+        unit=data.get("_SYSTEMD_UNIT") or data.get("SYSLOG_IDENTIFIER") or "",
+        pid=data.get("_PID", ""),
+        message=_message(data.get("MESSAGE")),
+        cursor=data["__CURSOR"],
+    )
+
+
+def stream_entries(query=JournalQuery(), *, after_cursor=None, cursor=None, reverse=False, limit=None):
+    """Yields JournalEntry objects from `journalctl -o json` as they are read.
+
+    journalctl is stopped as soon as `limit` entries have been read, so a
+    page costs a page of output no matter how large the journal is.
+    `cursor` starts at that entry, `after_cursor` right after it; with
+    `reverse` the journal is walked from newest to oldest.
+    """
+    argv = ["journalctl", "-o", "json", "--no-pager", "--output-fields=__REALTIME_TIMESTAMP,PRIORITY,_SYSTEMD_UNIT,SYSLOG_IDENTIFIER,_PID,MESSAGE"]
+    argv += query.args()
+    if after_cursor:
+        argv.append(f"--after-cursor={after_cursor}")
+    elif cursor:
+        argv.append(f"--cursor={cursor}")
+    if reverse:
+        argv.append("--reverse")
+    proc = subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1)
+    count = 0
+    try:
+        for line in proc.stdout:
+            try:
+                entry = parse_entry(line)
+            except (ValueError, KeyError):
+                continue
+            count += 1
+            yield entry
+            if limit is not None and count >= limit:
+                break
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        error = proc.stderr.read().strip() if proc.wait() not in (0, -9) else ""
+        proc.stderr.close()
+        if error and count == 0:
+            raise RuntimeError(error)
+
+
+def load_cursor(query):
+    try:
+        with open(CURSOR_FILE) as f:
+            return json.load(f).get(query.key)
+    except (OSError, ValueError):
+        return None
+
+
+def save_cursor(query, cursor):
+    try:
+        with open(CURSOR_FILE) as f:
+            cursors = json.load(f)
+    except (OSError, ValueError):
+        cursors = {}
+    cursors[query.key] = cursor
+    CURSOR_FILE.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    tmp = CURSOR_FILE.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(cursors, f)
+    os.replace(tmp, CURSOR_FILE)
+
+
+class JournalPager:
+    """Pages through the journal by cursor instead of re-reading it from the start.
+
+    Each page is one short journalctl run anchored at a cursor of the
+    current page: older pages read backwards from the first entry, newer
+    ones forwards from the last.
+    """
+
+    def __init__(self, query=JournalQuery(), page_size=50):
+        self.query = query
+        self.page_size = page_size
+        self.page = []
+
+    def latest(self):
+        page = list(stream_entries(self.query, reverse=True, limit=self.page_size))
+        self.page = page[::-1]
+        return self.page
+
+    def resume(self):
+        """Opens at the saved cursor for this filter set, or at the newest entries."""
+        cursor = load_cursor(self.query)
+        if cursor:
+            page = list(stream_entries(self.query, cursor=cursor, limit=self.page_size))
+            if page:
+                self.page = page
+                return self.page
+        return self.latest()
+
+    def older(self):
+        """Moves to the previous page; returns [] (keeping the page) at the start of the journal."""
+        if not self.page:
+            return self.latest()
+        page = list(stream_entries(self.query, after_cursor=self.page[0].cursor, reverse=True, limit=self.page_size))
+        if not page:
+            return []
+        self.page = page[::-1]
+        return self.page
+
+    def newer(self):
+        """Moves to the next page; returns [] (keeping the page) at the end of the journal."""
+        if not self.page:
+            return self.latest()
+        page = list(stream_entries(self.query, after_cursor=self.page[-1].cursor, limit=self.page_size))
+        if page:
+            self.page = page
+        return page
+
+    def remember(self):
+        """Stores the position of the current page for the next resume()."""
+        if self.page:
+            save_cursor(self.query, self.page[0].cursor)
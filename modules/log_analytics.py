@@ -0,0 +1,240 @@
+import lzma
+import os
+import re
+import time
+import zlib
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from modules import cache_files
+from modules.sketches import SpaceSaving, CountMinSketch
+from modules.log_stream import open_log, line_time, generations, COMPRESSED_SUFFIXES
+from modules.log_parallel import split_chunks, read_range, run_tasks
+
+STATS_DIR = cache_files.CACHE_ROOT / "log_stats"
+STATS_VERSION = 2
+
+IP_RE = re.compile(rb"(?<![\d.])\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}(?![\d.])")
+FAILED_SSH_RE = re.compile(rb"(?:Failed \S+ for (?:invalid user )?|Invalid user )(\S+) from (\S+)")
+# Ошибки чтения одного файла (битый архив, нет zstd), после которых остальные файлы анализируются дальше
+READ_ERRORS = (OSError, EOFError, lzma.LZMAError, zlib.error)
+# Combined/common формат nginx и apache: ip - user [10/Oct/2024:13:55:36 +0300] "GET / HTTP/1.1" 200 ...
+ACCESS_RE = re.compile(rb'^(\S+) \S+ \S+ \[([^\]]+)\] "[^"]*" (\d{3}) ')
+
+
+class LogStats:
+    """Results of one pass over a log: per-minute histogram and top sources."""
+
+    def __init__(self):
+        self.lines = 0
+        self.first_ts = None
+        self.last_ts = None
+        self.per_minute = Counter()
+        self.ips = SpaceSaving()
+        self.failed_users = SpaceSaving()
+        self.statuses = Counter()
+        self.ip_sketch = CountMinSketch()
+        self.skipped = []  # [(path, error)] файлов, которые не удалось прочитать
+
+    def merge(self, other):
+        self.lines += other.lines
+        self.skipped.extend(other.skipped)
+        if other.first_ts is not None:
+            self.first_ts = other.first_ts if self.first_ts is None else min(self.first_ts, other.first_ts)
+            self.last_ts = other.last_ts if self.last_ts is None else max(self.last_ts, other.last_ts)
+        self.per_minute.update(other.per_minute)
+        self.ips.merge(other.ips)
+        self.failed_users.merge(other.failed_users)
+        self.statuses.update(other.statuses)
+        self.ip_sketch.merge(other.ip_sketch)
+        return self
+
+    @property
+    def peak_minute(self):
+        if not self.per_minute:
+            return None, 0
+        return max(self.per_minute.items(), key=lambda kv: kv[1])
+
+    def rate(self):
+        """Average events per second over the covered time span."""
+        if self.first_ts is None or self.last_ts <= self.first_ts:
+            return 0.0
+        return self.lines / (self.last_ts - self.first_ts)
+
+    def top_ips(self, n=10):
+        """Top IPs; each count is the tighter of the space-saving and count-min overestimates."""
+        estimate = self.ip_sketch.estimate
+        rows = [(ip, min(count, estimate(ip)), self.ips.floor) for ip, count in self.ips.counts.items()]
+        rows.sort(key=lambda row: row[1], reverse=True)
+        return rows[:n]
+
+    def histogram(self, buckets, end=None):
+        """Events per minute for the last `buckets` minutes before `end` (default: last event)."""
+        end_minute = int((end if end is not None else self.last_ts or 0) // 60)
+        return [self.per_minute.get(m, 0) for m in range(end_minute - buckets + 1, end_minute + 1)]
+
+
+def _access_time(raw):
+    try:
+        return datetime.strptime(raw.decode(), "%d/%b/%Y:%H:%M:%S %z").timestamp()
+    except ValueError:
+        return None
+
+
+def analyze_stream(lines, end_year, end_month):
+    """One pass over raw byte lines; returns LogStats."""
+    stats = LogStats()
+    per_minute = stats.per_minute
+    statuses = stats.statuses
+    add_ip = stats.ips.add
+    add_ip_sketch = stats.ip_sketch.add
+    add_user = stats.failed_users.add
+    last_ts = None
+    # Соседние строки обычно из одной секунды: одинаковое начало строки
+    # (syslog "Oct 18 13:00:00", ISO "2024-10-18T13:00:00") не разбираем повторно
+    last_prefix = None
+    for raw in lines:
+        stats.lines += 1
+        access = ACCESS_RE.match(raw)
+        if access:
+            ip, when, status = access.groups()
+            if when != last_prefix:
+                last_prefix = when
+                ts = _access_time(when)
+            statuses[status.decode()] += 1
+            ips = (ip,)
+        else:
+            prefix = raw[:19]
+            if prefix != last_prefix:
+                last_prefix = prefix
+                ts = line_time(raw, end_year, end_month)
+            ips = IP_RE.findall(raw) if b"." in raw else ()
+            if b" from " in raw:
+                failed = FAILED_SSH_RE.search(raw)
+                if failed:
+                    add_user(failed.group(1).decode("utf-8", "replace"))
+        for ip in ips:
+            add_ip(ip.decode())
+            add_ip_sketch(ip)
+        if ts is None:
+            ts = last_ts
+            if ts is None:
+                continue
+        last_ts = ts
+        per_minute[int(ts // 60)] += 1
+        if stats.first_ts is None or ts < stats.first_ts:
+            stats.first_ts = ts
+        if stats.last_ts is None or ts > stats.last_ts:
+            stats.last_ts = ts
+    return stats
+
+
+def _cache_path(st):
+    return STATS_DIR / f"{st.st_dev}-{st.st_ino}.stats"
+
+
+def _stamp(st):
+    return (STATS_VERSION, st.st_size, st.st_mtime_ns)
+
+
+def cached_stats(path):
+    """Cached LogStats for `path` if the file has not changed since, else None."""
+    st = os.stat(path)
+    cached = cache_files.load(_cache_path(st))
+    if isinstance(cached, tuple) and len(cached) == 2 and cached[0] == _stamp(st):
+        return cached[1]
+    return None
+
+
+def store_stats(path, stats, st=None):
+    """Caches `stats` for `path`; `st` is the stat the stats were computed for."""
+    st = st or os.stat(path)
+    try:
+        cache_files.store(_cache_path(st), (_stamp(st), stats))
+    except OSError:
+        pass
+
+
+_pruned = False
+
+
+def prune_cache():
+    """Once per session: drops cached stats of logs not analyzed for a long time."""
+    global _pruned
+    if not _pruned:
+        _pruned = True
+        cache_files.prune(STATS_DIR)
+
+
+def _analyze_task(task):
+    """Process-pool worker: (LogStats, None) for one chunk (or a whole compressed file), or (None, error)."""
+    path, start, end, year, month = task
+    try:
+        if end is None:
+            with open_log(path) as f:
+                return analyze_stream(f, year, month), None
+        return analyze_stream(read_range(path, start, end), year, month), None
+    except READ_ERRORS as e:
+        # Ошибку возвращаем, а не бросаем: иначе один битый файл прервёт весь пул
+        return None, str(e) or type(e).__name__
+
+
+def analyze_files(paths, workers=None):
+    """Merged LogStats over many files, fanned out over a process pool.
+
+    Cached files are merged as is. Plain files are split into chunks at
+    newline boundaries; compressed ones cannot be split and go whole. Each
+    file's chunk results are merged and cached as that file's stats. A
+    file that fails to read is left out and listed in `skipped`.
+    """
+    prune_cache()
+    total = LogStats()
+    tasks = []
+    owners = []
+    pending = {}
+    errors = {}
+    total_bytes = 0
+    for path in paths:
+        try:
+            stats = cached_stats(path)
+            if stats is not None:
+                total.merge(stats)
+                continue
+            st = os.stat(path)
+            if Path(path).suffix in COMPRESSED_SUFFIXES:
+                ranges = [(0, None)]
+            else:
+                ranges = split_chunks(path)
+        except OSError as e:
+            total.skipped.append((path, str(e)))
+            continue
+        end = time.localtime(st.st_mtime)
+        for start, stop in ranges:
+            tasks.append((str(path), start, stop, end.tm_year, end.tm_mon))
+            owners.append(path)
+        pending[path] = (st, LogStats())
+        total_bytes += st.st_size
+    for path, (stats, error) in zip(owners, run_tasks(_analyze_task, tasks, total_bytes, workers)):
+        if error is not None:
+            errors.setdefault(path, error)
+        else:
+            pending[path][1].merge(stats)
+    for path, (st, stats) in pending.items():
+        if path in errors:
+            total.skipped.append((path, errors[path]))
+            continue
+        store_stats(path, stats, st)
+        total.merge(stats)
+    return total
+
+
+def analyze_log(path, include_rotated=True, workers=None):
+    """Merged LogStats over a log and (optionally) its rotated generations.
+
+    Each generation is analyzed and cached separately; rotated files never
+    change, so after the first run only the live file is re-read.
+    """
+    gens = generations(path) if include_rotated else []
+    files = [g.path for g in gens] or [Path(path)]
+    return analyze_files(files, workers), files
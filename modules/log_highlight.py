@@ -0,0 +1,202 @@
+import re
+from collections import OrderedDict
+
+from rich.cells import cell_len
+from rich.measure import Measurement
+from rich.segment import Segment
+from rich.style import Style
+from rich.text import Span, Text
+
+# Сколько подсвеченных строк держать в кэше: несколько экранов пейджера с запасом
+CACHE_LINES = 4096
+
+# Начало строки: syslog/auth (классический и ISO-штамп rsyslog), nginx/apache access, dpkg
+SYSLOG_RE = re.compile(
+    r"(?P<ts>[A-Z][a-z]{2} [ \d]\d \d\d:\d\d:\d\d|\d{4}-\d\d-\d\dT\S+) "
+    r"(?P<host>\S+) (?P<prog>[^\s\[:]+)(?:\[(?P<pid>\d+)\])?:"
+)
+ACCESS_RE = re.compile(
+    r'(?P<ip>\S+) \S+ (?P<user>\S+) (?P<ts>\[[^\]]+\]) '
+    r'(?P<request>"[^"]*") (?P<status>\d{3}) (?P<bytes>\d+|-)'
+)
+DPKG_RE = re.compile(
+    r"(?P<ts>\d{4}-\d\d-\d\d \d\d:\d\d:\d\d) "
+    r"(?:(?P<action>install|upgrade|remove|purge|configure|trigproc|startup|status)"
+    r"(?: (?P<state>half-installed|half-configured|unpacked|installed|not-installed|config-files|triggers-pending|triggers-awaited))?"
+    r" (?P<package>\S+))?"
+)
+
+PREFIX_RULES = (SYSLOG_RE, ACCESS_RE, DPKG_RE)
+
+# Токены в любом месте строки; одна альтернатива с именованными группами — один проход regex.
+# Общий \b(?=\w) впереди отсекает позиции внутри слов и между ними до перебора альтернатив
+TOKEN_RE = re.compile(
+    r"\b(?=\w)(?:"
+    r"(?P<error>(?:error|errors|fail|failed|failure|fatal|critical|crit|panic|denied|refused|invalid|segfault)\b)"
+    r"|(?P<warning>(?:warn|warning|timeout|timed out|deprecated|retry|retrying)\b)"
+    r"|(?P<ok>(?:accepted|success|succeeded|started|session opened|ok)\b)"
+    r"|(?<![.:])(?P<ip>\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?(?![\w.]))"
+    r"|(?P<key>[\w.-]+)=)",
+    re.IGNORECASE,
+)
+
+STYLES = {
+    "ts": "green",
+    "host": "blue",
+    "prog": "magenta",
+    "pid": "dim",
+    "user": "yellow",
+    "request": "white",
+    "bytes": "dim",
+    "action": "bold magenta",
+    "state": "yellow",
+    "package": "cyan",
+    "error": "bold red",
+    "warning": "yellow",
+    "ok": "green",
+    "ip": "cyan",
+    "key": "dim cyan",
+}
+STATUS_STYLES = {"2": "green", "3": "cyan", "4": "yellow", "5": "bold red"}
+GUTTER_STYLE = Style(dim=True)
+ELLIPSIS = Segment("…")
+
+
+_STYLES = {}
+
+
+def _style(name):
+    # Style.parse на каждый спан заметен при тысячах строк: разбираем один раз
+    style = _STYLES.get(name)
+    if style is None:
+        style = _STYLES[name] = Style.parse(name)
+    return style
+
+
+def _status_style(first_digit):
+    return _style(STATUS_STYLES.get(first_digit, "white"))
+
+
+_PREFIX_GROUPS = [
+    (rule, sorted((index, name) for name, index in rule.groupindex.items()))
+    for rule in PREFIX_RULES
+]
+
+
+class LineHighlighter:
+    """Regex highlighter for single log lines, with a bounded per-line cache.
+
+    Unlike rich.Syntax, which re-lexes the whole text with pygments, each
+    line is styled on its own: one anchored match for the known line
+    prefixes and one pass of a combined token regex over the rest. Results
+    are kept in an LRU cache, so scrolling back over a screen costs a dict
+    lookup. Callers get a copy they are free to truncate or rstrip.
+    """
+
+    def __init__(self, cache_lines=CACHE_LINES):
+        self.cache_lines = cache_lines
+        self._cache = OrderedDict()
+
+    def segments(self, line):
+        """Styled segments of one line, without the line break; shared, do not modify."""
+        cache = self._cache
+        segments = cache.get(line)
+        if segments is not None:
+            cache.move_to_end(line)
+            return segments
+        segments = cache[line] = self._segments(line)
+        if len(cache) > self.cache_lines:
+            cache.popitem(last=False)
+        return segments
+
+    def highlight(self, line):
+        spans = []
+        pos = 0
+        for text, style, _ in self.segments(line):
+            if style is not None:
+                spans.append(Span(pos, pos + len(text), style))
+            pos += len(text)
+        return Text(line, spans=spans, end="")
+
+    def render(self, lines, line_numbers=False, start=1):
+        """A renderable for many lines, optionally with a line-number gutter.
+
+        Long lines are cut at the console width, as rich.Syntax does
+        without word_wrap, instead of being wrapped.
+        """
+        return HighlightedLines(self, lines, line_numbers, start)
+
+    @staticmethod
+    def _segments(line):
+        segments = []
+        pos = rest = 0
+
+        def add(begin, end, style):
+            nonlocal pos
+            if begin < pos or begin == end:
+                return
+            if begin > pos:
+                segments.append(Segment(line[pos:begin]))
+            segments.append(Segment(line[begin:end], style))
+            pos = end
+
+        for rule, groups in _PREFIX_GROUPS:
+            match = rule.match(line)
+            if match:
+                # Группы префиксов идут в строке слева направо, сортировать не нужно
+                for index, name in groups:
+                    begin, end = match.span(index)
+                    if begin < 0:
+                        continue
+                    add(begin, end, _status_style(line[begin]) if name == "status" else _style(STYLES[name]))
+                rest = match.end()
+                break
+        for match in TOKEN_RE.finditer(line, rest):
+            name = match.lastgroup
+            begin, end = match.span(name)
+            add(begin, end, _style(STYLES[name]))
+        if pos < len(line):
+            segments.append(Segment(line[pos:]))
+        return segments
+
+
+class HighlightedLines:
+    """Lines rendered straight to segments, one row per line.
+
+    rich.Text would join the lines, split them again and measure every
+    span to crop them; here each line is cropped on its own and ASCII
+    lines are measured by len().
+    """
+
+    def __init__(self, highlighter, lines, line_numbers=False, start=1):
+        self.highlighter = highlighter
+        self.lines = lines
+        self.line_numbers = line_numbers
+        self.start = start
+
+    @property
+    def _gutter(self):
+        return len(str(self.start + len(self.lines) - 1)) + 1 if self.line_numbers else 0
+
+    @staticmethod
+    def _width(line):
+        return len(line) if line.isascii() else cell_len(line)
+
+    def __rich_console__(self, console, options):
+        gutter = self._gutter
+        room = max(options.max_width - gutter, 1)
+        new_line = Segment.line()
+        for number, line in enumerate(self.lines, self.start):
+            if gutter:
+                yield Segment(f"{number:>{gutter - 1}} ", GUTTER_STYLE)
+            segments = self.highlighter.segments(line)
+            if self._width(line) > room:
+                segments = Segment.adjust_line_length(segments, room - 1, pad=False)
+                segments.append(ELLIPSIS)
+            yield from segments
+            yield new_line
+
+    def __rich_measure__(self, console, options):
+        widest = max((self._width(line) for line in self.lines), default=0) + self._gutter
+        widest = min(widest, options.max_width)
+        return Measurement(widest, widest)
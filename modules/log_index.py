@@ -0,0 +1,385 @@
+import hashlib
+import os
+import re
+import time
+from array import array
+from collections import deque
+
+from modules import cache_files
+from modules.dir_scan import scan
+from modules.log_parallel import PARALLEL_MIN_BYTES, read_range, run_tasks, split_chunks
+
+# Индексы кладём по (st_dev, st_ino): после logrotate файл auth.log
+# становится auth.log.1 с тем же inode и продолжает пользоваться своим индексом.
+# Inode могут переиспользовать, поэтому индекс ещё сверяется с началом файла.
+INDEX_DIR = cache_files.CACHE_ROOT / "log_index"
+INDEX_VERSION = 2
+FINGERPRINT_BYTES = 4096
+READ_CHUNK = 4 * 1024 * 1024
+# Сохранять индекс на диск не чаще, чем раз в SAVE_INTERVAL секунд, если
+# с прошлого сохранения добавилось меньше SAVE_BYTES; остальное — в flush_indexes()
+SAVE_INTERVAL = 60.0
+SAVE_BYTES = 16 * 1024 * 1024
+
+# IPv4-адреса и "слова" от 3 символов, начинающиеся с буквы: имена
+# пользователей, сервисов, ключевые слова. Время и голые числа не индексируем.
+TOKEN_RE = re.compile(rb"\d{1,3}(?:\.\d{1,3}){3}|[a-z_][a-z0-9_.@:-]{2,}")
+
+# Бинарные журналы входа и сжатые архивы индексировать бессмысленно
+SKIP_SUFFIXES = (".gz", ".xz", ".bz2", ".zst", ".journal")
+SKIP_NAMES = {"wtmp", "btmp", "lastlog", "faillog"}
+
+_loaded = {}  # (dev, ino) -> LogIndex, кэш на время работы панели
+
+
+def tokenize(text):
+    """Splits a query or a line (str or bytes) into lowercase index tokens."""
+    if isinstance(text, str):
+        text = text.encode("utf-8", "ignore")
+    return [t.rstrip(b".:-") for t in TOKEN_RE.findall(text.lower())]
+
+
+class LogIndex:
+    """Line-offset + token index for one log file.
+
+    offsets[n] is the byte offset of line n; postings maps a token to the
+    sorted line numbers that contain it (a bare int for a single line).
+    The index covers the file up to `indexed_size` (always on a line
+    boundary), so when the file grows only the appended bytes are indexed.
+    """
+
+    def __init__(self, dev, ino):
+        self.dev = dev
+        self.ino = ino
+        self.path = None
+        self.indexed_size = 0
+        self.offsets = array("Q")
+        self.postings = {}
+        self.fingerprint = b""
+        self.fingerprint_bytes = 0
+        self.mtime_ns = 0
+        self._saved_size = 0
+        self._saved_at = 0.0
+
+    @property
+    def line_count(self):
+        return len(self.offsets)
+
+    @property
+    def cache_file(self):
+        return INDEX_DIR / f"{self.dev}-{self.ino}.idx"
+
+    def _index_range(self, f, start):
+        f.seek(start)
+        pos = start
+        lineno = len(self.offsets)
+        postings = self.postings
+        offsets = self.offsets
+        tail = b""
+        while True:
+            chunk = f.read(READ_CHUNK)
+            if not chunk:
+                break
+            data = tail + chunk
+            lines = data.split(b"\n")
+            tail = lines.pop()
+            for line in lines:
+                offsets.append(pos)
+                for token in set(tokenize(line)):
+                    plist = postings.get(token)
+                    if plist is None:
+                        # Большинство токенов (IP, pid-ы) встречаются один раз:
+                        # храним голое число, массив заводим со второго вхождения
+                        postings[token] = lineno
+                    elif type(plist) is int:
+                        postings[token] = array("I", (plist, lineno))
+                    else:
+                        plist.append(lineno)
+                lineno += 1
+                pos += len(line) + 1
+        # Недописанную последнюю строку проиндексируем в следующий раз
+        self.indexed_size = pos
+
+    def _reset(self):
+        self.indexed_size = 0
+        self.offsets = array("Q")
+        self.postings = {}
+        self.fingerprint = b""
+        self.fingerprint_bytes = 0
+
+    def _matches(self, f, st):
+        """Whether the indexed part of the file is still the content that was indexed."""
+        if st.st_size < self.indexed_size:
+            return False  # файл обрезали (copytruncate)
+        if st.st_size == self.indexed_size and st.st_mtime_ns != self.mtime_ns:
+            return False  # переписан на месте
+        if _fingerprint(f, self.fingerprint_bytes) != self.fingerprint:
+            return False  # другой файл на том же inode или обрезан и снова дорос
+        f.seek(self.indexed_size - 1)
+        return f.read(1) == b"\n"
+
+    def update(self, path):
+        """Brings the index up to date with `path`; returns the number of bytes indexed."""
+        self.path = os.fspath(path)
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            if self.indexed_size and not self._matches(f, st):
+                self._reset()
+            self.mtime_ns = st.st_mtime_ns
+            if st.st_size == self.indexed_size:
+                return 0
+            start = self.indexed_size
+            self._index_range(f, start)
+            if self.fingerprint_bytes < FINGERPRINT_BYTES:
+                self.fingerprint_bytes = min(FINGERPRINT_BYTES, self.indexed_size)
+                self.fingerprint = _fingerprint(f, self.fingerprint_bytes)
+            return self.indexed_size - start
+
+    def save(self):
+        state = {k: v for k, v in self.__dict__.items() if not k.startswith("_")}
+        cache_files.store(self.cache_file, (INDEX_VERSION, state))
+        self._saved_size = self.indexed_size
+        self._saved_at = time.monotonic()
+
+    @property
+    def dirty(self):
+        return self.indexed_size != self._saved_size
+
+    def maybe_save(self):
+        """Saves if enough new data was indexed or the last save is old enough."""
+        if not self.dirty:
+            return
+        if self.indexed_size - self._saved_size >= SAVE_BYTES or time.monotonic() - self._saved_at >= SAVE_INTERVAL:
+            try:
+                self.save()
+            except OSError:
+                pass
+
+    @classmethod
+    def load(cls, dev, ino):
+        index = cls(dev, ino)
+        cached = cache_files.load(index.cache_file)
+        if isinstance(cached, tuple) and len(cached) == 2 and cached[0] == INDEX_VERSION:
+            index.__dict__.update(cached[1])
+            index._saved_size = index.indexed_size
+            index._saved_at = time.monotonic()
+        return index
+
+    def _expand(self, term):
+        if term.endswith(b"*"):
+            prefix = term[:-1]
+            lines = set()
+            for token, plist in self.postings.items():
+                if token.startswith(prefix):
+                    if type(plist) is int:
+                        lines.add(plist)
+                    else:
+                        lines.update(plist)
+            return sorted(lines)
+        plist = self.postings.get(term, ())
+        return (plist,) if type(plist) is int else plist
+
+    def lookup(self, terms):
+        """Line numbers that contain every term (a trailing '*' matches a token prefix)."""
+        result = None
+        for plist in sorted((self._expand(t) for t in terms), key=len):
+            if result is None:
+                result = set(plist)
+            else:
+                result.intersection_update(plist)
+            if not result:
+                return []
+        return sorted(result or ())
+
+    def read_lines(self, path, line_numbers):
+        """Yields (line_number, text) for the given line numbers."""
+        with open(path, "rb") as f:
+            for n in line_numbers:
+                f.seek(self.offsets[n])
+                yield n + 1, f.readline().rstrip(b"\n").decode("utf-8", "ignore")
+
+
+def _fingerprint(f, length):
+    f.seek(0)
+    return hashlib.blake2b(f.read(length), digest_size=16).digest()
+
+
+def get_index(path):
+    """Returns an up-to-date LogIndex for `path`, loading/saving the on-disk copy."""
+    st = os.stat(path)
+    key = (st.st_dev, st.st_ino)
+    index = _loaded.get(key)
+    if index is None:
+        index = _loaded[key] = LogIndex.load(*key)
+    if index.update(path):
+        index.maybe_save()
+    return index
+
+
+def flush_indexes():
+    """Writes every index changed in this session to disk (call when leaving search)."""
+    for index in _loaded.values():
+        if index.dirty:
+            try:
+                index.save()
+            except OSError:
+                pass
+
+
+def _query_terms(query):
+    terms = []
+    for word in query.lower().split():
+        star = word.endswith("*")
+        tokens = tokenize(word.rstrip("*"))
+        if star and tokens:
+            tokens[-1] += b"*"
+        terms.extend(tokens)
+    return terms
+
+
+def search_file(path, query, limit=200):
+    """Searches one log file; returns (matches, stats).
+
+    matches is a list of (line_number, text) for lines containing every
+    query token; stats has 'indexed_ms' and 'query_ms'. Queries without
+    indexable tokens fall back to a plain case-insensitive scan.
+    """
+    t0 = time.perf_counter()
+    index = get_index(path)
+    t1 = time.perf_counter()
+    terms = _query_terms(query)
+    if terms:
+        candidates = index.lookup(terms)
+        matches = list(index.read_lines(path, candidates[-limit:]))
+    else:
+        needle = query.lower()
+        matches = []
+        with open(path, "rb") as f:
+            for n, raw in enumerate(f, 1):
+                text = raw.rstrip(b"\n").decode("utf-8", "ignore")
+                if needle in text.lower():
+                    matches.append((n, text))
+        matches = matches[-limit:]
+    t2 = time.perf_counter()
+    return matches, {"indexed_ms": (t1 - t0) * 1000, "query_ms": (t2 - t1) * 1000}
+
+
+def searchable_files(log_dir):
+    """Plain-text logs under `log_dir`, rotated copies (auth.log.1) included."""
+    files = []
+    for entry in scan(log_dir):
+        path = entry.path
+        if path.suffix in SKIP_SUFFIXES or path.name.split(".")[0] in SKIP_NAMES:
+            continue
+        files.append(path)
+    return sorted(files)
+
+
+def _update_task(path):
+    """Process-pool worker: brings the on-disk index of `path` up to date."""
+    st = os.stat(path)
+    index = LogIndex.load(st.st_dev, st.st_ino)
+    if index.update(path):
+        index.save()
+    return path
+
+
+def _prepare_indexes(paths, workers=None):
+    """Builds/updates indexes of files not loaded yet in parallel worker processes.
+
+    Workers write the indexes to disk; get_index() then only loads them.
+    Files already in memory are left to get_index(), whose incremental
+    update is cheap.
+    """
+    flush_indexes()
+    if not _loaded:
+        # Раз за сеанс: индексы давно ротированных и удалённых логов
+        cache_files.prune(INDEX_DIR)
+    todo = []
+    total = 0
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if (st.st_dev, st.st_ino) not in _loaded:
+            todo.append(path)
+            total += st.st_size
+    if total >= PARALLEL_MIN_BYTES:
+        run_tasks(_update_task, todo, total, workers)
+
+
+def _grep_task(task):
+    """Process-pool worker: case-insensitive substring scan of one chunk.
+
+    Returns (lines in chunk, [(line number within chunk, text)]) with at
+    most `limit` last matches.
+    """
+    path, start, end, needle, limit = task
+    matches = deque(maxlen=limit)
+    ascii_needle = needle.isascii()
+    needle_bytes = needle.encode()
+    count = 0
+    for count, raw in enumerate(read_range(path, start, end), 1):
+        if ascii_needle:
+            if needle_bytes not in raw.lower():
+                continue
+            text = raw.rstrip(b"\n").decode("utf-8", "ignore")
+        else:
+            text = raw.rstrip(b"\n").decode("utf-8", "ignore")
+            if needle not in text.lower():
+                continue
+        matches.append((count, text))
+    return count, list(matches)
+
+
+def grep_logs(paths, query, limit=200, workers=None):
+    """Plain scan for `query` over all files, chunked at newlines across processes."""
+    needle = query.lower()
+    tasks = []
+    total = 0
+    for path in paths:
+        try:
+            chunks = split_chunks(path)
+        except OSError:
+            continue
+        tasks.extend((path, start, end, needle, limit) for start, end in chunks)
+        total += chunks[-1][1]
+    results = []
+    line_base = {}
+    for (path, *_), (count, matches) in zip(tasks, run_tasks(_grep_task, tasks, total, workers)):
+        base = line_base.get(path, 0)
+        results.extend((path, base + n, text) for n, text in matches)
+        line_base[path] = base + count
+    return results[-limit:], len(line_base)
+
+
+def search_logs(paths, query, limit=200, workers=None):
+    """Searches several logs; returns ([(path, line, text)], stats).
+
+    Token queries go through the per-file indexes (built in parallel on
+    first use); queries without indexable tokens are a parallel plain scan.
+    Unreadable files are skipped and counted in stats['skipped'].
+    """
+    stats = {"files": 0, "skipped": 0, "indexed_ms": 0.0, "query_ms": 0.0}
+    if not _query_terms(query):
+        t0 = time.perf_counter()
+        results, stats["files"] = grep_logs(paths, query, limit, workers)
+        stats["skipped"] = len(paths) - stats["files"]
+        stats["query_ms"] = (time.perf_counter() - t0) * 1000
+        return results, stats
+    t0 = time.perf_counter()
+    _prepare_indexes(paths, workers)
+    stats["indexed_ms"] += (time.perf_counter() - t0) * 1000
+    results = []
+    for path in paths:
+        try:
+            matches, file_stats = search_file(path, query, limit)
+        except (OSError, ValueError):
+            stats["skipped"] += 1
+            continue
+        stats["files"] += 1
+        stats["indexed_ms"] += file_stats["indexed_ms"]
+        stats["query_ms"] += file_stats["query_ms"]
+        results.extend((path, n, text) for n, text in matches)
+    return results[-limit:], stats
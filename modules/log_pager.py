@@ -0,0 +1,388 @@
+import mmap
+import os
+import re
+import time
+from array import array
+from bisect import bisect_right
+from datetime import datetime
+
+from rich.console import Console, Group
+from rich.live import Live
+from rich.panel import Panel
+from rich.text import Text
+
+from localization import get_string
+from modules.log_highlight import LineHighlighter
+from modules.log_stream import line_time
+from modules.terminal import KeyReader, InlinePrompt
+
+console = Console()
+
+# Контрольная точка индекса строк на каждые CHECKPOINT_BYTES файла
+CHECKPOINT_BYTES = 4 * 1024 * 1024
+# Сколько байт индексировать за один простой в цикле отрисовки: на холодном
+# кэше это чтение с диска, и клавиши ждут, пока оно не закончится
+IDLE_INDEX_BYTES = 2 * CHECKPOINT_BYTES
+# Разбор строки целиком не нужен для поиска по времени — хватит начала
+TIME_PROBE_BYTES = 64
+
+
+class LineIndex:
+    """Sparse newline index over a memory-mapped file.
+
+    Only the number of lines before every CHECKPOINT_BYTES boundary is
+    stored, so the index for a 10 GB file is a few thousand integers.
+    It is built lazily (bytes.count over mmap slices runs at memory speed)
+    and only as far as a lookup needs.
+    """
+
+    def __init__(self, mm):
+        self.mm = mm
+        self.size = len(mm)
+        # lines_before[i] — число '\n' в mm[:i * CHECKPOINT_BYTES]
+        self.lines_before = array("Q", [0])
+        self.total_lines = None if self.size else 0
+
+    def grow(self, mm):
+        """Switches to a remapped, longer file; checkpoints over the old bytes stay valid."""
+        self.mm = mm
+        self.size = len(mm)
+        # Последняя строка могла быть дописана, а новые байты ещё не посчитаны
+        self.total_lines = None if self.size else 0
+
+    @property
+    def indexed_bytes(self):
+        return min((len(self.lines_before) - 1) * CHECKPOINT_BYTES, self.size)
+
+    @property
+    def complete(self):
+        return self.total_lines is not None
+
+    def extend(self, max_bytes=IDLE_INDEX_BYTES):
+        """Indexes up to `max_bytes` more of the file; returns False when done."""
+        if self.complete:
+            return False
+        mm = self.mm
+        end = min(self.indexed_bytes + max_bytes, self.size)
+        while self.indexed_bytes < end:
+            start = self.indexed_bytes
+            stop = min(start + CHECKPOINT_BYTES, self.size)
+            count = mm[start:stop].count(b"\n")
+            if stop == self.size:
+                last = self.lines_before[-1] + count
+                # Последняя строка без '\n' — тоже строка
+                if self.size and mm[self.size - 1:self.size] != b"\n":
+                    last += 1
+                self.total_lines = last
+                return False
+            self.lines_before.append(self.lines_before[-1] + count)
+        return not self.complete
+
+    def _ensure_offset(self, offset):
+        while not self.complete and self.indexed_bytes <= offset:
+            self.extend(CHECKPOINT_BYTES)
+
+    def line_number(self, offset, build=True):
+        """0-based number of the line starting at `offset`, or None if not indexed yet."""
+        if build:
+            self._ensure_offset(offset)
+        elif not self.complete and offset >= self.indexed_bytes:
+            return None
+        block = min(offset // CHECKPOINT_BYTES, len(self.lines_before) - 1)
+        start = block * CHECKPOINT_BYTES
+        return self.lines_before[block] + self.mm[start:offset].count(b"\n")
+
+    def offset_of_line(self, number):
+        """Byte offset where 0-based line `number` starts (clamped to the last line)."""
+        while not self.complete and self.lines_before[-1] <= number:
+            self.extend(CHECKPOINT_BYTES)
+        block = bisect_right(self.lines_before, number) - 1
+        mm = self.mm
+        # Граница блока может попасть в середину строки: строка номер
+        # lines_before[block] начинается после последнего '\n' перед границей
+        offset = line_start(mm, block * CHECKPOINT_BYTES)
+        current = self.lines_before[block]
+        while current < number:
+            nl = mm.find(b"\n", offset)
+            if nl < 0 or nl + 1 >= self.size:
+                break
+            offset = nl + 1
+            current += 1
+        return line_start(mm, offset)
+
+
+def line_start(mm, offset):
+    """Offset of the beginning of the line containing `offset`."""
+    if offset <= 0:
+        return 0
+    return mm.rfind(b"\n", 0, offset) + 1
+
+
+def next_line(mm, offset):
+    """Offset of the line after the one starting at `offset`, or None at the last line."""
+    nl = mm.find(b"\n", offset)
+    if nl < 0 or nl + 1 >= len(mm):
+        return None
+    return nl + 1
+
+
+def prev_line(mm, offset):
+    """Offset of the line before the one starting at `offset`, or None at the first line."""
+    if offset <= 0:
+        return None
+    return line_start(mm, offset - 1)
+
+
+def parse_jump_time(value, year):
+    """Parses 'HH:MM', 'YYYY-MM-DD HH:MM[:SS]' or 'Oct 18 13:00' into a timestamp."""
+    value = value.strip()
+    if re.fullmatch(r"\d{1,2}:\d\d(:\d\d)?", value):
+        today = time.strftime("%Y-%m-%d")
+        value = f"{today} {value}"
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%b %d %H:%M", "%b %d %H:%M:%S"):
+        try:
+            dt = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        if "%Y" not in fmt:
+            dt = dt.replace(year=year)
+        return dt.timestamp()
+    return None
+
+
+class LogPager:
+    """Scrollable window over a memory-mapped log file.
+
+    The position is the byte offset of the top line, so paging moves by
+    scanning only the lines it passes; line numbers come from LineIndex.
+    Only the visible lines are decoded and highlighted.
+    """
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self._fh = open(self.path, "rb")
+        self.mm = b""
+        self.top = 0
+        self._map()
+        self._highlighter = LineHighlighter()
+
+    def _map(self, grown=False):
+        st = os.fstat(self._fh.fileno())
+        if isinstance(self.mm, mmap.mmap):
+            self.mm.close()
+        self.mtime = st.st_mtime
+        self.mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ) if st.st_size else b""
+        self.size = st.st_size
+        if grown:
+            self.index.grow(self.mm)
+        else:
+            self.index = LineIndex(self.mm)
+
+    def check_size(self):
+        """Remaps the file if its size changed since it was mapped.
+
+        Returns "truncated", "grown" or None. Reading mapped pages past
+        the new end of file raises SIGBUS, so this must run before every
+        access to a live log (logrotate copytruncate, `> file`). Lines
+        appended to the file become visible, and the line index keeps
+        what it has already counted.
+        """
+        size = os.fstat(self._fh.fileno()).st_size
+        if size == self.size:
+            return None
+        if size > self.size:
+            self._map(grown=True)
+            return "grown"
+        self._map()
+        self.top = line_start(self.mm, min(self.top, self.size - 1)) if self.size else 0
+        return "truncated"
+
+    def close(self):
+        if isinstance(self.mm, mmap.mmap):
+            self.mm.close()
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def scroll(self, lines):
+        step = next_line if lines > 0 else prev_line
+        for _ in range(abs(lines)):
+            offset = step(self.mm, self.top)
+            if offset is None:
+                break
+            self.top = offset
+
+    def home(self):
+        self.top = 0
+
+    def end(self, height):
+        self.top = line_start(self.mm, self.size - 1) if self.size else 0
+        self.scroll(-(height - 1))
+
+    def goto_line(self, number):
+        self.top = self.index.offset_of_line(max(number - 1, 0))
+
+    def _time_at(self, offset, year, end_month):
+        """Timestamp of the first line at or after `offset` that has one."""
+        mm = self.mm
+        offset = line_start(mm, offset)
+        for _ in range(1000):
+            ts = line_time(mm[offset:offset + TIME_PROBE_BYTES], year, end_month)
+            if ts is not None:
+                return ts, offset
+            offset = next_line(mm, offset)
+            if offset is None:
+                break
+        return None, None
+
+    def goto_time(self, target):
+        """Binary search over byte offsets for the first line at or after `target`."""
+        end = time.localtime(self.mtime)
+        lo, hi = 0, self.size
+        found = None
+        while lo < hi:
+            mid = (lo + hi) // 2
+            ts, offset = self._time_at(mid, end.tm_year, end.tm_mon)
+            if ts is None or ts >= target:
+                hi = mid
+                if ts is not None:
+                    found = offset
+            else:
+                lo = next_line(self.mm, offset) or self.size
+        self.top = found if found is not None else line_start(self.mm, max(self.size - 1, 0))
+        return found is not None
+
+    def find(self, needle, start=None):
+        """Moves to the next line containing `needle` (case-sensitive bytes search)."""
+        start = next_line(self.mm, self.top) if start is None else start
+        if start is None or not needle:
+            return False
+        pos = self.mm.find(needle.encode("utf-8"), start)
+        if pos < 0:
+            return False
+        self.top = line_start(self.mm, pos)
+        return True
+
+    def window(self, height, width):
+        """Highlighted Text lines for the screen, starting at the top line."""
+        rows = []
+        offset = self.top
+        first = self.index.line_number(offset, build=False)
+        gutter = len(str(self.index.total_lines or first or 0)) + 1 if first is not None else 0
+        for i in range(height):
+            if offset is None or offset >= self.size:
+                break
+            nl = self.mm.find(b"\n", offset)
+            stop = self.size if nl < 0 else nl
+            # Не декодируем гигантские строки целиком — экрану нужна только ширина
+            raw = self.mm[offset:min(stop, offset + width * 4)]
+            text = self._highlighter.highlight(raw.decode("utf-8", "replace"))
+            text.rstrip()
+            text.truncate(max(width - gutter - 1, 1), overflow="ellipsis")
+            if first is not None:
+                text = Text(f"{first + i + 1:>{gutter}} ", style="dim") + text
+            rows.append(text)
+            offset = None if nl < 0 else nl + 1
+        return rows
+
+    def position(self):
+        """Status string: line / total lines (when known) and percent of the file."""
+        line = self.index.line_number(self.top, build=False)
+        percent = self.top * 100 // self.size if self.size else 100
+        total = self.index.total_lines
+        line_part = "?" if line is None else str(line + 1)
+        total_part = str(total) if total is not None else f"≥{self.index.lines_before[-1]}"
+        return f"{line_part}/{total_part} · {percent}%"
+
+
+def run_pager(path):
+    """Full-screen pager for one log file; returns when the user presses q."""
+    with LogPager(path) as pager:
+        state = {"prompt": None, "message": "", "stop": False, "search": "", "indexed": False}
+
+        def body_height():
+            return max(console.size.height - 4, 5)
+
+        def jump_line(value):
+            if value.isdigit():
+                pager.goto_line(int(value))
+
+        def jump_time(value):
+            target = parse_jump_time(value, time.localtime(pager.mtime).tm_year)
+            if target is None:
+                state["message"] = get_string("pager_bad_time")
+            elif not pager.goto_time(target):
+                state["message"] = get_string("pager_time_not_found")
+
+        def search(value):
+            state["search"] = value or state["search"]
+            if not pager.find(state["search"]):
+                state["message"] = get_string("pager_not_found")
+
+        def handle_key(key):
+            prompt = state["prompt"]
+            if prompt is not None:
+                if prompt.feed(key):
+                    state["prompt"] = None
+                return
+            height = body_height()
+            state["message"] = ""
+            if key in ("q", "Q"):
+                state["stop"] = True
+            elif key in ("j", "\x1b[B", "\x1bOB", "\r", "\n"):
+                pager.scroll(1)
+            elif key in ("k", "\x1b[A", "\x1bOA"):
+                pager.scroll(-1)
+            elif key in (" ", "f", "\x1b[6~"):
+                pager.scroll(height - 1)
+            elif key in ("b", "\x1b[5~"):
+                pager.scroll(-(height - 1))
+            elif key in ("g", "\x1b[H", "\x1bOH", "\x1b[1~"):
+                pager.home()
+            elif key in ("G", "\x1b[F", "\x1bOF", "\x1b[4~"):
+                pager.end(height)
+            elif key == ":":
+                state["prompt"] = InlinePrompt(get_string("pager_goto_line"), jump_line, hint=get_string("pager_prompt_hint"))
+            elif key == "t":
+                state["prompt"] = InlinePrompt(get_string("pager_goto_time"), jump_time, hint=get_string("pager_prompt_hint"))
+            elif key == "/":
+                state["prompt"] = InlinePrompt("/", search, hint=get_string("pager_prompt_hint"))
+            elif key == "n" and state["search"]:
+                search("")
+
+        def render():
+            height = body_height()
+            width = console.size.width - 4
+            status = state["prompt"].render() if state["prompt"] else Text.from_markup(
+                f"[bold]{os.path.basename(pager.path)}[/bold] · {pager.position()}"
+                + (f" · {state['message']}" if state["message"] else "")
+            )
+            body = Text("\n").join(pager.window(height, width)) if pager.size else Text(get_string("empty_log_file"))
+            return Group(status, Panel(body, subtitle=get_string("pager_hint"), border_style="green", height=height + 2))
+
+        with KeyReader() as keys, Live(render(), console=console, auto_refresh=False, screen=True) as live:
+            while not state["stop"]:
+                pressed = keys.poll(0.2)
+                change = pager.check_size()
+                if change:
+                    if change == "truncated":
+                        state["message"] = get_string("pager_truncated")
+                    state["indexed"] = False
+                    live.update(render(), refresh=True)
+                for key in pressed:
+                    handle_key(key)
+                    if state["stop"]:
+                        break
+                if not pressed:
+                    # Простой — достраиваем индекс строк, чтобы номера строк появились и на дальних страницах
+                    if not pager.index.extend():
+                        if not state["indexed"]:
+                            state["indexed"] = True
+                            live.update(render(), refresh=True)
+                        continue
+                live.update(render(), refresh=True)
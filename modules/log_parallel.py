@@ -0,0 +1,54 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Куски большого файла для разных процессов; границы — всегда на '\n'
+CHUNK_BYTES = 64 * 1024 * 1024
+# Меньше этого пул процессов не окупает свой запуск
+PARALLEL_MIN_BYTES = 32 * 1024 * 1024
+
+
+def split_chunks(path, chunk_bytes=CHUNK_BYTES):
+    """Splits a plain file into [(start, end)] byte ranges that begin at line starts."""
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as f:
+        pos = chunk_bytes
+        while pos < size:
+            f.seek(pos)
+            f.readline()  # дочитываем строку, на которую попала граница
+            pos = f.tell()
+            if pos >= size:
+                break
+            bounds.append(pos)
+            pos += chunk_bytes
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def read_range(path, start, end):
+    """Yields the raw lines of `path` that start in [start, end)."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        pos = start
+        for line in f:
+            if pos >= end:
+                break
+            pos += len(line)
+            yield line
+
+
+def worker_count(workers=None):
+    return workers or os.cpu_count() or 1
+
+
+def run_tasks(func, tasks, total_bytes, workers=None):
+    """Maps `func` over `tasks`, in a process pool when there is enough work.
+
+    Results come back in task order. With one worker, one task, or less than
+    PARALLEL_MIN_BYTES of input, everything runs in this process.
+    """
+    workers = min(worker_count(workers), len(tasks))
+    if workers <= 1 or total_bytes < PARALLEL_MIN_BYTES:
+        return [func(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(func, tasks))
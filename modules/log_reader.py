@@ -0,0 +1,237 @@
+import os
+import selectors
+import struct
+import time
+
+BLOCK_SIZE = 64 * 1024
+# Потолок на один tail: защищает от логов с гигантскими строками без '\n'
+MAX_TAIL_BYTES = 8 * 1024 * 1024
+
+
+def tail_lines(path, count=100, block_size=BLOCK_SIZE, max_bytes=MAX_TAIL_BYTES, encoding='utf-8'):
+    """Returns the last `count` lines of a file without reading all of it.
+
+    Blocks are read backwards from EOF until enough newlines have been seen,
+    and only those blocks are decoded, so memory stays at a few blocks no
+    matter how large the file is. At most `max_bytes` are read; if that is
+    not enough, the oldest returned line is cut at the left.
+    """
+    if count <= 0:
+        return []
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        blocks = []
+        newlines = 0
+        read_total = 0
+        # Завершающий '\n' не отделяет новую строку
+        trailing = 0
+        if pos:
+            f.seek(pos - 1)
+            trailing = 1 if f.read(1) == b'\n' else 0
+        while pos > 0 and newlines < count + trailing and read_total < max_bytes:
+            size = min(block_size, pos, max_bytes - read_total)
+            pos -= size
+            f.seek(pos)
+            block = f.read(size)
+            blocks.append(block)
+            newlines += block.count(b'\n')
+            read_total += size
+    data = b''.join(reversed(blocks))
+    lines = data.decode(encoding, errors='ignore').splitlines()
+    return lines[-count:]
+
+
+# --- Слежение за файлом (tail -f) ---
+
+_IN_MODIFY = 0x002
+_IN_ATTRIB = 0x004
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = os.O_CLOEXEC
+WATCH_MASK = _IN_MODIFY | _IN_ATTRIB | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+
+class Inotify:
+    """Minimal ctypes wrapper over inotify(7); raises OSError where unavailable."""
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError("inotify is not available")
+        self._libc = libc
+        self.fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def watch(self, path, mask=WATCH_MASK):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(f"inotify_add_watch failed for {path}")
+        return wd
+
+    def drain(self):
+        """Discards pending events; the follower re-checks the file anyway."""
+        try:
+            while os.read(self.fd, 64 * 1024):
+                pass
+        except BlockingIOError:
+            pass
+
+    def read_events(self):
+        """Drains pending events; returns [(wd, mask)].
+
+        An IN_Q_OVERFLOW event comes with wd == -1: some events were lost
+        and every watched object has to be treated as changed.
+        """
+        events = []
+        try:
+            while True:
+                data = os.read(self.fd, 64 * 1024)
+                if not data:
+                    break
+                pos = 0
+                # struct inotify_event: int wd; uint32 mask, cookie, len; char name[len]
+                while pos + 16 <= len(data):
+                    wd, mask, _cookie, length = struct.unpack_from("iIII", data, pos)
+                    events.append((wd, mask))
+                    pos += 16 + length
+        except BlockingIOError:
+            pass
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class LogFollower:
+    """Follows a growing log file like `tail -F`.
+
+    Appended bytes are picked up through inotify on the file's directory,
+    or by polling every `poll_interval` seconds where inotify is missing.
+    Truncation (copytruncate) restarts reading from offset 0; rename
+    rotation finishes the old file and then switches to the new one.
+    """
+
+    def __init__(self, path, poll_interval=0.5, max_chunk=1024 * 1024):
+        self.path = os.fspath(path)
+        self.poll_interval = poll_interval
+        self.max_chunk = max_chunk
+        self.events = []  # 'rotated' / 'truncated' с прошлого read_new()
+        self._fh = None
+        self._ident = None
+        self._partial = b''
+        self._selector = None
+        self._inotify = None
+        try:
+            self._inotify = Inotify()
+            self._inotify.watch(os.path.dirname(os.path.abspath(self.path)) or '.')
+        except (OSError, AttributeError):
+            # Дескриптор inotify уже открыт, если не удалось только поставить наблюдение
+            if self._inotify is not None:
+                self._inotify.close()
+                self._inotify = None
+        if self._inotify is not None:
+            self._selector = selectors.DefaultSelector()
+            self._selector.register(self._inotify.fd, selectors.EVENT_READ)
+
+    @property
+    def uses_inotify(self):
+        return self._inotify is not None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def start(self, backlog=100):
+        """Opens the file at EOF and returns its last `backlog` lines."""
+        lines = tail_lines(self.path, backlog) if backlog else []
+        self._open(at_end=True)
+        return lines
+
+    def _open(self, at_end):
+        if self._fh is not None:
+            self._fh.close()
+        self._fh = open(self.path, 'rb')
+        st = os.fstat(self._fh.fileno())
+        self._ident = (st.st_dev, st.st_ino)
+        self._partial = b''
+        if at_end:
+            self._fh.seek(0, os.SEEK_END)
+
+    def wait(self, timeout=None):
+        """Blocks until the directory changes or `timeout` (default poll_interval) passes."""
+        timeout = self.poll_interval if timeout is None else timeout
+        if self._selector is None:
+            time.sleep(timeout)
+            return
+        if self._selector.select(timeout):
+            self._inotify.drain()
+
+    def _read_available(self, drain=False):
+        """Reads one chunk (or everything up to EOF with drain=True) as complete lines."""
+        lines = []
+        while True:
+            chunk = self._fh.read(self.max_chunk)
+            if not chunk:
+                break
+            parts = (self._partial + chunk).split(b'\n')
+            # Последний кусок без '\n' — строка ещё дописывается
+            self._partial = parts.pop()
+            lines.extend(part.decode('utf-8', errors='ignore') for part in parts)
+            if not drain:
+                break
+        return lines
+
+    def read_new(self):
+        """Returns complete lines appended since the previous call."""
+        self.events = []
+        if self._fh is None:
+            try:
+                self._open(at_end=False)
+            except OSError:
+                return []
+        lines = self._read_available()
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            # Файл переименован, а новый ещё не создан — дочитываем старый
+            return lines
+        if (st.st_dev, st.st_ino) != self._ident:
+            # Ротация: дочитываем хвост старого файла и переключаемся на новый
+            lines.extend(self._read_available(drain=True))
+            if self._partial:
+                lines.append(self._partial.decode('utf-8', errors='ignore'))
+            self._open(at_end=False)
+            self.events.append('rotated')
+            lines.extend(self._read_available())
+        elif st.st_size < self._fh.tell():
+            # copytruncate: файл обрезали на месте
+            self._fh.seek(0)
+            self._partial = b''
+            self.events.append('truncated')
+            lines.extend(self._read_available())
+        return lines
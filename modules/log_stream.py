@@ -0,0 +1,238 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import re
+import shutil
+import subprocess
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+from modules.dir_scan import scan
+from modules.log_reader import tail_lines
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSED_SUFFIXES = (".gz", ".xz", ".bz2", ".zst")
+# Бинарные журналы systemd читаются через journalctl, а не как текст
+JOURNAL_SUFFIXES = (".journal", ".journal~")
+# syslog.1, syslog.2.gz (logrotate) и syslog-20241013.gz (dateext)
+_GENERATION_RE = re.compile(r"^(?P<base>.+?)(?:\.(?P<num>\d+)|-(?P<date>\d{8}))?$")
+
+_SYSLOG_TIME_RE = re.compile(rb"^([A-Z][a-z]{2}) +(\d{1,2}) (\d\d):(\d\d):(\d\d)")
+_ISO_TIME_RE = re.compile(rb"^\d{4}-\d\d-\d\d[T ]\d\d:\d\d:\d\d(?:\.\d+)?(?:Z|[+-]\d\d:?\d\d)?")
+_MONTHS = {m.encode(): i for i, m in enumerate(
+    ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), 1)}
+
+
+class Generation(NamedTuple):
+    path: Path
+    order: int  # 0 — текущий файл, дальше — всё более старые
+    mtime: float
+    size: int
+
+    @property
+    def compressed(self):
+        return self.path.suffix in COMPRESSED_SUFFIXES
+
+
+def split_generation(name):
+    """Splits a log file name into (base name, generation order): 'syslog.2.gz' -> ('syslog', 2).
+
+    The order only compares generations of one log: 0 is the live file,
+    bigger is older.
+    """
+    for suffix in COMPRESSED_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+            break
+    m = _GENERATION_RE.match(name)
+    if m.group("num"):
+        return m.group("base"), int(m.group("num"))
+    if m.group("date"):
+        # dateext: чем раньше дата, тем старше поколение
+        return m.group("base"), 10**8 - int(m.group("date"))
+    return m.group("base"), 0
+
+
+def group_logs(log_dir):
+    """Groups files under `log_dir` into {base path: [Generation, newest first]}."""
+    families = {}
+    for entry in scan(log_dir):
+        if entry.path.suffix in JOURNAL_SUFFIXES:
+            continue
+        base, order = split_generation(entry.path.name)
+        gen = Generation(entry.path, order, entry.mtime, entry.size)
+        families.setdefault(entry.path.parent / base, []).append(gen)
+    for gens in families.values():
+        gens.sort(key=lambda g: (g.order, -g.mtime))
+    return families
+
+
+def generations(path):
+    """Rotated generations of one log, newest first (the file itself included if present)."""
+    path = Path(path)
+    base, _ = split_generation(path.name)
+    gens = []
+    try:
+        entries = list(os.scandir(path.parent))
+    except OSError:
+        return gens
+    for entry in entries:
+        if not entry.name.startswith(base):
+            continue
+        name_base, order = split_generation(entry.name)
+        if name_base != base:
+            continue
+        try:
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            st = entry.stat()
+        except OSError:
+            continue
+        gens.append(Generation(Path(entry.path), order, st.st_mtime, st.st_size))
+    gens.sort(key=lambda g: (g.order, -g.mtime))
+    return gens
+
+
+class _ProcessReader(io.RawIOBase):
+    """Reads stdout of a decompressor (zstd -dc) as a file; used when zstandard is not installed."""
+
+    def __init__(self, argv):
+        self._proc = subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        return self._proc.stdout.readinto(buffer)
+
+    def close(self):
+        if not self.closed:
+            self._proc.stdout.close()
+            self._proc.kill()
+            self._proc.wait()
+        super().close()
+
+
+def open_log(path):
+    """Opens a plain or compressed log for binary reading; decompression is streamed."""
+    path = Path(path)
+    suffix = path.suffix
+    if suffix == ".gz":
+        return gzip.open(path, "rb")
+    if suffix == ".xz":
+        return lzma.open(path, "rb")
+    if suffix == ".bz2":
+        return bz2.open(path, "rb")
+    if suffix == ".zst":
+        if zstandard is not None:
+            return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True))
+        if shutil.which("zstd"):
+            return io.BufferedReader(_ProcessReader(["zstd", "-dc", "--", str(path)]))
+        raise OSError(f"{path.name}: zstd support requires the 'zstandard' module or the zstd binary")
+    return open(path, "rb")
+
+
+def line_time(line, year, end_month=12):
+    """Timestamp of a syslog ('Oct 18 13:00:00') or ISO-8601 line, or None.
+
+    Syslog lines carry no year: `year`/`end_month` are those of the file's
+    mtime, and months after `end_month` belong to the previous year.
+    """
+    m = _SYSLOG_TIME_RE.match(line)
+    if m:
+        month = _MONTHS.get(m.group(1))
+        if month is None:
+            return None
+        if month > end_month:
+            year -= 1
+        try:
+            return time.mktime((year, month, int(m.group(2)), int(m.group(3)), int(m.group(4)), int(m.group(5)), 0, 0, -1))
+        except (OverflowError, ValueError):
+            return None
+    m = _ISO_TIME_RE.match(line)
+    if m:
+        try:
+            return datetime.fromisoformat(m.group(0).decode().replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+class LogStream:
+    """One logical log: the file and its rotated generations, read oldest to newest.
+
+    A generation can only hold lines written before its mtime and after the
+    mtime of the next older one, so time-range reads skip whole generations
+    (and never decompress them) when they fall outside the range.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.generations = generations(self.path)
+        self.opened = []  # какие поколения реально читались последним запросом
+
+    def _needed(self, since=None, until=None):
+        gens = self.generations
+        needed = []
+        for i, gen in enumerate(gens):
+            older_mtime = gens[i + 1].mtime if i + 1 < len(gens) else None
+            if since is not None and gen.mtime < since:
+                break  # это и все более старые поколения закончились раньше since
+            if until is not None and older_mtime is not None and older_mtime > until:
+                continue  # поколение целиком новее until
+            needed.append(gen)
+        return list(reversed(needed))
+
+    def lines(self, since=None, until=None):
+        """Yields (timestamp or None, text) from the needed generations, oldest first.
+
+        Lines without a recognizable timestamp inherit the previous one, so
+        multi-line messages stay with their header.
+        """
+        self.opened = []
+        for gen in self._needed(since, until):
+            self.opened.append(gen)
+            end = time.localtime(gen.mtime)
+            last_ts = None
+            with open_log(gen.path) as f:
+                for raw in f:
+                    ts = line_time(raw, end.tm_year, end.tm_mon)
+                    if ts is None:
+                        ts = last_ts
+                    else:
+                        last_ts = ts
+                    if since is not None and ts is not None and ts < since:
+                        continue
+                    if until is not None and ts is not None and ts > until:
+                        continue
+                    yield ts, raw.rstrip(b"\n").decode("utf-8", "ignore")
+
+    def tail(self, count=100):
+        """Last `count` lines across generations; reads older ones only if needed."""
+        self.opened = []
+        collected = deque()
+        for gen in self.generations:
+            need = count - len(collected)
+            if need <= 0:
+                break
+            self.opened.append(gen)
+            collected.extendleft(reversed(tail_file(gen.path, need)))
+        return list(collected)
+
+
+def tail_file(path, count=100):
+    """tail_lines() that also reads compressed files (streamed, keeping only `count` lines)."""
+    path = Path(path)
+    if path.suffix not in COMPRESSED_SUFFIXES:
+        return tail_lines(path, count)
+    with open_log(path) as f:
+        return list(deque((raw.rstrip(b"\n").decode("utf-8", "ignore") for raw in f), maxlen=count))
@@ -1,18 +1,35 @@
+import lzma
 import os
 import shutil
-import subprocess
+import time
+import zlib
+from collections import deque
 from pathlib import Path
 from rich.console import Console
+from rich.live import Live
+from rich.markup import escape
 from rich.panel import Panel
-from rich.syntax import Syntax
+from rich.table import Table
+from rich.text import Text
 from InquirerPy import inquirer
 from InquirerPy.base.control import Choice
 from InquirerPy.separator import Separator
 
 from localization import get_string
+from modules.log_reader import LogFollower
+from modules.log_stream import LogStream, group_logs
+from modules.log_pager import run_pager
+from modules.log_highlight import LineHighlighter
+from modules.journal_reader import JournalPager, JournalQuery, PRIORITIES
+from modules.log_analytics import analyze_log, analyze_files
+from modules.system_info import sparkline, format_bytes
+from modules.log_index import searchable_files, search_logs, flush_indexes, SKIP_NAMES
 
 console = Console()
 LOG_DIR = Path("/var/log")
+PERIOD_MAX_LINES = 500
+TAIL_MAX_LINES = 100
+HISTOGRAM_MINUTES = 60
 
 IMPORTANT_LOGS = {
     "journalctl": {
@@ -41,19 +58,27 @@ def clear_console():
     """Clears the console screen."""
     os.system('cls' if os.name == 'nt' else 'clear')
 
+def _screen_lines():
+    """How many log lines fit in a panel under the header and above the prompt."""
+    return max(console.size.height - 9, 10)
+
 def _view_log_file(file_path: Path):
-    """Displays the last 100 lines of a selected log file."""
+    """Displays the last lines of a log that fit on screen (up to 100), reaching into rotated/compressed generations if needed."""
     clear_console()
     console.print(Panel(get_string("reading_log_file", path=str(file_path)), title=get_string("log_viewer_title")))
     try:
-        content = file_path.read_text(encoding='utf-8', errors='ignore').strip()
-        if not content:
+        # Читаем с конца файла блоками, архивы распаковываем потоком — без временных файлов
+        stream = LogStream(file_path)
+        # Подсвечиваем и выводим только то, что поместится на экране
+        lines = stream.tail(min(TAIL_MAX_LINES, _screen_lines()))
+        while lines and not lines[-1].strip():
+            lines.pop()
+        if not lines:
             console.print(get_string("empty_log_file"))
             return
-        lines = content.splitlines()
-        log_content = "\n".join(lines[-100:])
-        syntax = Syntax(log_content, "log", theme="monokai", line_numbers=True)
-        console.print(Panel(syntax, title=get_string("last_100_lines"), border_style="green"))
+        body = LineHighlighter().render(lines, line_numbers=True)
+        files_read = ", ".join(g.path.name for g in stream.opened)
+        console.print(Panel(body, title=get_string("last_lines", count=len(lines)), subtitle=files_read, border_style="green"))
     except PermissionError:
         console.print(get_string("permission_denied"))
     except FileNotFoundError:
@@ -61,6 +86,190 @@ def _view_log_file(file_path: Path):
     except Exception as e:
         console.print(f"[red]An error occurred: {e}[/red]")
 
+def _view_log_period(file_path: Path):
+    """Shows log lines from a chosen period; generations outside it are not opened."""
+    hours = inquirer.select(
+        message=get_string("period_prompt"),
+        choices=[
+            Choice(1, get_string("period_hour")),
+            Choice(24, get_string("period_day")),
+            Choice(24 * 7, get_string("period_week")),
+            Choice(24 * 30, get_string("period_month")),
+            Separator(),
+            Choice(None, get_string("action_back")),
+        ],
+        pointer="» ",
+    ).execute()
+    if hours is None:
+        return
+    clear_console()
+    try:
+        stream = LogStream(file_path)
+        since = time.time() - hours * 3600
+        total = 0
+        lines = deque(maxlen=min(PERIOD_MAX_LINES, _screen_lines()))
+        with console.status(get_string("reading_log_file", path=str(file_path))):
+            for _, line in stream.lines(since=since):
+                lines.append(line)
+                total += 1
+        summary = get_string(
+            "period_summary", shown=len(lines), total=total,
+            read=len(stream.opened), generations=len(stream.generations),
+        )
+        if not lines:
+            console.print(get_string("empty_log_file"))
+        else:
+            body = LineHighlighter().render(list(lines))
+            console.print(Panel(body, title=file_path.name, subtitle=summary, border_style="green"))
+        console.print(f"[dim]{summary}[/dim]")
+    except PermissionError:
+        console.print(get_string("permission_denied"))
+    except Exception as e:
+        console.print(f"[red]An error occurred: {e}[/red]")
+
+def _follow_log_file(file_path: Path):
+    """Shows a log file live, like `tail -F`, until Ctrl+C."""
+    clear_console()
+    # Подсвечиваем каждую строку один раз, при поступлении; буфер хранит готовые Text
+    highlighter = LineHighlighter()
+    height = max(console.size.height - 4, 10)
+    buffer = deque(maxlen=height)
+
+    def add_lines(lines):
+        for line in lines:
+            text = highlighter.highlight(line)
+            text.rstrip()
+            buffer.append(text)
+
+    def render(note=""):
+        title = get_string("follow_title", filename=file_path.name)
+        subtitle = note or get_string("follow_hint")
+        return Panel(Text("\n").join(buffer), title=title, subtitle=subtitle, border_style="green")
+
+    try:
+        with LogFollower(file_path) as follower:
+            add_lines(follower.start(backlog=height))
+            with Live(render(), console=console, auto_refresh=False, screen=True) as live:
+                while True:
+                    follower.wait()
+                    lines = follower.read_new()
+                    note = ""
+                    if "rotated" in follower.events:
+                        note = get_string("follow_rotated")
+                    elif "truncated" in follower.events:
+                        note = get_string("follow_truncated")
+                    if lines or note:
+                        add_lines(lines)
+                        live.update(render(note), refresh=True)
+    except KeyboardInterrupt:
+        pass
+    except PermissionError:
+        console.print(get_string("permission_denied"))
+    except FileNotFoundError:
+        console.print(get_string("log_file_not_found"))
+    except Exception as e:
+        console.print(f"[red]An error occurred: {e}[/red]")
+
+def _search_logs():
+    """Asks for a query and searches every plain-text log under /var/log via the token index."""
+    files = searchable_files(LOG_DIR)
+    while True:
+        query = inquirer.text(message=get_string("search_prompt"), vi_mode=True).execute().strip()
+        if not query:
+            break
+        clear_console()
+        with console.status(get_string("search_indexing", count=len(files))):
+            results, stats = search_logs(files, query)
+        table = Table(title=get_string("search_results_title", query=escape(query)), show_lines=False, expand=True)
+        table.add_column(get_string("search_col_file"), style="cyan", no_wrap=True)
+        table.add_column("#", justify="right", style="dim")
+        table.add_column(get_string("search_col_line"), overflow="fold")
+        for path, lineno, text in results:
+            table.add_row(str(path.relative_to(LOG_DIR)), str(lineno), Text(text[:500]))
+        if results:
+            console.print(table)
+        else:
+            console.print(get_string("search_no_results"))
+        console.print(get_string(
+            "search_stats", matches=len(results), files=stats["files"], skipped=stats["skipped"],
+            indexed_ms=f"{stats['indexed_ms']:.0f}", query_ms=f"{stats['query_ms']:.1f}",
+        ))
+    flush_indexes()
+
+def _top_table(title, header, rows):
+    table = Table(title=title, expand=True)
+    table.add_column(header, style="cyan", overflow="fold")
+    table.add_column(get_string("analytics_col_count"), justify="right")
+    for item, count, error in rows:
+        table.add_row(str(item), f"{count}" + (f" [dim]±{error}[/dim]" if error else ""))
+    return table
+
+def _show_log_analytics(file_path: Path):
+    """One streaming pass (cached per file generation) with histogram and top sources."""
+    clear_console()
+    try:
+        started = time.perf_counter()
+        with console.status(get_string("analytics_running", path=str(file_path))):
+            stats, files = analyze_log(file_path)
+        elapsed = time.perf_counter() - started
+    except PermissionError:
+        console.print(get_string("permission_denied"))
+        return
+    except (OSError, EOFError, lzma.LZMAError, zlib.error) as e:
+        # Нет zstd, обрезанный .gz, битый .xz — сообщаем и остаёмся в просмотрщике
+        console.print(f"[red]{get_string('analytics_error', path=str(file_path), error=escape(str(e)))}[/red]")
+        return
+    _print_analytics(stats, len(files), elapsed, file_path.name)
+
+def _show_all_logs_analytics():
+    """Analytics over every text log under /var/log, all generations, fanned out over CPU cores."""
+    clear_console()
+    files = []
+    for gens in group_logs(LOG_DIR).values():
+        files.extend(g.path for g in gens if g.path.name.split(".")[0] not in SKIP_NAMES and os.access(g.path, os.R_OK))
+    started = time.perf_counter()
+    with console.status(get_string("analytics_running", path=str(LOG_DIR))):
+        stats = analyze_files(files)
+    _print_analytics(stats, len(files), time.perf_counter() - started, str(LOG_DIR))
+
+def _print_analytics(stats, file_count, elapsed, title):
+    if not stats.lines:
+        console.print(get_string("empty_log_file"))
+        for path, error in stats.skipped:
+            console.print(f"[red]{get_string('analytics_error', path=escape(str(path)), error=escape(error))}[/red]")
+        return
+    peak_minute, peak_count = stats.peak_minute
+    lines = [
+        get_string("analytics_lines", lines=stats.lines, files=file_count - len(stats.skipped), seconds=f"{elapsed:.2f}"),
+    ]
+    if stats.first_ts is not None:
+        fmt = "%Y-%m-%d %H:%M"
+        lines.append(get_string(
+            "analytics_span", start=time.strftime(fmt, time.localtime(stats.first_ts)),
+            end=time.strftime(fmt, time.localtime(stats.last_ts)), rate=f"{stats.rate():.2f}",
+        ))
+        lines.append(get_string(
+            "analytics_peak", minute=time.strftime(fmt, time.localtime(peak_minute * 60)),
+            count=peak_count, rate=f"{peak_count / 60:.1f}",
+        ))
+        histogram = stats.histogram(HISTOGRAM_MINUTES)
+        lines.append(get_string("analytics_histogram", minutes=HISTOGRAM_MINUTES) + f" [green]{sparkline(histogram, hi=max(histogram) or 1)}[/green] {max(histogram)}/min")
+    if stats.skipped:
+        lines.append(f"[yellow]{get_string('analytics_skipped', count=len(stats.skipped))}[/yellow]")
+        lines.extend(f"[dim]{escape(str(path))}: {escape(error)}[/dim]" for path, error in stats.skipped[:5])
+    console.print(Panel("\n".join(lines), title=get_string("analytics_title", filename=title), border_style="green"))
+
+    tables = [_top_table(get_string("analytics_top_ips"), "IP", stats.top_ips(10))]
+    if stats.failed_users.counts:
+        tables.append(_top_table(get_string("analytics_top_users"), get_string("analytics_col_user"), stats.failed_users.top(10)))
+    if stats.statuses:
+        tables.append(_top_table(get_string("analytics_top_status"), "HTTP", [(code, count, 0) for code, count in stats.statuses.most_common(10)]))
+    grid = Table.grid(expand=True, padding=(0, 1))
+    for _ in tables:
+        grid.add_column(ratio=1)
+    grid.add_row(*tables)
+    console.print(grid)
+
 def _clear_log_file(file_path: Path):
     """Clears the content of a given log file after confirmation."""
     if os.geteuid() != 0:
@@ -81,51 +290,129 @@ def _clear_log_file(file_path: Path):
             console.print(get_string("clear_fail", filename=file_path.name))
             console.print(f"[red]{e}[/red]")
 
+PRIORITY_STYLES = ("bold red", "bold red", "red", "red", "yellow", "cyan", "", "dim")
+
+def _journal_table(entries, query):
+    table = Table(expand=True, title=get_string("journal_title"), caption=_journal_filters_caption(query))
+    table.add_column(get_string("journal_col_time"), no_wrap=True, style="dim")
+    table.add_column(get_string("journal_col_unit"), no_wrap=True, style="cyan", max_width=28)
+    table.add_column(get_string("journal_col_message"), overflow="fold", ratio=1)
+    for entry in entries:
+        style = PRIORITY_STYLES[entry.priority] if 0 <= entry.priority < len(PRIORITY_STYLES) else ""
+        when = time.strftime("%b %d %H:%M:%S", time.localtime(entry.ts))
+        table.add_row(when, entry.unit, Text(entry.message, style=style))
+    return table
+
+def _journal_filters_caption(query):
+    active = [f"{name}={value}" for name, value in query._asdict().items() if value]
+    return ", ".join(active) if active else get_string("journal_no_filters")
+
+def _ask_journal_filters(query):
+    unit = inquirer.text(message=get_string("journal_unit_prompt"), default=query.unit, vi_mode=True).execute().strip()
+    priority = inquirer.select(
+        message=get_string("journal_priority_prompt"),
+        choices=[Choice("", get_string("journal_priority_all"))] + [Choice(p, p) for p in PRIORITIES[:7]],
+        default=query.priority,
+        pointer="» ",
+    ).execute()
+    since = inquirer.text(message=get_string("journal_since_prompt"), default=query.since, vi_mode=True).execute().strip()
+    return JournalQuery(unit=unit, priority=priority, since=since)
+
 def _view_journalctl():
-    """Displays the last 100 lines from journalctl."""
-    clear_console()
-    console.print(Panel(get_string("reading_log_file", path="journalctl"), title=get_string("log_viewer_title")))
+    """Pages through the systemd journal by cursor; reopening resumes at the last viewed page."""
+    pager = JournalPager(JournalQuery(), page_size=max(console.size.height - 10, 20))
+    note = ""
     try:
-        result = subprocess.run(['journalctl', '--no-pager', '-n', '100'], capture_output=True, text=True, check=True)
-        log_content = result.stdout.strip()
-        if not log_content:
-            console.print(get_string("empty_log_file"))
-            return
-        syntax = Syntax(log_content, "log", theme="monokai", line_numbers=True)
-        console.print(Panel(syntax, title=get_string("last_100_lines"), border_style="green"))
+        with console.status(get_string("reading_log_file", path="journalctl")):
+            pager.resume()
+        while True:
+            clear_console()
+            if pager.page:
+                console.print(_journal_table(pager.page, pager.query))
+            else:
+                console.print(get_string("empty_log_file"))
+            if note:
+                console.print(note)
+                note = ""
+            action = inquirer.select(
+                message=get_string("journal_action_prompt"),
+                choices=[
+                    Choice("older", get_string("journal_older")),
+                    Choice("newer", get_string("journal_newer")),
+                    Choice("latest", get_string("journal_latest")),
+                    Choice("filters", get_string("journal_filters")),
+                    Separator(),
+                    Choice(None, get_string("action_back")),
+                ],
+                pointer="» ",
+            ).execute()
+            if action is None:
+                break
+            query = _ask_journal_filters(pager.query) if action == "filters" else None
+            try:
+                with console.status(get_string("reading_log_file", path="journalctl")):
+                    if action == "older" and not pager.older():
+                        note = get_string("journal_at_start")
+                    elif action == "newer" and not pager.newer():
+                        note = get_string("journal_at_end")
+                    elif action == "latest":
+                        pager.latest()
+                    elif query is not None:
+                        filtered = JournalPager(query, pager.page_size)
+                        filtered.resume()
+                        pager.remember()
+                        pager = filtered
+            except RuntimeError as e:
+                # Например, неверный --since: остаёмся на прежней странице и показываем ошибку
+                note = f"[red]{get_string('journal_error', error=escape(str(e)))}[/red]"
+        pager.remember()
+        return
     except FileNotFoundError:
         console.print("[red]'journalctl' command not found. Is systemd running?[/red]")
-    except subprocess.CalledProcessError as e:
-        console.print(f"[red]Error running journalctl: {e.stderr}[/red]")
+    except RuntimeError as e:
+        console.print(f"[red]Error running journalctl: {escape(str(e))}[/red]")
     except Exception as e:
-        console.print(f"[red]An error occurred: {e}[/red]")
+        console.print(f"[red]An error occurred: {escape(str(e))}[/red]")
+    inquirer.text(message="\n" + get_string("press_enter_to_continue"), vi_mode=True).execute()
 
 def run_log_viewer():
-    """Scans /var/log, presents a structured menu, and views or clears selected logs."""
+    """Scans /var/log, presents a structured menu, and views, searches or clears logs."""
     if os.geteuid() != 0:
         console.print(f"[yellow]Warning:[/yellow] You are not running as root. You may not have permission to read or clear all log files.")
     
     while True:
         try:
-            important_log_keys = set(IMPORTANT_LOGS.keys())
-            
+            # Ротированные и сжатые поколения (syslog.1, syslog.2.gz) показываем одним логом
+            families = group_logs(LOG_DIR)
+
             # --- Build Choices ---
             choices = [Separator(get_string("important_logs_title"))]
             
             for log_key, data in IMPORTANT_LOGS.items():
                 is_journal = log_key == "journalctl"
                 path = LOG_DIR / log_key if not is_journal else None
-                exists = (is_journal and shutil.which("journalctl")) or (path and path.exists())
+                exists = (is_journal and shutil.which("journalctl")) or (path in families)
                 if exists:
                     name = f"{get_string(data['name_key'])}\n  {get_string(data['desc_key'])}"
                     choices.append(Choice(value={"type": "important", "path": path or log_key}, name=name))
             
             choices.append(Separator(get_string("other_logs_title")))
-            other_files = sorted([f for f in LOG_DIR.glob('*') if f.is_file() and f.name not in important_log_keys], key=os.path.getmtime, reverse=True)
-            for file in other_files[:15]:
-                 choices.append(Choice(value={"type": "other", "path": file}, name=file.name))
+            other_logs = sorted(
+                (base for base in families if base.parent != LOG_DIR or base.name not in IMPORTANT_LOGS),
+                key=lambda base: max(g.mtime for g in families[base]), reverse=True,
+            )
+            for base in other_logs:
+                gens = families[base]
+                live_gen = gens[0] if gens[0].path == base else None
+                name = f"{str(base.relative_to(LOG_DIR)):<32} {format_bytes(live_gen.size if live_gen else 0):>6}"
+                rotated = gens[1:] if live_gen else gens
+                if rotated:
+                    name += "  " + get_string("rotated_count", count=len(rotated), size=format_bytes(sum(g.size for g in rotated)))
+                choices.append(Choice(value={"type": "other", "path": base}, name=name))
 
             choices.append(Separator())
+            choices.append(Choice(value={"type": "search", "path": None}, name=get_string("search_logs")))
+            choices.append(Choice(value={"type": "analytics_all", "path": None}, name=get_string("analytics_all")))
             choices.append(Choice(value=None, name=get_string("back_to_main_menu")))
             
             # --- Main Menu ---
@@ -142,33 +429,62 @@ def run_log_viewer():
             selection_type = selected["type"]
             selection_path = selected["path"]
 
-            if selection_type == "important":
-                if selection_path == "journalctl": _view_journalctl()
-                else: _view_log_file(selection_path)
+            if selection_type == "search":
+                _search_logs()
+                continue
+
+            if selection_type == "analytics_all":
+                _show_all_logs_analytics()
                 inquirer.text(message="\n" + get_string("press_enter_to_continue"), vi_mode=True).execute()
+                continue
 
-            elif selection_type == "other":
-                action = inquirer.select(
-                    message=get_string("log_actions_prompt", filename=selection_path.name),
-                    choices=[
-                        Choice("view", get_string("action_view")),
-                        Choice("clear", get_string("action_clear")),
-                        Separator(),
-                        Choice(None, get_string("action_back")),
-                    ],
-                    pointer="» ",
-                ).execute()
-                
-                if action == "view":
-                    _view_log_file(selection_path)
-                    inquirer.text(message="\n" + get_string("press_enter_to_continue"), vi_mode=True).execute()
-                elif action == "clear":
-                    _clear_log_file(selection_path)
+            if selection_type == "important" and selection_path == "journalctl":
+                _view_journalctl()
+                continue
+
+            # Следить и очищать можно только живой файл, не архивы
+            live = selection_path in families and families[selection_path][0].path == selection_path
+            actions = [
+                Choice("view", get_string("action_view")),
+                Choice("period", get_string("action_period")),
+                Choice("analytics", get_string("action_analytics")),
+            ]
+            if live:
+                actions.append(Choice("follow", get_string("action_follow")))
+                if selection_type == "other":
+                    actions.append(Choice("clear", get_string("action_clear")))
+            actions += [Separator(), Choice(None, get_string("action_back"))]
+            action = inquirer.select(
+                message=get_string("log_actions_prompt", filename=selection_path.name),
+                choices=actions,
+                pointer="» ",
+            ).execute()
+
+            if action is None:
+                continue
+            if action == "view" and live:
+                # Живой файл листаем постранично через mmap; архивы — только хвост
+                try:
+                    run_pager(selection_path)
+                except PermissionError:
+                    console.print(get_string("permission_denied"))
                     inquirer.text(message="\n" + get_string("press_enter_to_continue"), vi_mode=True).execute()
+                continue
+            if action == "view":
+                _view_log_file(selection_path)
+            elif action == "period":
+                _view_log_period(selection_path)
+            elif action == "analytics":
+                _show_log_analytics(selection_path)
+            elif action == "follow":
+                _follow_log_file(selection_path)
+            elif action == "clear":
+                _clear_log_file(selection_path)
+            inquirer.text(message="\n" + get_string("press_enter_to_continue"), vi_mode=True).execute()
 
         except KeyboardInterrupt:
             console.print(f'\n{get_string("operation_cancelled")}')
             break
         except Exception as e:
             console.print(f"[red]An error occurred in the log viewer: {e}[/red]")
-            break 
\ No newline at end of file
+            break 
@@ -0,0 +1,188 @@
+import os
+import time
+from collections import deque
+from typing import NamedTuple
+
+import psutil
+
+NET_DEV = "/proc/net/dev"
+# Скользящее среднее по последним AVERAGE_SAMPLES замерам
+AVERAGE_SAMPLES = 10
+HISTORY_SAMPLES = 30
+
+
+class IfCounters(NamedTuple):
+    rx_bytes: int
+    rx_packets: int
+    rx_errs: int
+    rx_drop: int
+    tx_bytes: int
+    tx_packets: int
+    tx_errs: int
+    tx_drop: int
+
+
+class IfRates(NamedTuple):
+    """Per-second rates; bytes, not bits."""
+    rx_bytes: float
+    tx_bytes: float
+    rx_packets: float
+    tx_packets: float
+    errors: float
+    drops: float
+
+
+ZERO_RATES = IfRates(0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+
+def parse_net_dev(data):
+    """{iface: IfCounters} from the contents of /proc/net/dev (bytes)."""
+    counters = {}
+    for line in data.split(b"\n")[2:]:
+        name, sep, rest = line.partition(b":")
+        if not sep:
+            continue
+        f = rest.split()
+        if len(f) < 12:
+            continue
+        counters[name.strip().decode()] = IfCounters(
+            int(f[0]), int(f[1]), int(f[2]), int(f[3]),
+            int(f[8]), int(f[9]), int(f[10]), int(f[11]),
+        )
+    return counters
+
+
+def _psutil_counters():
+    return {
+        name: IfCounters(c.bytes_recv, c.packets_recv, c.errin, c.dropin, c.bytes_sent, c.packets_sent, c.errout, c.dropout)
+        for name, c in psutil.net_io_counters(pernic=True).items()
+    }
+
+
+def _delta(new, old):
+    # Интерфейс пересоздали — счётчики начались с нуля
+    return new - old if new >= old else new
+
+
+class NetDevSampler:
+    """Per-interface rx/tx rates from successive reads of /proc/net/dev.
+
+    The file stays open and is re-read with one pread() per sample, so a
+    sample costs a syscall and parsing a few lines, whatever the traffic.
+    Without /proc the counters come from psutil.net_io_counters(pernic=True).
+    """
+
+    def __init__(self, path=NET_DEV, window=AVERAGE_SAMPLES, history=HISTORY_SAMPLES):
+        try:
+            self._fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            self._fd = None
+        self.window = window
+        self.history_size = history
+        self._prev = None
+        self._prev_time = None
+        self.rates = {}     # iface -> IfRates последнего интервала
+        self._recent = {}   # iface -> deque(IfRates) для скользящего среднего
+        self.history = {}   # iface -> deque(rx + tx байт/с) для sparkline
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def read(self):
+        if self._fd is None:
+            return _psutil_counters()
+        chunks = []
+        offset = 0
+        while True:
+            chunk = os.pread(self._fd, 65536, offset)
+            chunks.append(chunk)
+            offset += len(chunk)
+            if len(chunk) < 65536:
+                break
+        return parse_net_dev(b"".join(chunks))
+
+    def sample(self):
+        """Takes a sample; returns {iface: IfRates} for the interval since the previous one."""
+        now = time.monotonic()
+        counters = self.read()
+        prev, prev_time = self._prev, self._prev_time
+        self._prev, self._prev_time = counters, now
+        if prev is None:
+            return {}
+        elapsed = now - prev_time
+        if elapsed <= 0:
+            return self.rates
+        rates = {}
+        for name, c in counters.items():
+            p = prev.get(name)
+            if p is None:
+                continue
+            r = IfRates(
+                _delta(c.rx_bytes, p.rx_bytes) / elapsed,
+                _delta(c.tx_bytes, p.tx_bytes) / elapsed,
+                _delta(c.rx_packets, p.rx_packets) / elapsed,
+                _delta(c.tx_packets, p.tx_packets) / elapsed,
+                (_delta(c.rx_errs, p.rx_errs) + _delta(c.tx_errs, p.tx_errs)) / elapsed,
+                (_delta(c.rx_drop, p.rx_drop) + _delta(c.tx_drop, p.tx_drop)) / elapsed,
+            )
+            rates[name] = r
+            recent = self._recent.get(name)
+            if recent is None:
+                recent = self._recent[name] = deque(maxlen=self.window)
+                self.history[name] = deque(maxlen=self.history_size)
+            recent.append(r)
+            self.history[name].append(r.rx_bytes + r.tx_bytes)
+        for name in self._recent.keys() - rates.keys():
+            del self._recent[name]
+            del self.history[name]
+        self.rates = rates
+        return rates
+
+    def average(self, name):
+        """Rolling mean of the last `window` intervals for `name`."""
+        recent = self._recent.get(name)
+        if not recent:
+            return ZERO_RATES
+        n = len(recent)
+        return IfRates(*(sum(column) / n for column in zip(*recent)))
+
+    def totals(self, name):
+        """Counters since boot for `name` from the last sample."""
+        return (self._prev or {}).get(name)
+
+
+def format_rate(bytes_per_second):
+    """Network-style bit rate, e.g. '940.2 Mbit/s'."""
+    value = bytes_per_second * 8
+    for unit in ("bit/s", "Kbit/s", "Mbit/s", "Gbit/s"):
+        if value < 1000 or unit == "Gbit/s":
+            break
+        value /= 1000
+    return f"{value:.0f} {unit}" if unit == "bit/s" else f"{value:.1f} {unit}"
+
+
+def format_count(value):
+    """Compact per-second count: 950, 12.3k, 1.5M."""
+    if value < 1000:
+        return f"{value:.0f}"
+    if value < 1_000_000:
+        return f"{value / 1000:.1f}k"
+    return f"{value / 1_000_000:.1f}M"
+
+
+def link_speeds():
+    """{iface: link speed in bytes/s} for interfaces that report one."""
+    try:
+        stats = psutil.net_if_stats()
+    except OSError:
+        return {}
+    return {name: s.speed * 1_000_000 / 8 for name, s in stats.items() if s.speed > 0}
@@ -0,0 +1,202 @@
+import asyncio
+import itertools
+import math
+import socket
+import struct
+import time
+from typing import NamedTuple
+
+from modules.dns_cache import resolver
+
+PROBE_COUNT = 3
+PROBE_INTERVAL = 0.2
+PROBE_TIMEOUT = 1.5
+RESOLVE_TIMEOUT = 2.0
+TCP_PORT = 443
+# Одновременно открытых проб; ограничение от исчерпания дескрипторов, не от нагрузки
+MAX_IN_FLIGHT = 256
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+
+
+class ProbeResult(NamedTuple):
+    host: str
+    address: str
+    method: str
+    sent: int
+    rtts: list  # мс, только ответившие пробы
+    error: str = ""
+    resolve_ms: float = 0.0  # разрешение имени отдельно от сетевого RTT
+    dns_cached: bool = False
+
+    @property
+    def ok(self):
+        return bool(self.rtts)
+
+    @property
+    def loss(self):
+        return 1 - len(self.rtts) / self.sent if self.sent else 1.0
+
+    @property
+    def min(self):
+        return min(self.rtts) if self.rtts else None
+
+    @property
+    def avg(self):
+        return sum(self.rtts) / len(self.rtts) if self.rtts else None
+
+    @property
+    def p95(self):
+        if not self.rtts:
+            return None
+        ranked = sorted(self.rtts)
+        return ranked[max(math.ceil(0.95 * len(ranked)) - 1, 0)]
+
+    @property
+    def jitter(self):
+        """Mean absolute difference of consecutive RTTs (as in RFC 3550)."""
+        if len(self.rtts) < 2:
+            return 0.0 if self.rtts else None
+        return sum(abs(b - a) for a, b in zip(self.rtts, self.rtts[1:])) / (len(self.rtts) - 1)
+
+
+def _icmp_checksum(data):
+    if len(data) % 2:
+        data += b"\0"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+class IcmpPinger:
+    """Echo requests over one unprivileged ICMP datagram socket.
+
+    Needs the user's group in net.ipv4.ping_group_range; otherwise the
+    constructor raises OSError and callers fall back to TCP. Replies are
+    matched to waiting futures by (address, sequence number): the kernel
+    rewrites the echo id to the socket's own port.
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+        self.sock.setblocking(False)
+        self._seq = itertools.count(1)
+        self._waiting = {}
+        loop.add_reader(self.sock.fileno(), self._on_readable)
+
+    def close(self):
+        self.loop.remove_reader(self.sock.fileno())
+        self.sock.close()
+
+    def _on_readable(self):
+        while True:
+            try:
+                packet, (address, _) = self.sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                continue
+            if len(packet) < 8 or packet[0] != ICMP_ECHO_REPLY:
+                continue
+            seq = struct.unpack("!H", packet[6:8])[0]
+            waiter = self._waiting.pop((address, seq), None)
+            if waiter is not None and not waiter.done():
+                waiter.set_result(time.perf_counter())
+
+    async def rtt(self, address, timeout=PROBE_TIMEOUT):
+        seq = next(self._seq) & 0xFFFF
+        payload = struct.pack("!d", time.time())
+        header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, 0, seq)
+        checksum = _icmp_checksum(header + payload)
+        packet = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, checksum, 0, seq) + payload
+        waiter = self.loop.create_future()
+        self._waiting[(address, seq)] = waiter
+        try:
+            start = time.perf_counter()
+            self.sock.sendto(packet, (address, 0))
+            return (await asyncio.wait_for(waiter, timeout) - start) * 1000
+        finally:
+            self._waiting.pop((address, seq), None)
+
+
+async def tcp_rtt(address, port=TCP_PORT, timeout=PROBE_TIMEOUT):
+    """Time of a TCP handshake in ms; a refused connection (RST) is a reply too."""
+    loop = asyncio.get_running_loop()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    try:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(loop.sock_connect(sock, (address, port)), timeout)
+        except ConnectionRefusedError:
+            pass
+        return (time.perf_counter() - start) * 1000
+    finally:
+        sock.close()
+
+
+async def probe_hosts(hosts, count=PROBE_COUNT, method="auto", port=TCP_PORT,
+                      interval=PROBE_INTERVAL, timeout=PROBE_TIMEOUT, on_result=None):
+    """Resolves and probes every host concurrently; returns ProbeResults in host order.
+
+    Names go through the shared dns_cache resolver, so a repeated sweep
+    skips DNS for every name whose TTL has not run out.
+
+    `method` is "icmp", "tcp" or "auto" (ICMP when the kernel allows
+    unprivileged echo sockets, else a TCP handshake to `port`). Each host
+    gets `count` probes spaced `interval` apart, so a full sweep takes
+    roughly resolve time + (count - 1) * interval + timeout no matter how
+    many hosts there are. `on_result` is called as each host finishes.
+    """
+    loop = asyncio.get_running_loop()
+    pinger = None
+    if method in ("auto", "icmp"):
+        try:
+            pinger = IcmpPinger(loop)
+            method = "icmp"
+        except OSError:
+            if method == "icmp":
+                raise
+            method = "tcp"
+    limit = asyncio.Semaphore(MAX_IN_FLIGHT)
+
+    async def attempt(address, delay):
+        await asyncio.sleep(delay)
+        async with limit:
+            try:
+                if pinger is not None:
+                    return await pinger.rtt(address, timeout)
+                return await tcp_rtt(address, port, timeout)
+            except (OSError, asyncio.TimeoutError):
+                return None
+
+    async def one(host):
+        try:
+            resolution = await asyncio.wait_for(resolver.resolve(host), RESOLVE_TIMEOUT)
+        except asyncio.TimeoutError:
+            result = ProbeResult(host, "", method, count, [], "DNS timeout", RESOLVE_TIMEOUT * 1000)
+        else:
+            dns = {"resolve_ms": resolution.elapsed_ms, "dns_cached": resolution.cached}
+            if not resolution.ok:
+                result = ProbeResult(host, "", method, count, [], resolution.error, **dns)
+            else:
+                address = resolution.address
+                rtts = await asyncio.gather(*(attempt(address, i * interval) for i in range(count)))
+                result = ProbeResult(host, address, method, count, [r for r in rtts if r is not None], **dns)
+        if on_result is not None:
+            on_result(result)
+        return result
+
+    try:
+        return await asyncio.gather(*(one(host) for host in hosts))
+    finally:
+        if pinger is not None:
+            pinger.close()
+
+
+def probe(hosts, **kwargs):
+    """Synchronous wrapper around probe_hosts() for menu code."""
+    return asyncio.run(probe_hosts(list(hosts), **kwargs))
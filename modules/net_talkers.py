@@ -0,0 +1,244 @@
+import ipaddress
+import re
+import shutil
+import socket
+import struct
+import subprocess
+import time
+from typing import NamedTuple
+
+from modules.procfs import read_stat
+from modules.sketches import SpaceSaving
+from modules.socket_table import socket_owners
+
+# Сколько «говорящих» держать в ограниченных по памяти счётчиках за всё время
+TALKER_CAPACITY = 200
+
+NETLINK_SOCK_DIAG = 4
+SOCK_DIAG_BY_FAMILY = 20
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+INET_DIAG_INFO = 2
+# ESTABLISHED, FIN_WAIT1/2, CLOSE_WAIT, LAST_ACK, CLOSING: соединения, по которым ещё идут данные
+ACTIVE_STATES = sum(1 << state for state in (1, 4, 5, 8, 9, 11))
+# Смещения в struct tcp_info (linux/tcp.h); поля есть с ядра 4.2
+TCPI_BYTES_ACKED = 120
+TCPI_BYTES_RECEIVED = 128
+
+SS_COUNTERS_RE = re.compile(r"bytes_acked:(\d+)|bytes_received:(\d+)|ino:(\d+)")
+
+
+class TcpConn(NamedTuple):
+    local: str
+    remote_ip: str
+    remote_port: int
+    inode: int
+    bytes_acked: int     # отправлено и подтверждено пиром
+    bytes_received: int
+
+
+def _ip(family, raw):
+    if family == socket.AF_INET:
+        return socket.inet_ntop(socket.AF_INET, raw[:4])
+    return socket.inet_ntop(socket.AF_INET6, raw)
+
+
+def _parse_diag(payload):
+    """TcpConn from one inet_diag_msg with its attributes, or None without tcp_info."""
+    family = payload[0]
+    sport, dport = struct.unpack_from("!HH", payload, 4)
+    src, dst = payload[8:24], payload[24:40]
+    inode = struct.unpack_from("=I", payload, 68)[0]
+    pos = 72
+    while pos + 4 <= len(payload):
+        length, kind = struct.unpack_from("=HH", payload, pos)
+        if length < 4:
+            break
+        if kind == INET_DIAG_INFO and length - 4 >= TCPI_BYTES_RECEIVED + 8:
+            acked, received = struct.unpack_from("=QQ", payload, pos + 4 + TCPI_BYTES_ACKED)
+            return TcpConn(f"{_ip(family, src)}:{sport}", _ip(family, dst), dport, inode, acked, received)
+        pos += (length + 3) & ~3
+    return None
+
+
+def _netlink_dump(family):
+    sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_SOCK_DIAG)
+    try:
+        request = struct.pack("=BBBBI", family, socket.IPPROTO_TCP, 1 << (INET_DIAG_INFO - 1), 0, ACTIVE_STATES) + bytes(48)
+        sock.sendto(struct.pack("=IHHII", 16 + len(request), SOCK_DIAG_BY_FAMILY, NLM_F_REQUEST | NLM_F_DUMP, 1, 0) + request, (0, 0))
+        conns = []
+        while True:
+            data = sock.recv(1 << 17)
+            pos = 0
+            while pos + 16 <= len(data):
+                length, kind = struct.unpack_from("=IH", data, pos)
+                if kind == NLMSG_DONE:
+                    return conns
+                if kind == NLMSG_ERROR:
+                    raise OSError(-struct.unpack_from("=i", data, pos + 16)[0], "sock_diag request failed")
+                conn = _parse_diag(data[pos + 16:pos + length])
+                if conn is not None:
+                    conns.append(conn)
+                pos += (length + 3) & ~3
+            if not data:
+                return conns
+    finally:
+        sock.close()
+
+
+def _ss_connections():
+    # Запасной путь без sock_diag: тот же tcp_info, но через текст `ss -tieH`
+    res = subprocess.run(["ss", "-tieH", "state", "connected"], capture_output=True, text=True)
+    conns = []
+    head = None
+    for line in res.stdout.splitlines():
+        if not line.startswith(("\t", " ")):
+            head = line.split()
+            continue
+        if head is None or len(head) < 5:
+            continue
+        values = {"acked": 0, "received": 0, "ino": 0}
+        for acked, received, ino in SS_COUNTERS_RE.findall(" ".join(head) + line):
+            if acked:
+                values["acked"] = int(acked)
+            elif received:
+                values["received"] = int(received)
+            elif ino:
+                values["ino"] = int(ino)
+        # В `state connected` колонки State нет: Recv-Q Send-Q Local Peer
+        offset = 0 if head[0][0].isdigit() else 1
+        remote_ip, _, remote_port = head[offset + 3].rpartition(":")
+        conns.append(TcpConn(head[offset + 2], remote_ip.strip("[]"), int(remote_port or 0),
+                             values["ino"], values["acked"], values["received"]))
+        head = None
+    return conns
+
+
+def read_connections():
+    """Active TCP connections with byte counters (sock_diag netlink, `ss -tie` as fallback)."""
+    try:
+        return _netlink_dump(socket.AF_INET) + _netlink_dump(socket.AF_INET6)
+    except (OSError, AttributeError):
+        pass
+    if shutil.which("ss"):
+        return _ss_connections()
+    return []
+
+
+def network_of(ip):
+    """Remote network a peer is grouped under: /24 for IPv4, /64 for IPv6."""
+    try:
+        addr = ipaddress.ip_address(ip)
+    except ValueError:
+        return ip
+    if addr.version == 6 and addr.ipv4_mapped:
+        addr = addr.ipv4_mapped
+    prefix = 24 if addr.version == 4 else 64
+    return str(ipaddress.ip_network(f"{addr}/{prefix}", strict=False))
+
+
+class TalkerSampler:
+    """Bytes per process and per remote network between successive samples.
+
+    Each sample reads the counters of every active connection and charges
+    the growth since the previous sample to the owning pid and to the
+    peer's /24. Previous counters are kept only for live connections. The
+    totals since the start are SpaceSaving summaries, so memory stays
+    bounded however many peers pass through.
+    """
+
+    def __init__(self, capacity=TALKER_CAPACITY):
+        self._prev = {}      # (local, remote, port, inode) -> (acked, received)
+        self._pids = {}      # inode -> pid; /proc/*/fd обходим только для новых сокетов
+        self._orphans = set()  # inode без видимого владельца (чужой процесс без root)
+        self._names = {}     # pid -> имя, только для pid с живыми сокетами
+        self._prev_time = None
+        self.elapsed = 0.0
+        self.by_pid = {}     # pid -> [tx, rx] за последний интервал
+        self.by_net = {}     # сеть -> [tx, rx, соединений]
+        self.total_pids = SpaceSaving(capacity)
+        self.total_nets = SpaceSaving(capacity)
+        self.connections = 0
+
+    def _owner(self, inodes):
+        live = set(inodes)
+        live.discard(0)
+        unknown = live - self._pids.keys() - self._orphans
+        if unknown:
+            owners = socket_owners(unknown)
+            for inode in unknown:
+                pids = owners.get(inode)
+                if pids:
+                    self._pids[inode] = pids[0]
+                else:
+                    # Повторный обход /proc ничего не даст, пока сокет жив
+                    self._orphans.add(inode)
+        for inode in self._pids.keys() - live:
+            del self._pids[inode]
+        self._orphans &= live
+        # Имена держим только для владельцев живых сокетов: память не растёт,
+        # а pid, переиспользованный новым процессом, получит новое имя
+        alive = set(self._pids.values())
+        for pid in self._names.keys() - alive:
+            del self._names[pid]
+        return self._pids
+
+    def name(self, pid):
+        name = self._names.get(pid)
+        if name is None:
+            stat = read_stat(pid)
+            name = self._names[pid] = stat[0] if stat else "?"
+        return name
+
+    def sample(self):
+        now = time.monotonic()
+        conns = read_connections()
+        owners = self._owner([c.inode for c in conns])
+        prev = self._prev
+        current = {}
+        by_pid = {}
+        by_net = {}
+        for c in conns:
+            key = (c.local, c.remote_ip, c.remote_port, c.inode)
+            current[key] = (c.bytes_acked, c.bytes_received)
+            old = prev.get(key)
+            # Новое соединение: его прошлые байты не относятся к интервалу
+            tx = c.bytes_acked - old[0] if old else 0
+            rx = c.bytes_received - old[1] if old else 0
+            net = by_net.setdefault(network_of(c.remote_ip), [0, 0, 0])
+            net[0] += tx
+            net[1] += rx
+            net[2] += 1
+            pid = owners.get(c.inode)
+            if pid is not None:
+                stats = by_pid.setdefault(pid, [0, 0])
+                stats[0] += tx
+                stats[1] += rx
+        self._prev = current
+        self.connections = len(conns)
+        self.elapsed = now - self._prev_time if self._prev_time is not None else 0.0
+        self._prev_time = now
+        self.by_pid = by_pid
+        self.by_net = by_net
+        for pid, (tx, rx) in by_pid.items():
+            if tx + rx:
+                self.total_pids.add(pid, tx + rx)
+        for net, (tx, rx, _) in by_net.items():
+            if tx + rx:
+                self.total_nets.add(net, tx + rx)
+        return by_pid, by_net
+
+    def top_pids(self, n=10):
+        """[(pid, tx_per_s, rx_per_s)] for the last interval, heaviest first."""
+        return self._ranked(self.by_pid, n)
+
+    def top_nets(self, n=10):
+        """[(network, tx_per_s, rx_per_s, connections)] for the last interval, heaviest first."""
+        return self._ranked(self.by_net, n)
+
+    def _ranked(self, table, n):
+        elapsed = self.elapsed or 1.0
+        rows = sorted(table.items(), key=lambda kv: kv[1][0] + kv[1][1], reverse=True)[:n]
+        return [(key, values[0] / elapsed, values[1] / elapsed, *values[2:]) for key, values in rows]
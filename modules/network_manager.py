@@ -1,18 +1,46 @@
+import os
 import shutil
 import subprocess
-from rich.console import Console
+import time
+from rich.console import Console, Group
 from rich.table import Table
 from rich.panel import Panel
+from rich.live import Live
 from InquirerPy import inquirer
 from InquirerPy.base.control import Choice
 from modules.panel_utils import clear_console
 from localization import get_string
-import concurrent.futures
+from modules.net_probe import probe
+from modules.dns_cache import resolve
+from modules import procfs
+from modules.socket_table import SocketTable
+from modules.net_monitor import NetDevSampler, format_rate, format_count, link_speeds
+from modules.system_info import sparkline, format_bytes
+from modules.net_talkers import TalkerSampler
+from modules import ufw_rules
 
 console = Console()
+TALKERS_SHOWN = 10
 
 # --- Открытые порты ---
+def _format_processes(processes):
+    return ", ".join(f"{name} ({pid})" for pid, name in processes) or "-"
+
 def show_ports():
+    if procfs.available():
+        # Читаем /proc/net/* напрямую — без ss/netstat и разбора их вывода
+        table = Table(title=get_string('network_ports'), show_lines=True)
+        table.add_column("Netid", style='cyan')
+        table.add_column("State", style='cyan')
+        table.add_column(get_string('network_ports_local'), style='magenta')
+        table.add_column(get_string('network_ports_process'), style='green')
+        for sock in sorted(SocketTable().listening(), key=lambda s: (s.proto, s.local_port)):
+            table.add_row(sock.proto, sock.state, sock.local, _format_processes(sock.processes))
+        console.print(table)
+        if os.geteuid() != 0:
+            console.print(f"[yellow]{get_string('network_ports_need_root')}[/yellow]")
+        inquirer.text(message=get_string('network_press_enter')).execute()
+        return
     if shutil.which('ss'):
         res = subprocess.run(['ss', '-tulnp'], capture_output=True, text=True)
         lines = res.stdout.splitlines() if res and res.stdout else []
@@ -59,10 +87,24 @@ def run_speedtest():
     inquirer.text(message=get_string('network_press_enter')).execute()
 
 # --- Пинг/trace/lookup ---
+def _resolve_target(host, tool):
+    """Resolves `host` through the shared DNS cache and prints the lookup time apart from RTT.
+
+    The tool still gets the name itself: an IPv4 address would force IPv4
+    on dual-stack hosts and drop the name from traceroute output.
+    """
+    result = resolve(host)
+    if not result.ok:
+        console.print(f"[yellow]{get_string('network_resolve_failed', host=host, error=result.error, tool=tool)}[/yellow]")
+        return
+    key = 'network_resolved_cached' if result.cached else 'network_resolved'
+    console.print(f"[cyan]{get_string(key, host=host, addresses=', '.join(result.addresses), ms=f'{result.elapsed_ms:.1f}', source=result.source, ttl=result.ttl)}[/cyan]")
+
 def run_ping():
     host = inquirer.text(message=get_string('network_ping_prompt')).execute()
     if not host:
         return
+    _resolve_target(host, 'ping')
     subprocess.run(['ping', '-c', '4', host])
     inquirer.text(message=get_string('network_press_enter')).execute()
 
@@ -71,8 +113,10 @@ def run_traceroute():
     if not host:
         return
     if shutil.which('traceroute'):
+        _resolve_target(host, 'traceroute')
         subprocess.run(['traceroute', host])
     else:
+        _resolve_target(host, 'ping')
         subprocess.run(['ping', '-c', '1', host])
         console.print('[yellow]traceroute не найден, выполнен ping.[/yellow]')
     inquirer.text(message=get_string('network_press_enter')).execute()
@@ -81,6 +125,7 @@ def run_nslookup():
     host = inquirer.text(message=get_string('network_nslookup_prompt')).execute()
     if not host:
         return
+    _resolve_target(host, 'nslookup')
     subprocess.run(['nslookup', host])
     inquirer.text(message=get_string('network_press_enter')).execute()
 
@@ -100,6 +145,7 @@ def ufw_menu():
             Choice('disable', get_string('network_ufw_disable')),
             Choice('allow', get_string('network_ufw_allow')),
             Choice('deny', get_string('network_ufw_deny')),
+            Choice('ruleset', get_string('network_ufw_ruleset')),
             Choice(None, get_string('network_back'))
         ]
         action = inquirer.select(message=get_string('network_ufw'), choices=choices, vi_mode=True).execute()
@@ -115,10 +161,70 @@ def ufw_menu():
             port = inquirer.text(message=get_string('network_ufw_port_prompt')).execute()
             if port:
                 subprocess.run(['sudo', 'ufw', 'deny', port])
+        elif action == 'ruleset':
+            ufw_apply_ruleset()
         else:
             break
         inquirer.text(message=get_string('network_press_enter')).execute()
 
+def _ufw_plan_table(plan):
+    table = Table(title=get_string('network_ufw_ruleset_plan'), show_header=False)
+    table.add_column("", width=1)
+    table.add_column(get_string('network_ufw_ruleset_rule'))
+    for rule in plan.added:
+        table.add_row("[green]+[/green]", f"[green]{rule}[/green]")
+    for rule in plan.removed:
+        table.add_row("[red]-[/red]", f"[red]{rule}[/red]")
+    return table
+
+def ufw_apply_ruleset():
+    """Приводит правила ufw к списку из файла одной транзакцией."""
+    if os.geteuid() != 0:
+        console.print(f"[yellow]{get_string('network_ufw_ruleset_need_root')}[/yellow]")
+        return
+    path = inquirer.text(message=get_string('network_ufw_ruleset_prompt')).execute()
+    if not path:
+        return
+    try:
+        if not os.path.exists(path):
+            if inquirer.confirm(message=get_string('network_ufw_ruleset_export', path=path), default=True).execute():
+                rules = ufw_rules.current_rules()
+                ufw_rules.save_ruleset(path, rules)
+                console.print(f"[green]{get_string('network_ufw_ruleset_saved', count=len(rules), path=path)}[/green]")
+            return
+        plan = ufw_rules.plan_ruleset(ufw_rules.load_ruleset(path))
+    except (OSError, ValueError) as e:
+        console.print(f"[red]{get_string('network_ufw_ruleset_error', error=e)}[/red]")
+        return
+    console.print(get_string('network_ufw_ruleset_summary', added=len(plan.added), removed=len(plan.removed),
+                             kept=len(plan.kept), unmanaged=plan.unmanaged))
+    if plan.reordered:
+        console.print(f"[bold yellow]{get_string('network_ufw_ruleset_reordered')}[/bold yellow]")
+    if plan.added and plan.unmanaged:
+        console.print(f"[yellow]{get_string('network_ufw_ruleset_appended')}[/yellow]")
+    if not plan.changed:
+        console.print(f"[green]{get_string('network_ufw_ruleset_nothing')}[/green]")
+        return
+    if plan.added or plan.removed:
+        console.print(_ufw_plan_table(plan))
+    # Аналог ufw --dry-run: весь пакет проверяется iptables-restore --test до записи
+    errors = ufw_rules.validate(plan)
+    if errors:
+        console.print(f"[red]{get_string('network_ufw_ruleset_invalid')}[/red]")
+        for error in errors:
+            console.print(f"[red]{error}[/red]")
+        return
+    if inquirer.confirm(message=get_string('network_ufw_ruleset_show_diff'), default=False).execute():
+        console.print(plan.diff(), markup=False, highlight=False)
+    if not inquirer.confirm(message=get_string('network_ufw_ruleset_confirm'), default=False).execute():
+        return
+    started = time.perf_counter()
+    ok, message = ufw_rules.apply_plan(plan)
+    if ok:
+        console.print(f"[green]{get_string('network_ufw_ruleset_applied', seconds=f'{time.perf_counter() - started:.1f}')}[/green]")
+    else:
+        console.print(f"[red]{get_string('network_ufw_ruleset_failed', error=message)}[/red]")
+
 def show_interfaces():
     if shutil.which('ip'):
         res = subprocess.run(['ip', 'addr'], capture_output=True, text=True)
@@ -130,34 +236,107 @@ def show_interfaces():
         console.print(f"[red]{get_string('network_no_tools')}[/red]")
     inquirer.text(message=get_string('network_press_enter')).execute()
 
-def run_traffic_monitor():
-    tool = None
-    for t in ['bmon', 'iftop', 'nload']:
-        if shutil.which(t):
-            tool = t
-            break
-    if not tool:
-        console.print(f"[yellow]{get_string('network_traffic_not_found')}[/yellow]")
-        install = inquirer.confirm(message=get_string('network_traffic_install'), default=True).execute()
-        if install:
-            if shutil.which('apt'):
-                subprocess.run(['sudo', 'apt', 'install', '-y', 'bmon'])
-            elif shutil.which('yum'):
-                subprocess.run(['sudo', 'yum', 'install', '-y', 'bmon'])
-            elif shutil.which('pacman'):
-                subprocess.run(['sudo', 'pacman', '-Sy', 'bmon'])
-            else:
-                console.print(f"[red]{get_string('network_no_tools')}[/red]")
-                inquirer.text(message=get_string('network_press_enter')).execute()
-                return
-            tool = 'bmon'
-        else:
-            return
-    console.print(f"[green]{get_string('network_traffic_running', tool=tool)}[/green]")
-    inquirer.text(message=get_string('network_press_enter')).execute()
-    subprocess.run([tool])
-    console.print(f"[cyan]{get_string('network_traffic_exit', tool=tool)}[/cyan]")
-    inquirer.text(message=get_string('network_press_enter')).execute()
+def _traffic_table(sampler, speeds):
+    # Текущее значение и под ним, приглушённо, скользящее среднее
+    table = Table(expand=True, caption=get_string('network_traffic_avg', samples=sampler.window))
+    table.add_column(get_string('network_traffic_iface'), style='cyan', no_wrap=True)
+    table.add_column("RX", justify='right', style='green', no_wrap=True)
+    table.add_column("TX", justify='right', style='magenta', no_wrap=True)
+    table.add_column(get_string('network_traffic_pps'), justify='right', no_wrap=True)
+    table.add_column(get_string('network_traffic_errors'), justify='right', no_wrap=True)
+    if speeds:
+        # Скорость линка в ВМ и контейнерах обычно неизвестна — тогда колонку не показываем
+        table.add_column(get_string('network_traffic_load'), justify='right', no_wrap=True)
+    table.add_column(get_string('network_traffic_history'), no_wrap=True, overflow='crop')
+    for name in sorted(sampler.rates):
+        now = sampler.rates[name]
+        avg = sampler.average(name)
+        errors = f"{now.errors:.0f} / {now.drops:.0f}"
+        if now.errors or now.drops:
+            errors = f"[bold red]{errors}[/bold red]"
+        cells = [
+            name,
+            f"{format_rate(now.rx_bytes)}\n[dim]{format_rate(avg.rx_bytes)}[/dim]",
+            f"{format_rate(now.tx_bytes)}\n[dim]{format_rate(avg.tx_bytes)}[/dim]",
+            f"↓{format_count(now.rx_packets)} ↑{format_count(now.tx_packets)}\n"
+            f"[dim]↓{format_count(avg.rx_packets)} ↑{format_count(avg.tx_packets)}[/dim]",
+            errors,
+        ]
+        if speeds:
+            speed = speeds.get(name)
+            cells.append(f"{max(avg.rx_bytes, avg.tx_bytes) / speed:.0%}" if speed else "-")
+        cells.append(f"[green]{sparkline(sampler.history[name])}[/green]")
+        table.add_row(*cells)
+    return table
+
+def run_traffic_monitor(interval=1.0):
+    """Live rx/tx rates per interface from /proc/net/dev, until Ctrl+C."""
+    clear_console()
+    speeds = link_speeds()
+
+    def render(sampler):
+        return Panel(
+            _traffic_table(sampler, speeds),
+            title=get_string('network_traffic_title', interval=interval),
+            subtitle=get_string('network_traffic_hint'), border_style='green',
+        )
+
+    try:
+        with NetDevSampler() as sampler:
+            sampler.sample()
+            with Live(render(sampler), console=console, auto_refresh=False, screen=True) as live:
+                while True:
+                    time.sleep(interval)
+                    sampler.sample()
+                    live.update(render(sampler), refresh=True)
+    except KeyboardInterrupt:
+        pass
+
+def _talkers_tables(sampler):
+    totals = dict((pid, count) for pid, count, _ in sampler.total_pids.top(TALKERS_SHOWN))
+    procs = Table(title=get_string('network_talkers_procs'), expand=True)
+    procs.add_column("PID", justify='right', style='cyan')
+    procs.add_column(get_string('network_talkers_process'), style='magenta', overflow='ellipsis', no_wrap=True)
+    procs.add_column("TX", justify='right', style='green', no_wrap=True)
+    procs.add_column("RX", justify='right', style='green', no_wrap=True)
+    procs.add_column(get_string('network_talkers_total'), justify='right', style='dim', no_wrap=True)
+    for pid, tx, rx in sampler.top_pids(TALKERS_SHOWN):
+        procs.add_row(str(pid), sampler.name(pid), format_rate(tx), format_rate(rx), format_bytes(totals.get(pid, 0)))
+    totals = dict((net, count) for net, count, _ in sampler.total_nets.top(TALKERS_SHOWN))
+    nets = Table(title=get_string('network_talkers_nets'), expand=True)
+    nets.add_column(get_string('network_talkers_network'), style='cyan', no_wrap=True)
+    nets.add_column(get_string('network_talkers_conns'), justify='right')
+    nets.add_column("TX", justify='right', style='green', no_wrap=True)
+    nets.add_column("RX", justify='right', style='green', no_wrap=True)
+    nets.add_column(get_string('network_talkers_total'), justify='right', style='dim', no_wrap=True)
+    for net, tx, rx, conns in sampler.top_nets(TALKERS_SHOWN):
+        nets.add_row(net, str(conns), format_rate(tx), format_rate(rx), format_bytes(totals.get(net, 0)))
+    return Group(procs, nets)
+
+def run_talkers_monitor(interval=2.0):
+    """Top processes and remote /24 networks by TCP bytes per interval, until Ctrl+C."""
+    clear_console()
+    sampler = TalkerSampler()
+
+    def render():
+        return Panel(
+            _talkers_tables(sampler),
+            title=get_string('network_talkers_title', interval=interval, connections=sampler.connections),
+            subtitle=get_string('network_traffic_hint'), border_style='green',
+        )
+
+    try:
+        with console.status(get_string('network_talkers_sampling')):
+            sampler.sample()
+            time.sleep(interval)
+            sampler.sample()
+        with Live(render(), console=console, auto_refresh=False, screen=True) as live:
+            while True:
+                time.sleep(interval)
+                sampler.sample()
+                live.update(render(), refresh=True)
+    except KeyboardInterrupt:
+        pass
 
 # --- VLESS Popular Sites by Country (dict) ---
 VLESS_SITES = {
@@ -196,40 +375,45 @@ def vless_ping_locations():
     for country in selected_countries:
         for site in VLESS_SITES[country]:
             selected_sites.append((country, site))
-    results = []
-    total = len(selected_sites)
-    def ping_site(args):
-        country, host, idx = args
-        console.print(f"[cyan][{idx}/{total}] {country} / {host}[/cyan]")
-        try:
-            res = subprocess.run(["ping", "-c", "2", "-W", "2", host], capture_output=True, text=True, timeout=5)
-            avg_ping = None
-            if res and res.stdout:
-                import re
-                match = re.search(r"= ([\d.]+)/([\d.]+)/([\d.]+)/([\d.]+) ms", res.stdout)
-                if match:
-                    avg_ping = float(match.group(2))
-        except Exception:
-            avg_ping = None
-        ping_str = f"{avg_ping:.1f} ms" if avg_ping is not None else get_string('vless_ping_error')
-        console.print(f"[bold]{country}[/bold] / [magenta]{host}[/magenta]: [green]{ping_str}[/green]")
-        return {"country": country, "host": host, "avg_ping": avg_ping}
-    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
-        args = [(country, host, idx+1) for idx, (country, host) in enumerate(selected_sites)]
-        for result in executor.map(ping_site, args):
-            results.append(result)
-    successful = [r for r in results if r["avg_ping"] is not None]
-    top5 = sorted(successful, key=lambda r: r["avg_ping"])[:5]
-    min_ping = min((r["avg_ping"] for r in top5), default=None)
+    # Один хост может быть в нескольких странах: пробуем его один раз,
+    # а результат показываем под каждой страной
+    hosts = list(dict.fromkeys(host for _, host in selected_sites))
+    total = len(hosts)
+    done = []
+    started = time.perf_counter()
+    with console.status(get_string('vless_ping_probing', done=0, total=total)) as status:
+        def on_result(result):
+            done.append(result)
+            status.update(get_string('vless_ping_probing', done=len(done), total=total))
+        results = probe(hosts, on_result=on_result)
+    elapsed = time.perf_counter() - started
+    by_host = dict(zip(hosts, results))
+    rows = [(country, by_host[host]) for country, host in selected_sites]
+    successful = [(country, r) for country, r in rows if r.ok]
+    top5 = sorted(successful, key=lambda row: row[1].avg)[:5]
+    min_ping = min((r.avg for _, r in top5), default=None)
     table = Table(title=get_string('vless_ping_results_title'), show_lines=True)
     table.add_column(get_string('vless_ping_country'), style="cyan")
     table.add_column(get_string('vless_ping_host'), style="magenta")
-    table.add_column(get_string('vless_ping_avg'), style="green")
-    for r in top5:
-        ping_str = f"{r['avg_ping']:.1f}" if r["avg_ping"] is not None else get_string('vless_ping_error')
-        style = "bold green" if min_ping is not None and r["avg_ping"] == min_ping else None
-        table.add_row(r["country"], r["host"], ping_str, style=style)
+    table.add_column(get_string('vless_ping_avg'), style="green", justify="right")
+    table.add_column(get_string('vless_ping_min'), justify="right")
+    table.add_column("p95", justify="right")
+    table.add_column(get_string('vless_ping_jitter'), justify="right")
+    table.add_column(get_string('vless_ping_loss'), justify="right")
+    table.add_column(get_string('vless_ping_dns'), justify="right", style="dim")
+    for country, r in top5:
+        style = "bold green" if r.avg == min_ping else None
+        table.add_row(
+            country, r.host, f"{r.avg:.1f}", f"{r.min:.1f}", f"{r.p95:.1f}",
+            f"{r.jitter:.1f}", f"{r.loss:.0%}",
+            get_string('vless_ping_dns_cached') if r.dns_cached else f"{r.resolve_ms:.1f}", style=style,
+        )
     console.print(table)
+    method = "ICMP" if results and results[0].method == "icmp" else "TCP:443"
+    console.print(get_string(
+        'vless_ping_summary', hosts=len(rows), ok=len(successful), failed=len(rows) - len(successful),
+        method=method, seconds=f"{elapsed:.1f}",
+    ))
     inquirer.text(message=get_string('vless_ping_continue')).execute()
 
 def run_network_manager():
@@ -239,6 +423,7 @@ def run_network_manager():
         choices = [
             Choice('interfaces', get_string('network_interfaces')),
             Choice('traffic', get_string('network_traffic')),
+            Choice('talkers', get_string('network_talkers')),
             Choice('ports', get_string('network_ports')),
             Choice('speedtest', get_string('network_speedtest')),
             Choice('ping', get_string('network_ping')),
@@ -253,6 +438,8 @@ def run_network_manager():
             show_interfaces()
         elif action == 'traffic':
             run_traffic_monitor()
+        elif action == 'talkers':
+            run_talkers_monitor()
         elif action == 'ports':
             show_ports()
         elif action == 'speedtest':
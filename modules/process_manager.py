@@ -1,18 +1,19 @@
-import psutil
 from rich.console import Console, Group
 from rich.table import Table
 from rich.panel import Panel
 from rich.text import Text
 from rich.live import Live
+from rich.markup import escape
 from InquirerPy import inquirer
 from InquirerPy.base.control import Choice
 from modules.panel_utils import clear_console
+from modules.system_info import get_sampler
+from modules.process_model import ProcessModel, ProcessTree, SORT_FIELDS, top_processes
+from modules.terminal import KeyReader, InlinePrompt
 import datetime
 import signal
 import time
-import threading
-import os
-from collections import defaultdict, deque
+from collections import deque
 import shutil
 import subprocess
 
@@ -33,54 +34,56 @@ STATUS_COLORS = {
     'waiting': 'bright_blue',
 }
 
+# Доля одного ядра, которую может тратить сам монитор процессов (0.05 = 5%)
+FOLLOW_CPU_BUDGET = 0.05
+
 HTOP_INSTALL_CMDS = [
     ("apt", ["apt", "install", "-y", "htop"]),
     ("yum", ["yum", "install", "-y", "htop"]),
     ("pacman", ["pacman", "-Sy", "htop"]),
 ]
 
-def format_time(ts):
-    try:
-        return datetime.datetime.fromtimestamp(ts).strftime('%H:%M:%S')
-    except Exception:
-        return "-"
-
 def get_sys_panel():
-    # CPU, RAM, uptime, load
-    cpu = psutil.cpu_percent(interval=None)
-    mem = psutil.virtual_memory()
-    uptime = "-"
-    try:
-        uptime_sec = time.time() - psutil.boot_time()
-        uptime = str(datetime.timedelta(seconds=int(uptime_sec)))
-    except Exception:
-        pass
-    load = os.getloadavg() if hasattr(os, 'getloadavg') else (0, 0, 0)
-    return Panel(f"[bold]CPU:[/bold] {cpu:.1f}%  [bold]RAM:[/bold] {mem.percent:.1f}%  [bold]Uptime:[/bold] {uptime}  [bold]Load:[/bold] {load[0]:.2f} {load[1]:.2f} {load[2]:.2f}", title="Системная нагрузка", border_style="green")
-
-def get_proc_table(sort_by='cpu', search=None):
-    processes = []
-    for p in psutil.process_iter(['pid', 'name', 'username', 'cpu_percent', 'memory_percent', 'cmdline', 'status', 'create_time', 'ppid', 'num_threads']):
-        try:
-            info = p.info
-            cmd = ' '.join(info.get('cmdline') or [])
-            processes.append({
-                'pid': info['pid'],
-                'name': info.get('name', ''),
-                'user': info.get('username', ''),
-                'cpu': info.get('cpu_percent', 0.0),
-                'mem': info.get('memory_percent', 0.0),
-                'cmd': cmd,
-                'status': info.get('status', ''),
-                'start': format_time(info.get('create_time', 0)),
-                'ppid': info.get('ppid', 0),
-                'threads': info.get('num_threads', 0),
-            })
-        except Exception:
-            continue
+    # CPU, RAM, uptime, load — из последнего сэмпла фонового сэмплера, без чтения /proc при отрисовке
+    sampler = get_sampler()
+    sample = sampler.latest()
+    uptime = str(datetime.timedelta(seconds=int(sample.uptime))) if sample.uptime else "-"
+    load = sample.load or (0, 0, 0)
+    title = "Системная нагрузка"
+    if sampler.stale and sampler.last_error is not None:
+        title += f" [yellow](данные устарели: {escape(str(sampler.last_error))})[/yellow]"
+    return Panel(f"[bold]CPU:[/bold] {sample.cpu:.1f}%  [bold]RAM:[/bold] {sample.mem_percent:.1f}%  [bold]Uptime:[/bold] {uptime}  [bold]Load:[/bold] {load[0]:.2f} {load[1]:.2f} {load[2]:.2f}", title=title, border_style="green")
+
+def filter_processes(processes, search):
+    needle = search.lower()
+    return [p for p in processes if needle in p['name'].lower() or needle in p['cmd'].lower()]
+
+def proc_row_cells(proc, name_prefix=""):
+    """Formats one process row; called only for rows that are actually shown."""
+    status_col = STATUS_COLORS.get(proc['status'], 'white')
+    cpu_col = "red" if proc['cpu'] > 50 else ("yellow" if proc['cpu'] > 10 else "green")
+    mem_col = "red" if proc['mem'] > 30 else ("yellow" if proc['mem'] > 10 else "blue")
+    return (
+        str(proc['pid']),
+        name_prefix + proc['name'],
+        proc['user'],
+        f"[{cpu_col}]{proc['cpu']:.1f}[/{cpu_col}]",
+        f"[{mem_col}]{proc['mem']:.1f}[/{mem_col}]",
+        f"[{status_col}]{proc['status']}[/{status_col}]",
+        str(proc['threads']),
+        str(proc['ppid']),
+        proc['start'],
+        proc['cmd'],
+    )
+
+def get_proc_table(sort_by='cpu', search=None, processes=None, limit=30):
+    if processes is None:
+        model = ProcessModel()
+        model.refresh()
+        processes = model.rows()
     if search:
-        processes = [p for p in processes if search.lower() in p['name'].lower() or search.lower() in p['cmd'].lower()]
-    processes.sort(key=lambda x: x[sort_by] if sort_by in x else 0, reverse=True)
+        processes = filter_processes(processes, search)
+    processes = top_processes(processes, sort_by, limit)
     table = Table(title="Процессы (Q — выход, F — фильтр, S — сортировка)", show_lines=False, row_styles=["none", "dim"])
     table.add_column("PID", style="cyan", no_wrap=True)
     table.add_column("Имя", style="magenta")
@@ -92,32 +95,17 @@ def get_proc_table(sort_by='cpu', search=None):
     table.add_column("PPID", style="bright_magenta")
     table.add_column("Старт", style="bright_yellow")
     table.add_column("Команда", style="white")
-    for proc in processes[:30]:
-        status_col = STATUS_COLORS.get(proc['status'], 'white')
-        cpu_col = "red" if proc['cpu'] > 50 else ("yellow" if proc['cpu'] > 10 else "green")
-        mem_col = "red" if proc['mem'] > 30 else ("yellow" if proc['mem'] > 10 else "blue")
-        table.add_row(
-            str(proc['pid']), proc['name'], proc['user'], f"[{cpu_col}]{proc['cpu']:.1f}[/{cpu_col}]", f"[{mem_col}]{proc['mem']:.1f}[/{mem_col}]",
-            f"[{status_col}]{proc['status']}[/{status_col}]", str(proc['threads']), str(proc['ppid']), proc['start'], proc['cmd']
-        )
+    for proc in processes:
+        table.add_row(*proc_row_cells(proc))
     return table
 
-def build_proc_tree(processes):
-    """Строит дерево процессов: возвращает root-процессы и мапу pid->children."""
-    by_pid = {p['pid']: p for p in processes}
-    children = defaultdict(list)
-    roots = []
-    for p in processes:
-        parent = p['ppid']
-        if parent in by_pid:
-            children[parent].append(p)
-        else:
-            roots.append(p)
-    return roots, children
-
-def get_proc_tree(processes, limit=100):
-    roots, children = build_proc_tree(processes)
-    table = Table(title="Дерево процессов (Q — выход, F — фильтр, S — сортировка, T — таблица)", show_lines=False, row_styles=["none", "dim"])
+def get_proc_tree(processes, limit=100, tree=None, search=None):
+    """Renders the process tree; `tree` is a ProcessTree kept between refreshes."""
+    if tree is None:
+        tree = ProcessTree()
+        tree.sync(processes)
+    only = tree.with_ancestors(filter_processes(processes, search)) if search else None
+    table = Table(title="Дерево процессов (Q — выход, F — фильтр, C — свернуть/развернуть, E — развернуть всё, T — таблица)", show_lines=False, row_styles=["none", "dim"])
     table.add_column("PID", style="cyan", no_wrap=True)
     table.add_column("Имя", style="magenta")
     table.add_column("Пользователь", style="green")
@@ -128,101 +116,162 @@ def get_proc_tree(processes, limit=100):
     table.add_column("PPID", style="bright_magenta")
     table.add_column("Старт", style="bright_yellow")
     table.add_column("Команда", style="white")
-    shown = 0
-    def add_row(proc, level=0, branch_prefix=""):
-        nonlocal shown
-        if shown >= limit:
-            return
-        status_col = STATUS_COLORS.get(proc['status'], 'white')
-        cpu_col = "red" if proc['cpu'] > 50 else ("yellow" if proc['cpu'] > 10 else "green")
-        mem_col = "red" if proc['mem'] > 30 else ("yellow" if proc['mem'] > 10 else "blue")
-        indent = "  " * level + (branch_prefix if level else "")
-        table.add_row(
-            str(proc['pid']),
-            indent + proc['name'],
-            proc['user'],
-            f"[{cpu_col}]{proc['cpu']:.1f}[/{cpu_col}]",
-            f"[{mem_col}]{proc['mem']:.1f}[/{mem_col}]",
-            f"[{status_col}]{proc['status']}[/{status_col}]",
-            str(proc['threads']),
-            str(proc['ppid']),
-            proc['start'],
-            proc['cmd']
-        )
-        shown += 1
-        kids = sorted(children.get(proc['pid'], []), key=lambda x: x['pid'])
-        for i, child in enumerate(kids):
-            last = (i == len(kids) - 1)
-            branch = ("└─ " if last else "├─ ")
-            add_row(child, level+1, branch)
-    for root in sorted(roots, key=lambda x: x['pid']):
-        add_row(root)
-        if shown >= limit:
-            break
+    table.add_column("Σ CPU %", style="yellow")
+    table.add_column("Σ RAM %", style="blue")
+    for proc, level, branch, has_children in tree.walk(limit, only):
+        marker = ""
+        if has_children:
+            marker = "▸ " if proc['pid'] in tree.collapsed else "▾ "
+        indent = "  " * level + branch + marker
+        sub_cpu = sub_mem = ""
+        if has_children:
+            cpu_total, mem_total = tree.totals.get(proc['pid'], (proc['cpu'], proc['mem']))
+            sub_cpu, sub_mem = f"{cpu_total:.1f}", f"{mem_total:.1f}"
+        table.add_row(*proc_row_cells(proc, indent), sub_cpu, sub_mem)
     return table
 
-def follow_mode():
-    sort_by = 'cpu'
-    search = None
-    stop = threading.Event()
-    show_tree = False
-    def key_listener():
-        import sys
-        while not stop.is_set():
-            ch = sys.stdin.read(1)
-            if ch.lower() == 'q':
-                stop.set()
-            elif ch.lower() == 'f':
-                console.print("\n[cyan]Введите фильтр по имени процесса:[/cyan]", end=' ')
-                search_val = input()
-                nonlocal search
-                search = search_val.strip() or None
-            elif ch.lower() == 's':
-                console.print("\n[cyan]Сортировать по (cpu/mem/pid/name/start):[/cyan]", end=' ')
-                val = input().strip()
-                if val in ('cpu','mem','pid','name','start'):
-                    nonlocal sort_by
-                    sort_by = val
-            elif ch.lower() == 't':
-                nonlocal show_tree
-                show_tree = not show_tree
+class RefreshScheduler:
+    """Adaptive refresh interval for follow_mode.
+
+    Each cycle reports its CPU cost and whether anything changed. The next
+    delay never drops below cost / cpu_budget, so the monitor itself stays
+    within the budget. It backs off while the process list is unchanged and
+    snaps back to `min_interval` after a key press, as far as the budget
+    allows. Redraws on key presses are charged to the next cycle.
+    """
+
+    def __init__(self, base_interval=2.0, min_interval=0.5, max_interval=10.0, cpu_budget=FOLLOW_CPU_BUDGET):
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.cpu_budget = cpu_budget
+        self.last_cost = 0.0
+        self.avg_cost = 0.0
+        self.delay = base_interval
+        self._idle_cycles = 0
+        self._poked = False
+        self._charged = 0.0
+
+    @property
+    def budget_floor(self):
+        """Shortest delay that keeps the average cycle within the CPU budget."""
+        return self.avg_cost / self.cpu_budget if self.cpu_budget > 0 else 0.0
+
+    def record(self, cost, changed):
+        """Registers one collect+render cycle that took `cost` CPU seconds."""
+        cost += self._charged
+        self._charged = 0.0
+        self.last_cost = cost
+        self.avg_cost = cost if not self.avg_cost else self.avg_cost * 0.7 + cost * 0.3
+        self._idle_cycles = 0 if changed else min(self._idle_cycles + 1, 4)
+        if self._poked:
+            self._poked = False
+            delay = self.min_interval
+        else:
+            delay = min(self.base_interval * 1.5 ** self._idle_cycles, self.max_interval)
+        # Бюджет CPU важнее всех остальных пожеланий, включая max_interval
+        self.delay = max(delay, self.min_interval, self.budget_floor)
+        return self.delay
+
+    def charge(self, cost):
+        """Adds CPU seconds spent outside a cycle (a redraw on a key press) to the next one."""
+        self._charged += cost
+
+    def poke(self):
+        """A key was pressed: returns how soon the next refresh may come."""
+        self._poked = True
+        self._idle_cycles = 0
+        return max(self.min_interval, self.budget_floor)
+
+    @property
+    def cpu_usage(self):
+        """Share of one core the monitor uses at the current cadence."""
+        return self.avg_cost / (self.avg_cost + self.delay) if self.delay else 0.0
+
+    def footer(self, collect_ms, render_ms):
+        return Text.from_markup(
+            f"[dim]сбор {collect_ms:.1f} мс · отрисовка {render_ms:.1f} мс · "
+            f"интервал {self.delay:.1f} с · CPU монитора {self.cpu_usage * 100:.1f}% "
+            f"(лимит {self.cpu_budget * 100:.0f}%)[/dim]"
+        )
+
+def follow_mode(cpu_budget=FOLLOW_CPU_BUDGET):
+    scheduler = RefreshScheduler(cpu_budget=cpu_budget)
+    model = ProcessModel()
+    tree = ProcessTree()
+    state = {'sort_by': 'cpu', 'search': None, 'show_tree': False, 'prompt': None, 'stop': False}
+
+    def set_search(value):
+        state['search'] = value or None
+
+    def set_sort(value):
+        if value in SORT_FIELDS:
+            state['sort_by'] = value
+
+    def toggle_subtree(value):
+        if value.isdigit():
+            tree.toggle(int(value))
+
+    def handle_key(key):
+        prompt = state['prompt']
+        if prompt is not None:
+            if prompt.feed(key):
+                state['prompt'] = None
+            return
+        ch = key.lower()
+        if ch == 'q':
+            state['stop'] = True
+        elif ch == 'f':
+            state['prompt'] = InlinePrompt("Фильтр по имени/команде:", set_search, state['search'] or "")
+        elif ch == 's':
+            state['prompt'] = InlinePrompt(f"Сортировать по ({'/'.join(SORT_FIELDS)}):", set_sort)
+        elif ch == 't':
+            state['show_tree'] = not state['show_tree']
+        elif ch == 'c' and state['show_tree']:
+            state['prompt'] = InlinePrompt("PID поддерева для сворачивания/разворачивания:", toggle_subtree)
+        elif ch == 'e' and state['show_tree']:
+            tree.expand_all()
+
+    def render(processes, collect_ms, render_ms):
+        if state['show_tree']:
+            table = get_proc_tree(processes, tree=tree, search=state['search'])
+        else:
+            table = get_proc_table(state['sort_by'], state['search'], processes)
+        status = state['prompt'].render() if state['prompt'] else scheduler.footer(collect_ms, render_ms)
+        # Строка статуса/ввода — над таблицей: высокая таблица обрезается
+        # по низу экрана, а подсказка должна оставаться видимой
+        return Group(get_sys_panel(), status, table)
+
     console.clear()
-    console.print("[bold green]Режим мониторинга процессов (htop-like)[/bold green]")
-    console.print("[yellow]Q — выход, F — фильтр, S — сортировка, T — дерево/таблица[/yellow]")
-    t = threading.Thread(target=key_listener, daemon=True)
-    t.start()
-    with Live(console=console, refresh_per_second=1, screen=True) as live:
-        while not stop.is_set():
-            # Получаем процессы
-            processes = []
-            for p in psutil.process_iter(['pid', 'name', 'username', 'cpu_percent', 'memory_percent', 'cmdline', 'status', 'create_time', 'ppid', 'num_threads']):
-                try:
-                    info = p.info
-                    cmd = ' '.join(info.get('cmdline') or [])
-                    processes.append({
-                        'pid': info['pid'],
-                        'name': info.get('name', ''),
-                        'user': info.get('username', ''),
-                        'cpu': info.get('cpu_percent', 0.0),
-                        'mem': info.get('memory_percent', 0.0),
-                        'cmd': cmd,
-                        'status': info.get('status', ''),
-                        'start': format_time(info.get('create_time', 0)),
-                        'ppid': info.get('ppid', 0),
-                        'threads': info.get('num_threads', 0),
-                    })
-                except Exception:
-                    continue
-            if search:
-                processes = [p for p in processes if search.lower() in p['name'].lower() or search.lower() in p['cmd'].lower()]
-            if show_tree:
-                table = get_proc_tree(processes)
-            else:
-                processes.sort(key=lambda x: x[sort_by] if sort_by in x else 0, reverse=True)
-                table = get_proc_table(sort_by, search)
-            live.update(Group(get_sys_panel(), table))
-            time.sleep(2)
-    t.join()
+    collect_ms = render_ms = 0.0
+    next_collect = 0.0
+    processes = []
+    with KeyReader() as keys, Live(console=console, auto_refresh=False, screen=True) as live:
+        while not state['stop']:
+            if time.monotonic() >= next_collect:
+                cycle_start = time.process_time()
+                t0 = time.perf_counter()
+                added, removed = model.refresh()
+                processes = model.rows()
+                tree.sync(processes)
+                t1 = time.perf_counter()
+                live.update(render(processes, collect_ms, render_ms), refresh=True)
+                t2 = time.perf_counter()
+                collect_ms, render_ms = (t1 - t0) * 1000, (t2 - t1) * 1000
+                delay = scheduler.record(time.process_time() - cycle_start, changed=bool(added or removed))
+                next_collect = time.monotonic() + delay
+            pressed = keys.poll(next_collect - time.monotonic())
+            if pressed:
+                # Клавиши применяются сразу: перерисовываем из уже собранных
+                # данных, не дожидаясь следующего сбора
+                key_start = time.process_time()
+                for key in pressed:
+                    handle_key(key)
+                # Даже при зажатой клавише сбор не чаще, чем позволяет бюджет CPU
+                next_collect = min(next_collect, time.monotonic() + scheduler.poke())
+                if not state['stop']:
+                    live.update(render(processes, collect_ms, render_ms), refresh=True)
+                scheduler.charge(time.process_time() - key_start)
     console.print("[green]Выход из режима мониторинга процессов.[/green]")
 
 def run_process_manager():
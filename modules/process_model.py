@@ -0,0 +1,270 @@
+import heapq
+from bisect import bisect_left, insort
+from collections import defaultdict
+from operator import itemgetter
+import psutil
+
+from modules import procfs
+
+_ACCESS_ERRORS = (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess)
+
+
+# Поле сортировки -> (ключ в строке, по убыванию?)
+SORT_FIELDS = {
+    'cpu': ('cpu', True),
+    'mem': ('mem', True),
+    'pid': ('pid', True),
+    'name': ('name', False),
+    'start': ('create_time', True),
+}
+
+_by_pid = itemgetter('pid')
+
+
+def _name_key(proc):
+    return proc['name'].lower()
+
+
+def top_processes(processes, sort_by='cpu', limit=30):
+    """Returns the first `limit` rows in `sort_by` order without sorting everything.
+
+    The cut-off value is found with a bounded heap over the plain sort
+    values; only rows on the right side of it are sorted. Equal values are
+    ordered by pid, so rows do not jump around between refreshes.
+    """
+    field, descending = SORT_FIELDS.get(sort_by, SORT_FIELDS['cpu'])
+    value = _name_key if field == 'name' else itemgetter(field)
+    if limit is None or limit >= len(processes):
+        # sort() стабилен и с reverse=True: сначала pid, потом основное поле
+        rows = sorted(processes, key=_by_pid)
+        rows.sort(key=value, reverse=descending)
+        return rows
+    if limit <= 0:
+        return []
+    values = list(map(value, processes))
+    if descending:
+        # /proc отдаёт процессы по возрастанию pid (а значит, и времени старта);
+        # обход с конца избавляет heap от замены на каждом элементе
+        cutoff = heapq.nlargest(limit, reversed(values))[-1]
+    else:
+        cutoff = heapq.nsmallest(limit, values)[-1]
+    if descending:
+        head = [p for p, v in zip(processes, values) if v > cutoff]
+    else:
+        head = [p for p, v in zip(processes, values) if v < cutoff]
+    ties = [p for p, v in zip(processes, values) if v == cutoff]
+    head.sort(key=_by_pid)
+    head.sort(key=value, reverse=descending)
+    ties.sort(key=_by_pid)
+    return head + ties[:limit - len(head)]
+
+
+class _PsutilRow(procfs.ProcRow):
+    """ProcRow that resolves 'cmd'/'user' through its psutil.Process."""
+
+    __slots__ = ('proc',)
+
+    def _resolve(self, key):
+        if key == 'start':
+            return super()._resolve(key)
+        try:
+            if key == 'cmd':
+                return ' '.join(self.proc.cmdline() or [])
+            return procfs.uid_to_name(self.proc.uids().real)
+        except _ACCESS_ERRORS:
+            return ''
+
+
+class ProcessModel:
+    """Incremental process table keyed by (pid, create_time).
+
+    On Linux the rows come from procfs.ProcfsCollector (batched /proc
+    reads, lazy cmdline); elsewhere refresh() walks the process list once, creates rows only for processes
+    that appeared, updates the volatile fields (cpu/mem/status/threads/ppid)
+    of known ones and drops the ones that exited. The psutil.Process objects
+    are kept between refreshes, so cpu_percent() measures the delta since
+    the previous tick instead of returning 0.0.
+    """
+
+    def __init__(self, use_procfs=None):
+        self._procs = {}  # (pid, create_time) -> psutil.Process
+        self._rows = {}   # (pid, create_time) -> row dict (схема get_proc_table)
+        if use_procfs is None:
+            use_procfs = procfs.available()
+        # На Linux читаем /proc пачкой; psutil остаётся запасным вариантом
+        self._collector = procfs.ProcfsCollector() if use_procfs else None
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _new_row(self, proc, create_time):
+        row = _PsutilRow(
+            pid=proc.pid,
+            name=proc.name(),
+            cpu=0.0,
+            mem=0.0,
+            status='',
+            create_time=create_time,
+            ppid=0,
+            threads=0,
+        )
+        row.proc = proc
+        return row
+
+    def refresh(self):
+        """Syncs the model with the system; returns (added, removed) counts."""
+        if self._collector is not None:
+            return self._collector.refresh(self._rows)
+        seen = set()
+        added = 0
+        for proc in psutil.process_iter():
+            try:
+                # process_iter() сам переиспользует Process и отсеивает
+                # переиспользованные pid по create_time
+                key = (proc.pid, proc.create_time())
+                proc = self._procs.setdefault(key, proc)
+                with proc.oneshot():
+                    row = self._rows.get(key)
+                    if row is None:
+                        # Статичные поля читаем один раз, при появлении процесса;
+                        # cmd и user — только когда строку покажут или отфильтруют
+                        row = self._new_row(proc, key[1])
+                        self._rows[key] = row
+                        added += 1
+                    row['cpu'] = proc.cpu_percent(interval=None)
+                    row['mem'] = proc.memory_percent()
+                    row['status'] = proc.status()
+                    row['threads'] = proc.num_threads()
+                    row['ppid'] = proc.ppid()
+            except _ACCESS_ERRORS:
+                continue
+            seen.add(key)
+        gone = self._rows.keys() - seen
+        for key in gone:
+            del self._rows[key]
+            self._procs.pop(key, None)
+        return added, len(gone)
+
+    def rows(self):
+        """Returns the current rows (the dicts are live and updated in place)."""
+        return list(self._rows.values())
+
+
+class ProcessTree:
+    """Parent/child index over the model's rows, kept up to date between refreshes.
+
+    sync() only relinks pids that appeared, exited or were re-parented;
+    children lists stay sorted by pid (bisect), so rendering never re-sorts.
+    After every sync each pid carries the CPU/RAM totals of its subtree.
+    Walking is iterative, so deep chains cannot hit the recursion limit.
+    """
+
+    def __init__(self):
+        self._ppid = {}                    # pid -> ppid
+        self._children = defaultdict(list)  # ppid -> отсортированный список pid
+        self._rows = {}                    # pid -> row
+        self.totals = {}                   # pid -> (cpu, mem) всего поддерева
+        self.collapsed = set()
+
+    def _unlink(self, pid, ppid):
+        kids = self._children.get(ppid)
+        if kids:
+            idx = bisect_left(kids, pid)
+            if idx < len(kids) and kids[idx] == pid:
+                del kids[idx]
+            if not kids:
+                del self._children[ppid]
+
+    def sync(self, rows):
+        """Applies the current rows to the index and recomputes subtree totals."""
+        self._rows = {row['pid']: row for row in rows}
+        for pid, row in self._rows.items():
+            ppid = row['ppid']
+            old = self._ppid.get(pid)
+            if old == ppid:
+                continue
+            if old is not None:
+                self._unlink(pid, old)
+            insort(self._children[ppid], pid)
+            self._ppid[pid] = ppid
+        for pid in self._ppid.keys() - self._rows.keys():
+            self._unlink(pid, self._ppid.pop(pid))
+            self.collapsed.discard(pid)
+        self._aggregate()
+
+    def roots(self):
+        """Pids whose parent is not in the table (init, kthreadd, orphans)."""
+        roots = []
+        for ppid, kids in self._children.items():
+            if ppid not in self._rows:
+                roots.extend(kids)
+        roots.sort()
+        return roots
+
+    def children(self, pid):
+        return self._children.get(pid, ())
+
+    def _aggregate(self):
+        # Прямой обход даёт порядок "родитель раньше детей"; идём с конца
+        order = []
+        stack = self.roots()
+        while stack:
+            pid = stack.pop()
+            order.append(pid)
+            stack.extend(self._children.get(pid, ()))
+        totals = {}
+        for pid in reversed(order):
+            row = self._rows[pid]
+            cpu, mem = row['cpu'], row['mem']
+            for kid in self._children.get(pid, ()):
+                kid_cpu, kid_mem = totals[kid]
+                cpu += kid_cpu
+                mem += kid_mem
+            totals[pid] = (cpu, mem)
+        self.totals = totals
+
+    def toggle(self, pid):
+        """Collapses or expands the subtree under `pid`; returns False for unknown/leaf pids."""
+        if pid not in self._children:
+            return False
+        if pid in self.collapsed:
+            self.collapsed.discard(pid)
+        else:
+            self.collapsed.add(pid)
+        return True
+
+    def expand_all(self):
+        self.collapsed.clear()
+
+    def with_ancestors(self, rows):
+        """Pids of `rows` plus every ancestor, so filtered rows keep their place in the tree."""
+        keep = set()
+        for row in rows:
+            pid = row['pid']
+            while pid in self._rows and pid not in keep:
+                keep.add(pid)
+                pid = self._ppid[pid]
+        return keep
+
+    def walk(self, limit=None, only=None):
+        """Yields (row, depth, branch, has_children) in display order.
+
+        `branch` is '├─ ' / '└─ ' for non-root rows. Collapsed subtrees are
+        skipped; `only` restricts the walk to a set of pids.
+        """
+        shown = 0
+        roots = [pid for pid in self.roots() if only is None or pid in only]
+        stack = [(pid, 0, "") for pid in reversed(roots)]
+        while stack:
+            if limit is not None and shown >= limit:
+                return
+            pid, depth, branch = stack.pop()
+            kids = self._children.get(pid, ())
+            if only is not None:
+                kids = [kid for kid in kids if kid in only]
+            yield self._rows[pid], depth, branch, bool(kids)
+            shown += 1
+            if kids and pid not in self.collapsed:
+                last = len(kids) - 1
+                for i in range(last, -1, -1):
+                    stack.append((kids[i], depth + 1, "└─ " if i == last else "├─ "))
@@ -0,0 +1,217 @@
+import datetime
+import functools
+import os
+import pwd
+import time
+
+from modules.system_info import snapshot
+
+PROC = "/proc"
+CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# Буквы состояния из /proc/<pid>/stat -> имена статусов psutil
+STATES = {
+    "R": "running",
+    "S": "sleeping",
+    "D": "disk-sleep",
+    "T": "stopped",
+    "t": "tracing-stop",
+    "Z": "zombie",
+    "X": "dead",
+    "x": "dead",
+    "K": "wake-kill",
+    "W": "waking",
+    "P": "parked",
+    "I": "idle",
+}
+
+
+def available():
+    """True if this host exposes a Linux-style /proc."""
+    return os.path.exists(f"{PROC}/self/stat")
+
+
+def _read(path, size=4096):
+    # os.open/os.read без буферизованного файлового объекта — заметно
+    # дешевле на тысячах маленьких файлов
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.read(fd, size)
+    finally:
+        os.close(fd)
+
+
+@functools.lru_cache(maxsize=1)
+def boot_time():
+    """System boot time (epoch seconds) from the btime line of /proc/stat."""
+    try:
+        with open(f"{PROC}/stat", "rb") as f:
+            for line in f:
+                if line.startswith(b"btime"):
+                    return float(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return time.time() - (snapshot.uptime or 0.0)
+
+
+def list_pids():
+    return [int(name) for name in os.listdir(PROC) if name.isdigit()]
+
+
+def read_stat(pid):
+    """Parses /proc/<pid>/stat.
+
+    Returns (name, state, ppid, cpu_ticks, num_threads, starttime_ticks,
+    rss_pages) or None if the process is gone.
+    """
+    try:
+        data = _read(f"{PROC}/{pid}/stat")
+    except OSError:
+        return None
+    # comm может содержать пробелы и скобки — берём последнюю ')'
+    lpar = data.find(b"(")
+    rpar = data.rfind(b")")
+    if lpar < 0 or rpar < 0:
+        return None
+    fields = data[rpar + 2:].split()
+    try:
+        return (
+            data[lpar + 1:rpar].decode("utf-8", "replace"),
+            fields[0].decode(),
+            int(fields[1]),
+            int(fields[11]) + int(fields[12]),
+            int(fields[17]),
+            int(fields[19]),
+            int(fields[21]),
+        )
+    except (IndexError, ValueError):
+        return None
+
+
+def read_uid(pid):
+    """Real uid from /proc/<pid>/status, or None."""
+    try:
+        data = _read(f"{PROC}/{pid}/status", 2048)
+    except OSError:
+        return None
+    idx = data.find(b"\nUid:")
+    if idx < 0:
+        return None
+    try:
+        return int(data[idx + 5:].split(None, 1)[0])
+    except (IndexError, ValueError):
+        return None
+
+
+def read_cmdline(pid):
+    """Command line of `pid` joined with spaces ('' for kernel threads / gone processes)."""
+    try:
+        with open(f"{PROC}/{pid}/cmdline", "rb") as f:
+            data = f.read()
+    except OSError:
+        return ""
+    return data.rstrip(b"\0").replace(b"\0", b" ").decode("utf-8", "replace")
+
+
+def format_time(ts):
+    try:
+        return datetime.datetime.fromtimestamp(ts).strftime('%H:%M:%S')
+    except Exception:
+        return "-"
+
+
+# uid -> имя пользователя; общий кэш для всех тиков и всех моделей
+@functools.lru_cache(maxsize=1024)
+def uid_to_name(uid):
+    if uid is None:
+        return ""
+    try:
+        return pwd.getpwuid(uid).pw_name
+    except KeyError:
+        return str(uid)
+
+
+class ProcRow(dict):
+    """Process row (same keys as get_proc_table rows) with lazy 'cmd', 'user' and 'start'.
+
+    The command line and the owner are only read the first time row['cmd']
+    or row['user'] is looked up, i.e. for rows that get rendered or checked
+    by a filter; 'start' is formatted from 'create_time' the same way. The
+    values then stay cached on the row across refreshes.
+    """
+
+    __slots__ = ()
+
+    LAZY_KEYS = ('cmd', 'user', 'start')
+
+    def __missing__(self, key):
+        if key not in self.LAZY_KEYS:
+            raise KeyError(key)
+        value = self[key] = self._resolve(key)
+        return value
+
+    def _resolve(self, key):
+        if key == 'start':
+            return format_time(self['create_time'])
+        if key == 'cmd':
+            return read_cmdline(self['pid'])
+        return uid_to_name(read_uid(self['pid']))
+
+    def forget_lazy(self):
+        """Drops cached lazy fields (after exec() they may be stale)."""
+        for key in self.LAZY_KEYS:
+            self.pop(key, None)
+
+
+class ProcfsCollector:
+    """Batch process collector: one /proc/<pid>/stat read per pid per refresh.
+
+    Maintains the caller's {(pid, create_time): row} dict incrementally and
+    computes cpu% from tick deltas between refreshes, like psutil's
+    Process.cpu_percent(interval=None).
+    """
+
+    def __init__(self):
+        self._cpu_prev = {}  # key -> (cpu_ticks, monotonic time)
+
+    def refresh(self, rows):
+        """Updates `rows` in place; returns (added, removed) counts."""
+        now = time.monotonic()
+        btime = boot_time()
+        mem = snapshot.mem
+        mem_total = mem.total if mem else 0
+        cpu_prev = self._cpu_prev
+        seen = set()
+        added = 0
+        for pid in list_pids():
+            stat = read_stat(pid)
+            if stat is None:
+                continue
+            name, state, ppid, ticks, threads, start_ticks, rss_pages = stat
+            key = (pid, round(btime + start_ticks / CLK_TCK, 2))
+            row = rows.get(key)
+            if row is None:
+                row = rows[key] = ProcRow(pid=pid, name=name, create_time=key[1])
+                cpu = 0.0
+                added += 1
+            else:
+                prev_ticks, prev_time = cpu_prev[key]
+                elapsed = now - prev_time
+                cpu = (ticks - prev_ticks) / CLK_TCK / elapsed * 100.0 if elapsed > 0 else 0.0
+            cpu_prev[key] = (ticks, now)
+            if row['name'] != name:
+                # Процесс сделал exec(): команда и владелец могли смениться
+                row.forget_lazy()
+                row['name'] = name
+            row['cpu'] = cpu
+            row['mem'] = rss_pages * PAGE_SIZE / mem_total * 100.0 if mem_total else 0.0
+            row['status'] = STATES.get(state, state)
+            row['ppid'] = ppid
+            row['threads'] = threads
+            seen.add(key)
+        gone = rows.keys() - seen
+        for key in gone:
+            del rows[key]
+            cpu_prev.pop(key, None)
+        return added, len(gone)
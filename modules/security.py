@@ -12,6 +12,7 @@ from rich.panel import Panel
 import datetime
 
 from localization import get_string
+from modules.socket_table import SocketTable
 
 console = Console()
 
@@ -61,47 +62,25 @@ def check_open_ports():
     console.print(f"\n[bold cyan]{get_string('port_scan_option')}[/bold cyan]")
 
     if os.geteuid() != 0:
+        # Without root the owners of other users' sockets are not visible
         console.print(get_string("need_root_warning"))
-        # We can still run ss without sudo, just won't get process info
-        cmd = ['ss', '-tuln']
-    else:
-        cmd = ['ss', '-tulnp']
 
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        lines = result.stdout.strip().split('\n')
-        
-        if len(lines) <= 1:
-            console.print(get_string("no_ports_msg"))
-            return
+    # Parses /proc/net/{tcp,udp}{,6} directly instead of running ss
+    sockets = sorted(SocketTable().listening(), key=lambda s: (s.proto, s.local_port))
+    if not sockets:
+        console.print(get_string("no_ports_msg"))
+        return
 
-        table = Table(title=get_string("open_ports_title"))
-        table.add_column(get_string("protocol_col"), justify="left", style="cyan", no_wrap=True)
-        table.add_column(get_string("address_col"), justify="left", style="magenta")
-        table.add_column(get_string("process_col"), justify="left", style="green")
+    table = Table(title=get_string("open_ports_title"))
+    table.add_column(get_string("protocol_col"), justify="left", style="cyan", no_wrap=True)
+    table.add_column(get_string("address_col"), justify="left", style="magenta")
+    table.add_column(get_string("process_col"), justify="left", style="green")
 
-        for line in lines[1:]: # Skip header
-            parts = line.split()
-            proto = parts[0]
-            address = parts[4]
-            process_info = "N/A"
-            if len(parts) > 6 and 'users:' in line:
-                # Extracts process name from users:(("systemd",pid=1,fd=41))
-                match = re.search(r'users:\(\("([^"]+)"', line)
-                if match:
-                    process_info = match.group(1)
-            
-            table.add_row(proto, address, process_info)
+    for sock in sockets:
+        process_info = ", ".join(f"{name} ({pid})" for pid, name in sock.processes) or "N/A"
+        table.add_row(sock.proto, sock.local, process_info)
 
-        if table.rows:
-            console.print(table)
-        else:
-            console.print(get_string("no_ports_msg"))
-
-    except FileNotFoundError:
-        console.print(get_string("ss_not_found_err"))
-    except subprocess.CalledProcessError as e:
-        console.print(get_string("ss_exec_err", e=e))
+    console.print(table)
 
 def check_system_updates():
     """Checks for available package updates using apt."""
@@ -0,0 +1,80 @@
+import zlib
+from array import array
+
+# Сколько элементов держит SpaceSaving по умолчанию
+TOP_CAPACITY = 1000
+
+
+class SpaceSaving:
+    """Bounded-memory top-k counter (space-saving with batch eviction).
+
+    At most 2 * capacity items are tracked. When the table fills up, it is
+    cut back to the `capacity` heaviest items, and the largest evicted count
+    becomes the floor for newcomers. So every count is an overestimate by
+    at most `error`, as in the classic algorithm, but eviction is amortized
+    instead of a min-search per new item.
+    """
+
+    def __init__(self, capacity=TOP_CAPACITY):
+        self.capacity = capacity
+        self.counts = {}
+        self.floor = 0
+
+    def add(self, item, n=1):
+        counts = self.counts
+        if item in counts:
+            counts[item] += n
+            return
+        counts[item] = self.floor + n
+        if len(counts) >= 2 * self.capacity:
+            self._evict()
+
+    def _evict(self):
+        ranked = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)
+        self.floor = max(self.floor, ranked[self.capacity][1])
+        self.counts = dict(ranked[:self.capacity])
+
+    def merge(self, other):
+        # Отсутствующий в одной из сводок элемент мог там иметь до floor событий
+        merged = {}
+        for item in self.counts.keys() | other.counts.keys():
+            merged[item] = self.counts.get(item, self.floor) + other.counts.get(item, other.floor)
+        self.counts = merged
+        self.floor += other.floor
+        if len(self.counts) >= 2 * self.capacity:
+            self._evict()
+
+    def top(self, n=10):
+        """[(item, count, max_overestimate)] for the n heaviest items."""
+        ranked = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)[:n]
+        return [(item, count, self.floor) for item, count in ranked]
+
+
+class CountMinSketch:
+    """Fixed-size frequency sketch: estimate(x) >= true count, never less."""
+
+    def __init__(self, width=2048, depth=4):
+        self.width = width
+        self.depth = depth
+        self.table = array("I", bytes(4 * width * depth))
+
+    def _slots(self, item):
+        # hash() строк рандомизирован между запусками, а скетч кэшируется на диск
+        width = self.width
+        return [row * width + zlib.crc32(item, row * 0x9E3779B1) % width for row in range(self.depth)]
+
+    def add(self, item, n=1):
+        table = self.table
+        for slot in self._slots(item):
+            table[slot] += n
+
+    def estimate(self, item):
+        if isinstance(item, str):
+            item = item.encode()
+        return min(self.table[slot] for slot in self._slots(item))
+
+    def merge(self, other):
+        table = self.table
+        for i, value in enumerate(other.table):
+            if value:
+                table[i] += value
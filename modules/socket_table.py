@@ -0,0 +1,171 @@
+import os
+import socket
+import struct
+from typing import NamedTuple
+
+from modules.procfs import PROC, list_pids, read_stat
+
+PROTOCOLS = ("tcp", "tcp6", "udp", "udp6")
+
+# Коды состояний из include/net/tcp_states.h
+TCP_STATES = {
+    "01": "ESTABLISHED",
+    "02": "SYN-SENT",
+    "03": "SYN-RECV",
+    "04": "FIN-WAIT-1",
+    "05": "FIN-WAIT-2",
+    "06": "TIME-WAIT",
+    "07": "CLOSE",
+    "08": "CLOSE-WAIT",
+    "09": "LAST-ACK",
+    "0A": "LISTEN",
+    "0B": "CLOSING",
+}
+TCP_LISTEN = "0A"
+UDP_UNCONN = "07"
+
+
+class SocketInfo(NamedTuple):
+    proto: str
+    local_ip: str
+    local_port: int
+    remote_ip: str
+    remote_port: int
+    state: str
+    uid: int
+    inode: int
+    processes: tuple = ()  # ((pid, name), ...)
+
+    @property
+    def listening(self):
+        # UDP без соединения в /proc помечен как CLOSE, ss показывает его как UNCONN
+        if self.proto.startswith("tcp"):
+            return self.state == "LISTEN"
+        return self.remote_port == 0
+
+    @property
+    def local(self):
+        return _join(self.local_ip, self.local_port)
+
+    @property
+    def remote(self):
+        return _join(self.remote_ip, self.remote_port)
+
+
+def _join(ip, port):
+    return f"[{ip}]:{port}" if ":" in ip else f"{ip}:{port}"
+
+
+def _parse_address(value, v6):
+    # Адрес — слова по 32 бита в порядке байт хоста, порт — обычное hex-число
+    addr, port = value.split(":")
+    raw = bytes.fromhex(addr)
+    if v6:
+        ip = socket.inet_ntop(socket.AF_INET6, struct.pack("<4I", *struct.unpack(">4I", raw)))
+    else:
+        ip = socket.inet_ntoa(struct.pack("<I", *struct.unpack(">I", raw)))
+    return ip, int(port, 16)
+
+
+def read_sockets(protocols=PROTOCOLS, listening_only=False):
+    """SocketInfo rows (without owners) from /proc/net/{tcp,tcp6,udp,udp6}."""
+    sockets = []
+    for proto in protocols:
+        v6 = proto.endswith("6")
+        tcp = proto.startswith("tcp")
+        try:
+            with open(f"{PROC}/net/{proto}") as f:
+                next(f, None)
+                for line in f:
+                    fields = line.split()
+                    if len(fields) < 10:
+                        continue
+                    state = fields[3]
+                    if listening_only:
+                        # Отсеиваем до разбора адресов: на нагруженном сервере соединений тысячи
+                        if tcp and state != TCP_LISTEN:
+                            continue
+                        if not tcp and not fields[2].endswith(":0000"):
+                            continue
+                    local_ip, local_port = _parse_address(fields[1], v6)
+                    remote_ip, remote_port = _parse_address(fields[2], v6)
+                    sockets.append(SocketInfo(
+                        proto, local_ip, local_port, remote_ip, remote_port,
+                        TCP_STATES.get(state, state) if tcp else ("UNCONN" if state == UDP_UNCONN else "ESTAB"),
+                        int(fields[7]), int(fields[9]),
+                    ))
+        except OSError:
+            continue
+    return sockets
+
+
+def socket_owners(inodes=None):
+    """{inode: [pid, ...]} from one sweep over /proc/*/fd.
+
+    With `inodes`, the sweep stops as soon as every one of them has an
+    owner. Without root only the caller's own processes are visible.
+    """
+    owners = {}
+    wanted = set(inodes) if inodes is not None else None
+    for pid in list_pids():
+        try:
+            with os.scandir(f"{PROC}/{pid}/fd") as it:
+                for entry in it:
+                    try:
+                        target = os.readlink(entry.path)
+                    except OSError:
+                        continue
+                    if not target.startswith("socket:["):
+                        continue
+                    inode = int(target[8:-1])
+                    if wanted is not None and inode not in wanted:
+                        continue
+                    pids = owners.setdefault(inode, [])
+                    if pid not in pids:
+                        pids.append(pid)
+        except OSError:
+            continue
+        if wanted is not None and wanted.issubset(owners):
+            break
+    return owners
+
+
+class SocketTable:
+    """One snapshot of the socket tables with owning processes.
+
+    The /proc/*/fd sweep happens once per snapshot and only looks for the
+    inodes of the sockets in it; call refresh() for a new snapshot.
+    """
+
+    def __init__(self, protocols=PROTOCOLS, listening_only=True):
+        self.protocols = protocols
+        self.listening_only = listening_only
+        self.refresh()
+
+    def refresh(self):
+        sockets = read_sockets(self.protocols, self.listening_only)
+        owners = socket_owners({s.inode for s in sockets if s.inode})
+        names = {}
+        for pid in {pid for pids in owners.values() for pid in pids}:
+            stat = read_stat(pid)
+            names[pid] = stat[0] if stat else "?"
+        self.sockets = [
+            s._replace(processes=tuple((pid, names[pid]) for pid in owners.get(s.inode, ())))
+            for s in sockets
+        ]
+        return self.sockets
+
+    def listening(self):
+        return [s for s in self.sockets if s.listening]
+
+    def on_port(self, port, proto=None):
+        """Sockets bound to `port` (optionally only `proto`: "tcp" or "udp", both families)."""
+        return [s for s in self.sockets if s.local_port == port and (proto is None or s.proto.startswith(proto))]
+
+    def port_processes(self, port, proto="tcp"):
+        """[(pid, name)] of the processes that hold a listening socket on `port`."""
+        found = {}
+        for s in self.on_port(port, proto):
+            if s.listening:
+                found.update(s.processes)
+        return sorted(found.items())
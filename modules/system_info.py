@@ -1,4 +1,9 @@
-import subprocess
+import os
+import threading
+import time
+from collections import deque
+from typing import NamedTuple
+import psutil
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
@@ -7,40 +12,347 @@ from localization import get_string
 
 console = Console()
 
+OS_RELEASE_PATHS = ("/etc/os-release", "/usr/lib/os-release")
+
+
+class OsInfo(NamedTuple):
+    hostname: str
+    pretty_name: str
+
+
+class MemInfo(NamedTuple):
+    """Memory counters in bytes (same semantics as `free`: used = total - available)."""
+    total: int
+    used: int
+    free: int
+    available: int
+
+    @property
+    def percent(self):
+        return (self.used / self.total * 100.0) if self.total else 0.0
+
+
+class LoadAvg(NamedTuple):
+    one: float
+    five: float
+    fifteen: float
+
+
+# --- Чтение напрямую из /proc и /etc (без fork/exec) ---
+
+def read_os_info():
+    """Returns OsInfo from os.uname() and /etc/os-release."""
+    try:
+        hostname = os.uname().nodename or "N/A"
+    except (AttributeError, OSError):
+        hostname = "N/A"
+    pretty_name = "N/A"
+    for path in OS_RELEASE_PATHS:
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    key, sep, value = line.strip().partition("=")
+                    if sep and key == "PRETTY_NAME":
+                        pretty_name = value.strip().strip('"\'') or "N/A"
+                        break
+            break
+        except OSError:
+            continue
+    return OsInfo(hostname, pretty_name)
+
+
+def read_uptime_seconds():
+    """Returns system uptime in seconds from /proc/uptime, or None."""
+    try:
+        with open("/proc/uptime", "rb") as f:
+            return float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def read_meminfo():
+    """Returns MemInfo parsed from /proc/meminfo, or None."""
+    fields = {}
+    try:
+        with open("/proc/meminfo", "rb") as f:
+            for line in f:
+                key, _, rest = line.partition(b":")
+                if key in (b"MemTotal", b"MemFree", b"MemAvailable", b"Buffers", b"Cached", b"SReclaimable"):
+                    fields[key] = int(rest.split()[0]) * 1024
+    except (OSError, ValueError, IndexError):
+        return None
+    total = fields.get(b"MemTotal")
+    if not total:
+        return None
+    free = fields.get(b"MemFree", 0)
+    available = fields.get(b"MemAvailable")
+    if available is None:
+        # Старые ядра (< 3.14) не отдают MemAvailable
+        available = free + fields.get(b"Buffers", 0) + fields.get(b"Cached", 0) + fields.get(b"SReclaimable", 0)
+    return MemInfo(total, max(total - available, 0), free, available)
+
+
+def read_loadavg():
+    """Returns LoadAvg parsed from /proc/loadavg, or None."""
+    try:
+        with open("/proc/loadavg", "rb") as f:
+            parts = f.read().split()
+        return LoadAvg(float(parts[0]), float(parts[1]), float(parts[2]))
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# --- Форматирование (совместимо с выводом `uptime -p` и `free -h`) ---
+
+def format_uptime(seconds):
+    """Formats seconds the way `uptime -p` does, e.g. 'up 2 days, 3 hours, 5 minutes'."""
+    if seconds is None:
+        return "N/A"
+    minutes_total = int(seconds) // 60
+    weeks, rem = divmod(minutes_total, 60 * 24 * 7)
+    days, rem = divmod(rem, 60 * 24)
+    hours, minutes = divmod(rem, 60)
+    parts = []
+    for value, unit in ((weeks, "week"), (days, "day"), (hours, "hour"), (minutes, "minute")):
+        if value:
+            parts.append(f"{value} {unit}{'s' if value != 1 else ''}")
+    return "up " + (", ".join(parts) if parts else "0 minutes")
+
+
+def format_bytes(num):
+    """Formats a byte count the way `free -h` does, e.g. '3.2Gi'."""
+    if num is None:
+        return "N/A"
+    value = float(num)
+    for unit in ("B", "Ki", "Mi", "Gi", "Ti", "Pi"):
+        if value < 1024 or unit == "Pi":
+            break
+        value /= 1024
+    if unit == "B":
+        return f"{int(value)}B"
+    return f"{value:.1f}{unit}" if value < 10 else f"{value:.0f}{unit}"
+
+
+# --- Общий снимок системы с TTL-кэшем по полям ---
+
+FOREVER = float("inf")
+
+
+def _read_cpu_percent():
+    # interval=None не блокирует: считается дельта с прошлого вызова
+    return psutil.cpu_percent(interval=None)
+
+
+class SystemSnapshot:
+    """Per-field TTL cache over the /proc readers, shared by every menu.
+
+    Static fields (hostname, OS) are read once; load, memory, uptime and
+    CPU are refreshed at most once per `ttl` seconds, so a burst of menu
+    redraws costs dictionary lookups instead of syscalls.
+    """
+
+    def __init__(self, ttl=1.0):
+        self._fields = {
+            "os": (read_os_info, FOREVER),
+            "uptime": (read_uptime_seconds, ttl),
+            "mem": (read_meminfo, ttl),
+            "load": (read_loadavg, ttl),
+            "cpu": (_read_cpu_percent, ttl),
+        }
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def get(self, field):
+        """Returns the cached value of `field`, re-reading it once its TTL expires."""
+        loader, ttl = self._fields[field]
+        now = time.monotonic()
+        entry = self._cache.get(field)
+        if entry is not None and now - entry[1] < ttl:
+            return entry[0]
+        with self._lock:
+            entry = self._cache.get(field)
+            if entry is not None and now - entry[1] < ttl:
+                return entry[0]
+            value = loader()
+            self._cache[field] = (value, time.monotonic())
+            return value
+
+    def refresh(self, *fields):
+        """Forces a re-read of the given fields (all TTL-bound ones by default)."""
+        names = fields or [name for name, (_, ttl) in self._fields.items() if ttl != FOREVER]
+        with self._lock:
+            for name in names:
+                self._cache[name] = (self._fields[name][0](), time.monotonic())
+
+    def invalidate(self, field=None):
+        """Drops one cached field (or all of them) so the next get() re-reads it."""
+        with self._lock:
+            if field is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(field, None)
+
+    @property
+    def os_info(self):
+        return self.get("os")
+
+    @property
+    def uptime(self):
+        return self.get("uptime")
+
+    @property
+    def mem(self):
+        return self.get("mem")
+
+    @property
+    def load(self):
+        return self.get("load")
+
+    @property
+    def cpu(self):
+        return self.get("cpu")
+
+
+snapshot = SystemSnapshot()
+
+
+# --- Фоновый сэмплер для шапки главного меню ---
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+
+class Sample(NamedTuple):
+    ts: float
+    cpu: float
+    mem_percent: float
+    load1: float
+    uptime: float
+    mem: MemInfo = None    # полные значения для шапки; None, если /proc не прочитался
+    load: LoadAvg = None
+
+
+def sparkline(values, lo=0.0, hi=None):
+    """Renders values as a unicode sparkline; `hi` defaults to max(values)."""
+    values = list(values)
+    if not values:
+        return ""
+    top = hi if hi is not None else max(values)
+    span = (top - lo) or 1.0
+    last = len(SPARK_CHARS) - 1
+    return "".join(SPARK_CHARS[min(max(int((v - lo) / span * last + 0.5), 0), last)] for v in values)
+
+
+class SystemSampler(threading.Thread):
+    """Daemon thread that samples CPU/RAM/load/uptime into a ring buffer.
+
+    The dashboard reads latest() and history() without blocking, so the
+    header renders immediately and sparklines cost nothing extra.
+    """
+
+    def __init__(self, interval=1.0, size=60, source=None):
+        super().__init__(name="system-sampler", daemon=True)
+        self.interval = interval
+        self.samples = deque(maxlen=size)
+        self._source = source or snapshot
+        self._stop_event = threading.Event()
+        self.last_error = None  # последняя ошибка сэмпла; сбрасывается первым удачным
+
+    def sample_once(self):
+        src = self._source
+        src.refresh("cpu", "mem", "load", "uptime")
+        mem = src.mem
+        load = src.load
+        sample = Sample(
+            time.time(),
+            src.cpu or 0.0,
+            mem.percent if mem else 0.0,
+            load.one if load else 0.0,
+            src.uptime or 0.0,
+            mem,
+            load,
+        )
+        self.samples.append(sample)
+        return sample
+
+    def start(self):
+        # Первый сэмпл снимаем синхронно, чтобы latest() сразу было не None
+        self.sample_once()
+        super().start()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.sample_once()
+            except Exception as e:
+                # Поток не должен умереть от одного сбоя, но сломанный насовсем
+                # сэмплер должен быть виден: шапка показывает last_error
+                self.last_error = e
+                continue
+            self.last_error = None
+
+    def stop(self):
+        self._stop_event.set()
+
+    def latest(self):
+        return self.samples[-1] if self.samples else None
+
+    @property
+    def stale(self):
+        """True when no sample has arrived for three intervals."""
+        sample = self.latest()
+        return sample is None or time.time() - sample.ts > 3 * self.interval
+
+    def history(self, field, count=None):
+        values = [getattr(s, field) for s in tuple(self.samples)]
+        return values[-count:] if count else values
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler():
+    """Returns the shared SystemSampler, starting it on first use."""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None or not _sampler.is_alive():
+            _sampler = SystemSampler()
+            _sampler.start()
+        return _sampler
+
+
+# --- Строковый API, которым пользуются меню ---
+
 def get_os_info():
     """Gathers hostname and OS version."""
-    try:
-        hostname = subprocess.run(['hostname'], capture_output=True, text=True, check=True).stdout.strip()
-        os_release_raw = subprocess.run(['cat', '/etc/os-release'], capture_output=True, text=True, check=True).stdout
-        pretty_name_line = [line for line in os_release_raw.split('\n') if 'PRETTY_NAME' in line]
-        pretty_name = pretty_name_line[0].split('=')[1].strip('"') if pretty_name_line else "N/A"
-        return hostname, pretty_name
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return "N/A", "N/A"
+    info = snapshot.os_info
+    return info.hostname, info.pretty_name
+
+def _latest_sample():
+    # Если сэмплер уже запущен, берём его последний сэмпл, а не читаем /proc заново
+    sampler = _sampler
+    return sampler.latest() if sampler is not None and sampler.is_alive() else None
 
 def get_uptime():
     """Gets system uptime."""
-    try:
-        return subprocess.run(['uptime', '-p'], capture_output=True, text=True, check=True).stdout.strip()
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return "N/A"
-        
+    sample = _latest_sample()
+    return format_uptime(sample.uptime if sample else snapshot.uptime)
+
 def get_mem_usage():
     """Gets memory usage statistics."""
-    try:
-        result = subprocess.run(['free', '-h'], capture_output=True, text=True, check=True).stdout.strip().split('\n')
-        mem_line = result[1].split()
-        return mem_line[1], mem_line[2], mem_line[3] # Total, Used, Free
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    sample = _latest_sample()
+    mem = sample.mem if sample else snapshot.mem
+    if mem is None:
         return "N/A", "N/A", "N/A"
+    return format_bytes(mem.total), format_bytes(mem.used), format_bytes(mem.free) # Total, Used, Free
 
 def get_load_avg():
     """Gets system load average."""
-    try:
-        load_avg_raw = subprocess.run(['cat', '/proc/loadavg'], capture_output=True, text=True, check=True).stdout
-        return " ".join(load_avg_raw.split()[:3])
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    sample = _latest_sample()
+    load = sample.load if sample else snapshot.load
+    if load is None:
         return "N/A"
+    return f"{load.one:.2f} {load.five:.2f} {load.fifteen:.2f}"
 
 
 def run_system_info():
@@ -51,7 +363,7 @@ def run_system_info():
     uptime = get_uptime()
     mem_total, mem_used, mem_free = get_mem_usage()
     load_avg = get_load_avg()
-    
+
     info_table = Table(show_header=False, box=None, padding=(0, 2))
     info_table.add_column(style="bold magenta")
     info_table.add_column()
@@ -69,4 +381,4 @@ def run_system_info():
     mem_table.add_column(get_string('free_mem'), justify="center")
     mem_table.add_row(mem_total, mem_used, mem_free, style="green")
 
-    console.print(mem_table) 
\ No newline at end of file
+    console.print(mem_table)
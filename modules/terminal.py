@@ -0,0 +1,100 @@
+import os
+import selectors
+import sys
+import termios
+import time
+import tty
+
+from rich.text import Text
+
+
+class KeyReader:
+    """Reads keystrokes from stdin without blocking the render loop.
+
+    Inside the `with` block the terminal is in cbreak mode (no echo, no line
+    buffering, Ctrl+C still works), and poll() waits on a selector for at
+    most `timeout` seconds. Escape sequences (arrows etc.) come back as one
+    string.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdin
+        self._fd = None
+        self._saved = None
+        self._selector = None
+
+    def __enter__(self):
+        self._fd = self.stream.fileno()
+        if os.isatty(self._fd):
+            self._saved = termios.tcgetattr(self._fd)
+            tty.setcbreak(self._fd)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._fd, selectors.EVENT_READ)
+        return self
+
+    def __exit__(self, *exc):
+        if self._selector is not None:
+            self._selector.close()
+        if self._saved is not None:
+            termios.tcsetattr(self._fd, termios.TCSADRAIN, self._saved)
+        return False
+
+    def poll(self, timeout):
+        """Returns the keys pressed within `timeout` seconds (possibly none)."""
+        if not self._selector.get_map():
+            time.sleep(max(timeout, 0))
+            return []
+        if not self._selector.select(max(timeout, 0)):
+            return []
+        data = os.read(self._fd, 1024)
+        if not data:
+            # stdin закрыт (не tty): больше не слушаем
+            self._selector.unregister(self._fd)
+            return []
+        return self._split_keys(data.decode("utf-8", "ignore"))
+
+    @staticmethod
+    def _split_keys(text):
+        keys = []
+        i = 0
+        while i < len(text):
+            if text[i] == "\x1b" and text[i + 1:i + 2] in ("[", "O"):
+                j = i + 2
+                while j < len(text) and not text[j].isalpha() and text[j] != "~":
+                    j += 1
+                keys.append(text[i:j + 1])
+                i = j + 1
+            else:
+                keys.append(text[i])
+                i += 1
+        return keys
+
+
+class InlinePrompt:
+    """One-line text input drawn in a live view's status line instead of input()."""
+
+    def __init__(self, label, on_submit, value="", hint="Enter — применить, Esc — отмена"):
+        self.label = label
+        self.on_submit = on_submit
+        self.value = value
+        self.hint = hint
+
+    def feed(self, key):
+        """Handles one key; returns True when the prompt is finished."""
+        if key in ("\r", "\n"):
+            self.on_submit(self.value.strip())
+            return True
+        if key == "\x1b":
+            return True
+        if key in ("\x7f", "\x08"):
+            self.value = self.value[:-1]
+        elif len(key) == 1 and key.isprintable():
+            self.value += key
+        return False
+
+    def render(self):
+        text = Text.from_markup(f"[bold cyan]{self.label}[/bold cyan] ")
+        text.append(self.value)
+        text.append("█", style="blink")
+        text.append(f"   {self.hint}", style="dim")
+        return text
@@ -0,0 +1,346 @@
+import difflib
+import ipaddress
+import os
+import re
+import shutil
+import subprocess
+from typing import NamedTuple
+
+UFW_CONF = "/etc/ufw/ufw.conf"
+UFW_DEFAULTS = "/etc/default/ufw"
+USER_RULES = {4: "/etc/ufw/user.rules", 6: "/etc/ufw/user6.rules"}
+RESTORE_COMMANDS = {4: "iptables-restore", 6: "ip6tables-restore"}
+ANY_NET = {4: "0.0.0.0/0", 6: "::/0"}
+# user6.rules объявляет свои цепочки: ufw6-user-input, ufw6-user-limit, ...
+CHAIN_PREFIX = {4: "ufw", 6: "ufw6"}
+
+RULES_BEGIN = "### RULES ###"
+RULES_END = "### END RULES ###"
+TUPLE_PREFIX = "### tuple ### "
+
+ACTIONS = ("allow", "deny", "reject", "limit")
+PROTOCOLS = ("any", "tcp", "udp")
+PORT_RE = re.compile(r"^\d+(:\d+)?(,\d+(:\d+)?)*$")
+# Аргументы limit так же, как их разворачивает сам ufw (backend_iptables)
+LIMIT_ARGS = "-m conntrack --ctstate NEW -m recent"
+
+
+class UfwRule(NamedTuple):
+    """An incoming rule in ufw's own terms; "any" stands for an omitted field."""
+    action: str
+    port: str = "any"    # 22, 80,443 или 6000:6007
+    proto: str = "any"
+    source: str = "any"  # адрес или сеть
+
+    def command(self):
+        """Arguments for `ufw` that add this rule."""
+        if self.source == "any" and self.port != "any":
+            return [self.action, self.port if self.proto == "any" else f"{self.port}/{self.proto}"]
+        args = [self.action, "from", self.source]
+        if self.port != "any" or self.proto != "any":
+            args += ["to", "any"]
+        if self.port != "any":
+            args += ["port", self.port]
+        if self.proto != "any":
+            args += ["proto", self.proto]
+        return args
+
+    def __str__(self):
+        return " ".join(self.command())
+
+    @property
+    def family(self):
+        """4 or 6 for a rule limited to one address family, None for both."""
+        if self.source == "any":
+            return None
+        return ipaddress.ip_network(self.source).version
+
+    def lines(self, family):
+        """The tuple comment and iptables lines ufw writes for this rule into user{,6}.rules."""
+        source = ANY_NET[family] if self.source == "any" else self.source
+        out = [f"{TUPLE_PREFIX}{self.action} {self.proto} {self.port} {ANY_NET[family]} any {source} in"]
+        protos = [self.proto] if self.proto != "any" or self.port == "any" else ["tcp", "udp"]
+        chain = CHAIN_PREFIX[family]
+        for proto in protos:
+            match = f"-A {chain}-user-input"
+            if proto != "any":
+                match += f" -p {proto}"
+            if self.port != "any":
+                if "," in self.port or ":" in self.port:
+                    match += f" -m multiport --dports {self.port}"
+                else:
+                    match += f" --dport {self.port}"
+            if self.source != "any":
+                match += f" -s {self.source}"
+            if self.action == "limit":
+                out.append(f"{match} {LIMIT_ARGS} --set")
+                out.append(f"{match} {LIMIT_ARGS} --update --seconds 30 --hitcount 6 -j {chain}-user-limit")
+                out.append(f"{match} -j {chain}-user-limit-accept")
+            elif self.action == "allow":
+                out.append(f"{match} -j ACCEPT")
+            elif self.action == "reject":
+                out.append(f"{match} -j REJECT" + (" --reject-with tcp-reset" if proto == "tcp" else ""))
+            else:
+                out.append(f"{match} -j DROP")
+        return out
+
+
+def _normalize_source(value):
+    if value == "any":
+        return value
+    net = ipaddress.ip_network(value, strict=False)
+    # ufw хранит одиночный адрес без /32 (/128)
+    if net.prefixlen == net.max_prefixlen:
+        return str(net.network_address)
+    return str(net)
+
+
+def _check_port(port, proto):
+    if port == "any":
+        return port
+    if not PORT_RE.match(port):
+        raise ValueError(f"bad port {port!r}")
+    for number in re.split(r"[,:]", port):
+        if not 1 <= int(number) <= 65535:
+            raise ValueError(f"port out of range: {number}")
+    if ("," in port or ":" in port) and proto == "any":
+        raise ValueError(f"port list or range {port!r} needs tcp or udp")
+    return port
+
+
+def parse_rule(text):
+    """UfwRule from ufw command syntax: `allow 22/tcp`, `deny from 10.0.0.0/8 to any port 25`.
+
+    Only incoming rules to any local address are supported; anything
+    else (app profiles, interfaces, outgoing, logging) raises ValueError.
+    """
+    tokens = text.split()
+    if tokens and tokens[0] == "ufw":
+        tokens = tokens[1:]
+    if not tokens or tokens[0] not in ACTIONS:
+        raise ValueError(f"expected one of {', '.join(ACTIONS)}: {text!r}")
+    action, rest = tokens[0], tokens[1:]
+    if rest and rest[0] == "in":
+        rest = rest[1:]
+    fields = {"port": "any", "proto": "any", "source": "any"}
+    if len(rest) == 1:
+        port, _, proto = rest[0].partition("/")
+        fields["port"], fields["proto"] = port, proto or "any"
+    else:
+        keys = {"from": "source", "port": "port", "proto": "proto", "to": "to"}
+        if len(rest) % 2 or not rest:
+            raise ValueError(f"unsupported rule: {text!r}")
+        for key, value in zip(rest[::2], rest[1::2]):
+            if key not in keys:
+                raise ValueError(f"unsupported keyword {key!r}: {text!r}")
+            if key == "to":
+                if value != "any":
+                    raise ValueError(f"only `to any` is supported: {text!r}")
+                continue
+            fields[keys[key]] = value
+    if fields["proto"] not in PROTOCOLS:
+        raise ValueError(f"bad protocol {fields['proto']!r}")
+    return UfwRule(
+        action,
+        _check_port(fields["port"], fields["proto"]),
+        fields["proto"],
+        _normalize_source(fields["source"]),
+    )
+
+
+def load_ruleset(path):
+    """Desired rules from a file with one rule per line; `#` starts a comment."""
+    rules = []
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            try:
+                rules.append(parse_rule(line))
+            except ValueError as e:
+                raise ValueError(f"{path}:{number}: {e}") from None
+    return list(dict.fromkeys(rules))
+
+
+def save_ruleset(path, rules):
+    with open(path, "w") as f:
+        f.write("".join(f"{rule}\n" for rule in rules))
+
+
+def _rule_from_tuple(line, family):
+    # action proto dport dst sport src direction; всё прочее (приложения, интерфейсы,
+    # comment=, логирование) не трогаем и переносим как есть
+    fields = line[len(TUPLE_PREFIX):].split()
+    if len(fields) != 7:
+        return None
+    action, proto, dport, dst, sport, src, direction = fields
+    if action not in ACTIONS or direction != "in" or dst != ANY_NET[family] or sport != "any":
+        return None
+    return UfwRule(action, dport, proto, "any" if src == ANY_NET[family] else src)
+
+
+def split_rules(text):
+    """(head, [block, ...], tail) of a user.rules file; a block is a tuple line and its iptables lines."""
+    lines = text.split("\n")
+    try:
+        begin = lines.index(RULES_BEGIN)
+        end = lines.index(RULES_END, begin)
+    except ValueError:
+        raise ValueError(f"no {RULES_BEGIN} section") from None
+    blocks = []
+    for line in lines[begin + 1:end]:
+        if line.startswith(TUPLE_PREFIX):
+            blocks.append([line])
+        elif line.strip() and blocks:
+            blocks[-1].append(line)
+    return lines[:begin + 1], blocks, lines[end:]
+
+
+class RulesetPlan(NamedTuple):
+    added: list
+    removed: list
+    kept: list
+    unmanaged: int           # правил, которые план оставляет как есть
+    files: dict              # path -> (текущий текст, новый текст)
+    families: dict           # path -> 4 или 6
+    reordered: bool = False  # порядок kept в наборе не совпадает с порядком в файле
+
+    @property
+    def changed(self):
+        return any(old != new for old, new in self.files.values())
+
+    def diff(self):
+        """Unified diff of the rules files, as `ufw --dry-run` would show them."""
+        out = []
+        for path, (old, new) in self.files.items():
+            out.extend(difflib.unified_diff(old.splitlines(), new.splitlines(), path, path, lineterm=""))
+        return "\n".join(out)
+
+
+def _read_setting(path, name):
+    try:
+        with open(path) as f:
+            for line in f:
+                key, sep, value = line.strip().partition("=")
+                if sep and key == name:
+                    return value.strip().strip("\"'").lower()
+    except OSError:
+        pass
+    return None
+
+
+def ipv6_enabled():
+    return _read_setting(UFW_DEFAULTS, "IPV6") != "no"
+
+
+def ufw_active():
+    return _read_setting(UFW_CONF, "ENABLED") == "yes"
+
+
+def plan_ruleset(desired):
+    """Compares the desired rules with user.rules/user6.rules and builds their new contents.
+
+    The current state is read from the rules files once, not from one
+    `ufw status` per rule. Every block keeps its place: unmanaged rules
+    (app profiles, interfaces, logging) and kept rules stay where they
+    are, removed rules are cut out, and added rules are appended at the
+    end, as `ufw allow` would do. The order of kept rules in `desired`
+    is not applied; `reordered` tells whether it differs from the file.
+    """
+    families = {USER_RULES[4]: 4}
+    if ipv6_enabled():
+        families[USER_RULES[6]] = 6
+    wanted = set(desired)
+    current = {}
+    unmanaged = 0
+    files = {}
+    for path, family in families.items():
+        with open(path) as f:
+            text = f.read()
+        head, blocks, tail = split_rules(text)
+        present = set()
+        body = [""]
+        for block in blocks:
+            rule = _rule_from_tuple(block[0], family)
+            if rule is None:
+                unmanaged += 1
+            else:
+                current.setdefault(rule, None)
+                if rule not in wanted:
+                    continue
+                present.add(rule)
+            body += block + [""]
+        for rule in desired:
+            if rule not in present and rule.family in (None, family):
+                body += rule.lines(family) + [""]
+        files[path] = (text, "\n".join(head + body + tail))
+    kept = [rule for rule in desired if rule in current]
+    return RulesetPlan(
+        added=[rule for rule in desired if rule not in current],
+        removed=[rule for rule in current if rule not in wanted],
+        kept=kept,
+        unmanaged=unmanaged,
+        files=files,
+        families=families,
+        reordered=kept != [rule for rule in current if rule in wanted],
+    )
+
+
+def validate(plan):
+    """Errors from `iptables-restore --test` over the new files; empty when they would load."""
+    errors = []
+    for path, (_, new) in plan.files.items():
+        command = RESTORE_COMMANDS[plan.families[path]]
+        if not shutil.which(command):
+            continue
+        res = subprocess.run([command, "--test", "-n"], input=new, capture_output=True, text=True)
+        if res.returncode != 0:
+            errors.append(f"{path}: {(res.stderr or res.stdout).strip()}")
+    return errors
+
+
+def _write(path, text):
+    # Через временный файл и rename: ufw не должен увидеть недописанный файл
+    mode = os.stat(path).st_mode & 0o7777
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.chmod(tmp, mode)
+    os.replace(tmp, path)
+
+
+def _reload():
+    res = subprocess.run(["ufw", "reload"], capture_output=True, text=True)
+    return res.returncode == 0, (res.stderr or res.stdout).strip()
+
+
+def apply_plan(plan):
+    """Writes the new rules files and reloads ufw once; returns (ok, message).
+
+    If the reload fails, the previous files are put back and reloaded.
+    An inactive firewall only gets the files: ufw loads them on enable.
+    """
+    written = []
+    try:
+        for path, (old, new) in plan.files.items():
+            if old != new:
+                _write(path, new)
+                written.append(path)
+    except OSError as e:
+        for path in written:
+            _write(path, plan.files[path][0])
+        return False, str(e)
+    if not written or not ufw_active():
+        return True, ""
+    ok, message = _reload()
+    if not ok:
+        for path in written:
+            _write(path, plan.files[path][0])
+        _reload()
+    return ok, message
+
+
+def current_rules():
+    """Managed rules currently in the rules files, in file order."""
+    return plan_ruleset([]).removed
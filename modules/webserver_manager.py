@@ -7,6 +7,7 @@ from InquirerPy import inquirer
 from InquirerPy.base.control import Choice
 from modules.panel_utils import clear_console, run_command, is_root
 from localization import get_string
+from modules.socket_table import SocketTable
 import json
 from rich.live import Live
 import glob
@@ -321,12 +322,15 @@ def _is_port_in_use(port):
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         return s.connect_ex(("127.0.0.1", port)) == 0
 
-def _find_process_using_port(port):
-    try:
-        res = subprocess.run(["lsof", "-i", f":{port}"], capture_output=True, text=True)
-        return res.stdout if res and res.stdout else None
-    except Exception:
-        return None
+def _find_process_using_port(port, sockets=None):
+    """[(pid, name)] of processes listening on TCP `port`, from /proc/net (without lsof).
+
+    `sockets` is a SocketTable to reuse when several ports are checked at once.
+    """
+    return (sockets or SocketTable()).port_processes(port)
+
+def _format_port_processes(processes):
+    return "\n".join(f"PID {pid}: {name}" for pid, name in processes)
 
 def _deploy_nodejs_project():
     # Проверка наличия git
@@ -553,7 +557,7 @@ def _deploy_nodejs_project():
             proc_info = _find_process_using_port(port)
             console.print(f"[red]Порт {port} уже занят![/red]")
             if proc_info:
-                console.print(f"[yellow]Информация о процессе, занимающем порт:[/yellow]\n{proc_info}")
+                console.print(f"[yellow]Информация о процессе, занимающем порт:[/yellow]\n{_format_port_processes(proc_info)}")
             action = inquirer.select(message=f"Порт {port} занят. Что сделать?", choices=[
                 ("change", "Выбрать другой порт"),
                 ("kill", f"Завершить процесс на порту {port}"),
@@ -563,12 +567,11 @@ def _deploy_nodejs_project():
                 continue
             elif action == "kill":
                 # Попробуем завершить процесс
-                import re
-                pids = re.findall(r"\b(\d+)\b", proc_info)
+                pids = [pid for pid, _ in proc_info]
                 killed = False
                 for pid in pids:
                     try:
-                        os.kill(int(pid), 9)
+                        os.kill(pid, 9)
                         console.print(f"[green]Процесс {pid} завершён.[/green]")
                         killed = True
                     except Exception as e:
@@ -855,11 +858,13 @@ def _show_sites_manager():
         clear_console()
         choices = []
         port_conflicts = {}
+        # Один снимок таблицы сокетов на всё меню, а не lsof на каждый сайт
+        sockets = SocketTable()
         for site in sites:
             port = site.get("port", 3000)
             port_status = ""
             if _is_port_in_use(port):
-                proc_info = _find_process_using_port(port)
+                proc_info = _find_process_using_port(port, sockets)
                 # --- Новый блок: определяем, кто занимает порт ---
                 pm2_pid = None
                 pm2_pids = set()
@@ -875,8 +880,7 @@ def _show_sites_manager():
                 except Exception:
                     pass
                 # Получаем PID(ы) процесса, занимающего порт
-                import re
-                port_pids = set(int(pid) for pid in re.findall(r"\b(\d+)\b", proc_info) if int(pid) != port and int(pid) > 100)
+                port_pids = set(pid for pid, _ in proc_info)
                 # Если среди PID есть pm2_pid — не показываем освобождение
                 if pm2_pids and port_pids & pm2_pids:
                     port_status = f"[red] (порт {port} занят pm2-процессом этого сайта)"
@@ -898,9 +902,7 @@ def _show_sites_manager():
             site_name = selected.replace("freeport__", "")
             port, proc_info = port_conflicts.get(site_name, (None, None))
             if port and proc_info:
-                import re
-                # Улучшенный парсинг PID: только уникальные, не равные порту, >100
-                pids = set(int(pid) for pid in re.findall(r"\b(\d+)\b", proc_info) if int(pid) != port and int(pid) > 100)
+                pids = set(pid for pid, _ in proc_info)
                 killed = False
                 for pid in pids:
                     try:
@@ -1115,7 +1117,7 @@ def _deploy_existing_nodejs_project():
             proc_info = _find_process_using_port(port)
             console.print(f"[red]Порт {port} уже занят![/red]")
             if proc_info:
-                console.print(f"[yellow]Информация о процессе, занимающем порт:[/yellow]\n{proc_info}")
+                console.print(f"[yellow]Информация о процессе, занимающем порт:[/yellow]\n{_format_port_processes(proc_info)}")
             action = inquirer.select(message=f"Порт {port} занят. Что сделать?", choices=[
                 ("change", "Выбрать другой порт"),
                 ("kill", f"Завершить процесс на порту {port}"),
@@ -1124,12 +1126,11 @@ def _deploy_existing_nodejs_project():
             if action == "change":
                 continue
             elif action == "kill":
-                import re
-                pids = re.findall(r"\\b(\\d+)\\b", proc_info)
+                pids = [pid for pid, _ in proc_info]
                 killed = False
                 for pid in pids:
                     try:
-                        os.kill(int(pid), 9)
+                        os.kill(pid, 9)
                         console.print(f"[green]Процесс {pid} завершён.[/green]")
                         killed = True
                     except Exception as e:
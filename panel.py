@@ -12,6 +12,7 @@ try:
     from rich.text import Text
     from rich.table import Table
     from rich.columns import Columns
+    from rich.markup import escape
     from InquirerPy import inquirer
     from InquirerPy.base.control import Choice
     from InquirerPy.separator import Separator
@@ -93,7 +94,8 @@ except ImportError as e:
 
 from modules.security import run_security_analysis
 from modules.system_info import (
-    get_os_info, get_uptime, get_mem_usage, get_load_avg
+    get_os_info, get_uptime, get_mem_usage, get_load_avg,
+    snapshot, get_sampler, sparkline, format_uptime, format_bytes,
 )
 from modules.log_viewer import run_log_viewer
 from modules.software_manager import run_software_manager
@@ -110,6 +112,7 @@ console = Console()
 load_language_strings('ru')
 
 VERSION = '3.0 PRE-Release'
+SPARK_WIDTH = 30  # сколько последних сэмплов показывать в спарклайнах шапки
 
 def display_header():
     """Displays the application header with ASCII art and a system info dashboard."""
@@ -250,17 +253,27 @@ def main_menu():
             console.print(Align.center(ascii_art, vertical="top"))
             console.print(Align.center(get_string("copyright_text"), vertical="top"))
             # --- Системная информация ---
-            os_info = get_os_info()
-            uptime = get_uptime()
-            mem = get_mem_usage()
-            load = get_load_avg()
+            sampler = get_sampler()
+            sample = sampler.latest()
+            os_info = snapshot.os_info
+            mem = sample.mem
+            mem_str = f"{format_bytes(mem.used)} / {format_bytes(mem.total)} ({sample.mem_percent:.0f}%)" if mem else "N/A"
+            load = sample.load
+            load_str = f"{load.one:.2f} {load.five:.2f} {load.fifteen:.2f}" if load else "N/A"
+            cpu_spark = sparkline(sampler.history("cpu", SPARK_WIDTH), hi=100.0)
+            mem_spark = sparkline(sampler.history("mem_percent", SPARK_WIDTH), hi=100.0)
+            load_spark = sparkline(sampler.history("load1", SPARK_WIDTH))
             sysinfo = (
-                f"[bold]OS:[/bold] [cyan]{os_info}[/cyan]\n"
-                f"[bold]Uptime:[/bold] [green]{uptime}[/green]\n"
-                f"[bold]RAM:[/bold] [magenta]{mem}[/magenta]\n"
-                f"[bold]Load:[/bold] [yellow]{load}[/yellow]"
+                f"[bold]OS:[/bold] [cyan]{os_info.pretty_name} ({os_info.hostname})[/cyan]\n"
+                f"[bold]Uptime:[/bold] [green]{format_uptime(sample.uptime)}[/green]\n"
+                f"[bold]CPU:[/bold] [red]{sample.cpu:.1f}%[/red] [dim]{cpu_spark}[/dim]\n"
+                f"[bold]RAM:[/bold] [magenta]{mem_str}[/magenta] [dim]{mem_spark}[/dim]\n"
+                f"[bold]Load:[/bold] [yellow]{load_str}[/yellow] [dim]{load_spark}[/dim]"
             )
-            console.print(Panel(sysinfo, title="[cyan]Системная информация[/cyan]", border_style="cyan"))
+            title = "[cyan]Системная информация[/cyan]"
+            if sampler.stale and sampler.last_error is not None:
+                title += f" [yellow](данные устарели: {escape(str(sampler.last_error))})[/yellow]"
+            console.print(Panel(sysinfo, title=title, border_style="cyan"))
             # --- Главное меню ---
             choices = [
                 Choice("processes", name="Мониторинг процессов"),